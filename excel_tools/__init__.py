@@ -0,0 +1,107 @@
+"""
+Shared cleaning and comparison helpers used by the Streamlit pages.
+
+Nothing in this package imports Streamlit except excel_tools.ui, the
+widgets shared by the pages, which they import directly. Batch jobs and
+worker processes can therefore use the same cleaning logic as the pages.
+Names are loaded from their submodule on first use, which keeps importing
+the package itself cheap; pandas and openpyxl are only imported once a
+name that needs them is touched.
+"""
+
+# Import Libraries
+from importlib import import_module
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "CHUNKED_UPLOAD_BYTES": "chunked",
+    "CHUNK_ROWS": "chunked",
+    "EXPORT_FORMATS": "export",
+    "LAYOUT_SCAN_ROWS": "layout",
+    "STAGE_CACHE_BYTES": "stages",
+    "VIEW_PAGE_SIZE": "viewer",
+    "apply_recipe": "recipes",
+    "cached_stage": "stages",
+    "cached_view_positions": "viewer",
+    "cleanInvoice": "aftermath",
+    "cleanMonitorData": "aftermath",
+    "clean_excel": "clean",
+    "clean_excel_chunked": "chunked",
+    "clear_stage_cache": "stages",
+    "col_letter_to_index": "clean",
+    "combine_fingerprints": "fingerprint",
+    "compare_aftermath": "aftermath",
+    "compare_dfs": "compare",
+    "compile_keywords": "keywords",
+    "compile_recipe": "recipes",
+    "content_hash": "workbook",
+    "count_sheet_rows": "workbook",
+    "dates_for_excel": "dates",
+    "detect_date_column": "dates",
+    "drop_keyword_rows": "keywords",
+    "export_frames": "export",
+    "export_report": "export",
+    "file_hash": "workbook",
+    "fill_parsed_dates": "dates",
+    "filter_mask": "viewer",
+    "find_recipe": "recipes",
+    "frame_fingerprint": "fingerprint",
+    "freeze": "stages",
+    "grid_to_frame": "workbook",
+    "is_date_only": "dates",
+    "iter_sheet_rows": "workbook",
+    "iter_sheet_window": "workbook",
+    "keyword_row_mask": "keywords",
+    "layout_fingerprint": "layout",
+    "layout_scan_rows": "layout",
+    "layout_signature": "layout",
+    "load_recipe": "recipes",
+    "load_recipe_folder": "recipes",
+    "load_workbook_grid": "workbook",
+    "make_recipe": "recipes",
+    "page_count": "viewer",
+    "parse_dates": "dates",
+    "plan_clean": "clean",
+    "read_sheet_page": "workbook",
+    "read_sheet_window": "workbook",
+    "read_top_rows": "workbook",
+    "realign_left": "realign",
+    "recipe_from_json": "recipes",
+    "recipe_layout": "recipes",
+    "recipe_scan_rows": "recipes",
+    "recipe_to_json": "recipes",
+    "report_sheets": "export",
+    "resolve_sheet_name": "workbook",
+    "run_plan": "clean",
+    "run_plan_chunked": "chunked",
+    "save_recipe": "recipes",
+    "scan_layout": "layout",
+    "stage_cache": "stages",
+    "to_date": "dates",
+    "to_excel": "export",
+    "view_positions": "viewer",
+    "view_window": "viewer",
+    "write_excel": "export",
+    "write_report": "export",
+    "write_xlsx": "xlsx",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Import the submodule that defines name and cache the value here.
+    """
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """
+    List the public names before they are loaded.
+    """
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,135 @@
+"""
+Cleaning and comparison for the Aftermath invoice and monitor workflow.
+
+The invoice layout is fixed (a 'Date:' column, 'Totals' rows, cells
+shifted right by the PDF conversion), so these functions take only the
+few answers the Aftermath page asks for.
+"""
+
+# Import Libraries
+import pandas as pd
+
+from .dates import parse_dates, to_date
+from .keywords import drop_keyword_rows
+from .realign import realign_left
+from .workbook import grid_to_frame, read_sheet_window
+
+
+def cleanInvoice(invoice_excel, row, num_cols, skip_last_rows=False, skip_num=0):
+    """
+    Generalized Excel cleaning function for Aftermath invoices.
+
+    Parameters:
+    - invoice_excel: Excel file object.
+    - row: The row number in Excel where you want the first heading.
+    - num_cols: The number of columns there should be.
+    - skip_last_rows: True or False. Are there any rows to skip at the end during import? (optional)
+    - skip_num: The row number you want the Excel to end on. (optional)
+    """
+    
+    if skip_last_rows == True:
+
+        last_row_of_data = skip_num + 1
+
+        # Stream only the rows up to the last row of data
+        rows = read_sheet_window(invoice_excel, 0, header_row=row, last_row=last_row_of_data)
+        clean_excel = grid_to_frame(rows)
+
+    else:
+
+        clean_excel = pd.read_excel(invoice_excel, skiprows=row - 1) 
+    
+    # Standardize column headers
+    clean_excel.columns = clean_excel.columns.str.strip()
+    clean_excel.columns = clean_excel.columns.str.replace(r'\s+', ' ', regex=True)
+    clean_excel.columns = clean_excel.columns.astype(str)
+    clean_excel.columns = clean_excel.columns.str.replace(r'\xa0|\t', ' ', regex=True).str.strip()
+
+    column_names = clean_excel.columns.tolist()
+    filtered_columns = [col for col in column_names if "Unnamed" not in col]  
+
+    # Drop rows that contain "Totals" anywhere
+    clean_excel = drop_keyword_rows(clean_excel, ['Totals'])
+
+    # Drop fully empty rows
+    clean_excel = clean_excel.dropna(axis=0, how='all')
+
+    # Forward fill date column
+    clean_excel.loc[:, 'Date:'] = clean_excel['Date:'].ffill()
+    
+    # Parse and filter valid dates
+    clean_excel['Date:'] = to_date(parse_dates(clean_excel['Date:'], '%Y/%m/%d'))
+    clean_excel = clean_excel.dropna(subset=['Date:'])
+    clean_excel.reset_index(drop=True, inplace=True)
+
+    # Realign row values to the left, limited to expected number of columns
+    clean_excel = realign_left(clean_excel, num_cols)
+
+    clean_excel.columns = filtered_columns
+
+    return clean_excel
+
+
+def cleanMonitorData(monitor_excel):
+    """
+    Excel cleaning function for monitor data headers.
+
+    Parameters:
+    - monitor_excel: Excel file object.
+    """
+
+    excel_2 = pd.read_excel(monitor_excel)
+
+    excel_2.columns = excel_2.columns.str.strip()
+    excel_2.columns = excel_2.columns.str.replace(r'\s+', ' ', regex=True)
+    excel_2.columns = excel_2.columns.astype(str)
+
+    return excel_2
+
+
+def compare_aftermath(excel_1, pair1, compare1, excel_2, pair2, compare2):
+    """
+    Excel comparison function for Aftermath workflow.
+
+    Parameters:
+    - excel_1, excel_2: DataFrames to compare.
+    - pair1, pair2: Columns to match between DataFrames.
+    - compare1, compare2: Columns to compare values for matched IDs. (optional)
+    
+    Returns:
+    - missing_from_excel_1: Rows in excel_1 not found in excel_2 based on pair columns.
+    - missing_from_excel_2: Rows in excel_2 not found in excel_1 based on pair columns.
+    - diff_qty_df: DataFrame of mismatched values in compare1/compare2.
+    - combo: DataFrame of unmatched IDs between both Excels.
+    """
+
+    filter1 = excel_1[pair1].isin(excel_2[pair2])
+    missing_from_excel_2 = excel_1[~filter1]
+
+    filter2 = excel_2[pair2].isin(excel_1[pair1])
+    missing_from_excel_1 = excel_2[~filter2]
+
+    # First row per ticket on each side; missing tickets never match
+    first_1 = excel_1.loc[excel_1[pair1].notna()].drop_duplicates(subset=pair1)
+    first_2 = excel_2.loc[excel_2[pair2].notna()].drop_duplicates(subset=pair2)
+
+    left = pd.DataFrame({'ticket': first_1[pair1].to_numpy(), 'qty1': first_1[compare1].to_numpy()})
+    right = pd.DataFrame({'ticket': first_2[pair2].to_numpy(), 'qty2': first_2[compare2].to_numpy()})
+
+    # Align both Excels on ticket number in one join
+    matched = left.merge(right, on='ticket', how='inner')
+
+    is_diff = (matched['qty1'] != matched['qty2']).to_numpy()
+    diff_qty_df = pd.DataFrame(
+        [matched['qty1'].to_numpy()[is_diff], matched['qty2'].to_numpy()[is_diff]],
+        index=['excel_1', 'excel_2'],
+        columns=matched['ticket'].to_numpy()[is_diff],
+    )
+
+    id_list = pd.concat([excel_2[pair2], excel_1[pair1]], ignore_index=True).drop_duplicates()
+    combined_list = id_list[~id_list.isin(matched['ticket'])]
+
+    combo = pd.DataFrame({'Missing list': combined_list.to_numpy()})
+    combo = combo.sort_values(by='Missing list', ascending=False)
+
+    return missing_from_excel_1, missing_from_excel_2, diff_qty_df, combo
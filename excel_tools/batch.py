@@ -0,0 +1,367 @@
+"""
+Command-line batch cleaning and comparison over a folder of workbooks.
+
+Every workbook in the input folder is cleaned with the same settings the
+pages use (clean_excel options or a saved recipe for the General App,
+cleanInvoice for Aftermath), optionally compared against one monitor
+export, and written to its own results workbook. Files are spread across
+a process pool. The monitor export is read once, handed to each worker
+as it starts, and each worker writes its results itself, so only a small
+summary row travels back to the parent.
+
+Usage:
+    python -m excel_tools.batch INPUT_DIR OUTPUT_DIR [options]
+"""
+
+# Import Libraries
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from .aftermath import cleanInvoice, cleanMonitorData, compare_aftermath
+from .chunked import run_plan_chunked
+from .clean import run_plan
+from .compare import compare_dfs
+from .export import write_excel, write_report
+from .layout import scan_layout
+from .recipes import compile_recipe, find_recipe, load_recipe, load_recipe_folder, make_recipe, recipe_scan_rows
+from .stages import clear_stage_cache
+
+# File types picked up from the input folder
+EXCEL_SUFFIXES = (".xlsx", ".xls")
+
+# Name of the summary workbook written next to the results
+SUMMARY_FILE = "summary.xlsx"
+
+# Columns compared by the Aftermath workflow
+AFTERMATH_COLUMNS = {
+    "pair1": "FEMA Ticket #",
+    "compare1": "Calculated Qty",
+    "pair2": "Ticket Number",
+    "compare2": "Quantity",
+}
+
+# Monitor export held by each worker process
+_monitor = None
+
+
+def find_workbooks(folder):
+    """
+    Excel files directly inside folder, sorted by name. Excel lock files
+    ("~$name.xlsx") are skipped.
+    """
+    return sorted(
+        path for path in Path(folder).iterdir()
+        if path.suffix.lower() in EXCEL_SUFFIXES and not path.name.startswith("~$")
+    )
+
+
+def load_monitor(monitor, mode):
+    """
+    Read the monitor export the same way the pages do: cleanMonitorData
+    for Aftermath, as-is for the General App.
+    """
+    if monitor is None:
+        return None
+    if mode == "aftermath":
+        return cleanMonitorData(monitor)
+    return pd.read_excel(monitor)
+
+
+def init_worker(monitor):
+    """
+    Pool initializer: keep the loaded monitor export in this worker.
+    """
+    global _monitor
+    _monitor = monitor
+
+
+def output_names(paths):
+    """
+    Results workbook name for each input file. Files that share a name
+    but not a type (invoice.xlsx and invoice.xls) keep the type in the
+    name so their results do not overwrite each other.
+    """
+    stems = [path.stem for path in paths]
+    return {
+        path: (
+            f"{path.stem}_{path.suffix.lstrip('.')}_results.xlsx"
+            if stems.count(path.stem) > 1
+            else f"{path.stem}_results.xlsx"
+        )
+        for path in paths
+    }
+
+
+def clean_file(path, settings):
+    """
+    Clean one workbook with the batch settings. In general mode a saved
+    recipe whose layout matches the file is used before the default plan.
+
+    Returns:
+    - The cleaned DataFrame and the name of the recipe used (or None).
+    """
+    if settings["mode"] == "aftermath":
+        return cleanInvoice(
+            str(path),
+            settings["row"],
+            settings["num_cols"],
+            skip_last_rows=settings["skip_num"] is not None,
+            skip_num=settings["skip_num"] or 0,
+        ), None
+
+    plan, recipe_name = settings["plan"], settings["recipe_name"]
+    if settings["library"]:
+        recipes = [recipe for recipe, _ in settings["library"]]
+        matched = find_recipe(scan_layout(str(path), recipe_scan_rows(recipes)), recipes)
+        if matched is not None:
+            plan = next(plan for recipe, plan in settings["library"] if recipe is matched)
+            recipe_name = matched["name"]
+    if plan is None:
+        raise ValueError("No saved recipe matches the layout of this file")
+
+    if settings["chunk_rows"]:
+        return run_plan_chunked(str(path), plan, settings["chunk_rows"]), recipe_name
+    return run_plan(str(path), plan), recipe_name
+
+
+def compare_file(cleaned, settings):
+    """
+    Compare a cleaned workbook against the monitor export.
+
+    Returns:
+    - Dict of report sheet name to DataFrame, in sheet order.
+    """
+    if settings["mode"] == "aftermath":
+        results = compare_aftermath(cleaned, excel_2=_monitor, **AFTERMATH_COLUMNS)
+    else:
+        results = compare_dfs(
+            cleaned, settings["key1"], _monitor, settings["key2"],
+            compare1=settings["compare1"],
+            compare2=settings["compare2"],
+        )
+    return dict(zip(
+        ["missing_from_excel_1", "missing_from_excel_2", "diff_qty_df", "combo_missing_id"],
+        results,
+    ))
+
+
+def process_file(path, output, settings):
+    """
+    Clean (and compare) one workbook and write its results to output.
+
+    Returns:
+    - A summary row. Errors are reported in the row instead of raised, so
+      one bad file does not stop the batch.
+    """
+    started = time.perf_counter()
+    row = {"file": path.name, "status": "ok", "rows": None}
+    try:
+        cleaned, recipe_name = clean_file(path, settings)
+        row["rows"] = len(cleaned)
+        if recipe_name is not None:
+            row["recipe"] = recipe_name
+        frames = {"cleaned": cleaned}
+
+        if _monitor is not None:
+            comparison = compare_file(cleaned, settings)
+            frames.update(comparison)
+            row["missing_from_excel_1"] = len(comparison["missing_from_excel_1"])
+            row["missing_from_excel_2"] = len(comparison["missing_from_excel_2"])
+            diff = comparison["diff_qty_df"]
+            row["mismatches"] = diff.shape[1] if settings["mode"] == "aftermath" else len(diff)
+            row["missing_ids"] = len(comparison["combo_missing_id"])
+
+        index = ["diff_qty_df"] if settings["mode"] == "aftermath" else ()
+        output.write_bytes(write_report(frames, index=index))
+        row["output"] = output.name
+    except Exception as e:
+        row["status"] = "error"
+        row["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        # Each file is only cleaned once, so keep worker memory flat
+        clear_stage_cache()
+
+    row["seconds"] = round(time.perf_counter() - started, 3)
+    return row
+
+
+def run_batch(input_dir, output_dir, settings, monitor=None, workers=None, progress=None):
+    """
+    Process every workbook in input_dir across a process pool.
+
+    Parameters:
+    - input_dir: Folder holding the workbooks to clean.
+    - output_dir: Folder for the results workbooks and the summary.
+    - settings: Cleaning and comparison settings (see parse_args).
+    - monitor: Monitor export from load_monitor to compare every workbook
+      against. (optional)
+    - workers: Number of worker processes. Defaults to the CPU count.
+    - progress: Called with each summary row as files finish. (optional)
+
+    Returns:
+    - (summary DataFrame, elapsed seconds).
+    """
+    paths = find_workbooks(input_dir)
+    outputs = output_names(paths)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(monitor,),
+    ) as pool:
+        futures = [
+            pool.submit(process_file, path, Path(output_dir) / outputs[path], settings)
+            for path in paths
+        ]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            if progress is not None:
+                progress(row)
+    elapsed = time.perf_counter() - started
+
+    summary = pd.DataFrame(rows)
+    if not summary.empty:
+        summary = summary.sort_values("file", kind="stable").reset_index(drop=True)
+    (Path(output_dir) / SUMMARY_FILE).write_bytes(write_excel({"summary": summary}))
+    return summary, elapsed
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line into (arguments, settings). The monitor
+    export is read here, so a bad file stops the batch before it starts;
+    the loaded export is args.monitor_data.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m excel_tools.batch",
+        description="Clean a folder of Excel workbooks and compare each one against a monitor export.",
+    )
+    parser.add_argument("input_dir", help="Folder holding the workbooks to clean.")
+    parser.add_argument("output_dir", help="Folder for the results workbooks and summary.xlsx.")
+    parser.add_argument(
+        "--mode", choices=["general", "aftermath"], default="general",
+        help="Cleaning workflow to use (default: general).",
+    )
+    parser.add_argument("--monitor", help="Monitor export to compare every workbook against.")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count).")
+
+    general = parser.add_argument_group("general mode")
+    general.add_argument(
+        "--options",
+        help="clean_excel keyword arguments as JSON, for example '{\"header_row_guess\": 25, \"n_cols\": 8}'.",
+    )
+    general.add_argument("--recipe", help="Saved cleaning recipe (.json) to use instead of --options.")
+    general.add_argument(
+        "--recipes",
+        help="Folder of saved recipes. Each file is cleaned with the recipe that matches its layout, "
+        "falling back to --recipe or --options.",
+    )
+    general.add_argument(
+        "--chunk-rows", type=int,
+        help="Clean each sheet this many rows at a time, so memory stays bounded on very large sheets.",
+    )
+    general.add_argument("--key1", help="ID column in the cleaned workbooks.")
+    general.add_argument("--key2", help="ID column in the monitor export.")
+    general.add_argument("--compare1", nargs="+", help="Columns to compare in the cleaned workbooks.")
+    general.add_argument("--compare2", nargs="+", help="Matching columns in the monitor export.")
+
+    aftermath = parser.add_argument_group("aftermath mode")
+    aftermath.add_argument("--row", type=int, default=1, help="Row holding the invoice headers.")
+    aftermath.add_argument("--skip-num", type=int, help="Final invoice row to keep.")
+    aftermath.add_argument("--num-cols", type=int, default=8, help="Number of invoice columns.")
+
+    args = parser.parse_args(argv)
+
+    if not Path(args.input_dir).is_dir():
+        parser.error(f"input_dir '{args.input_dir}' is not a folder")
+    if args.mode == "general" and args.monitor and not (args.key1 and args.key2):
+        parser.error("--key1 and --key2 are required to compare in general mode")
+    if (args.compare1 is None) != (args.compare2 is None):
+        parser.error("--compare1 and --compare2 must be given together")
+    if args.compare1 is not None and len(args.compare1) != len(args.compare2):
+        parser.error("--compare1 and --compare2 must list the same number of columns")
+    if args.chunk_rows is not None and args.chunk_rows < 1:
+        parser.error("--chunk-rows must be at least 1")
+
+    try:
+        args.monitor_data = load_monitor(args.monitor, args.mode)
+    except Exception as e:
+        parser.error(f"Could not read --monitor '{args.monitor}': {type(e).__name__}: {e}")
+
+    # Compile the cleaning plans once here; workers only run them
+    plan = None
+    recipe_name = None
+    library = []
+    if args.mode == "general":
+        try:
+            if args.recipe:
+                recipe = load_recipe(args.recipe)
+                plan = compile_recipe(recipe)
+                recipe_name = recipe["name"]
+            elif args.options or not args.recipes:
+                plan = compile_recipe(make_recipe(**json.loads(args.options or "{}")))
+            if args.recipes:
+                library = [(recipe, compile_recipe(recipe)) for recipe in load_recipe_folder(args.recipes)]
+        except (OSError, ValueError, TypeError) as e:
+            parser.error(f"Invalid cleaning options: {e}")
+
+    settings = {
+        "mode": args.mode,
+        "plan": plan,
+        "recipe_name": recipe_name,
+        "library": library,
+        "chunk_rows": args.chunk_rows,
+        "key1": args.key1,
+        "key2": args.key2,
+        "compare1": args.compare1,
+        "compare2": args.compare2,
+        "row": args.row,
+        "skip_num": args.skip_num,
+        "num_cols": args.num_cols,
+    }
+    return args, settings
+
+
+def main(argv=None):
+    """
+    Run the batch from the command line and print the throughput.
+    Exits with 1 if any file failed.
+    """
+    args, settings = parse_args(argv)
+
+    def progress(row):
+        detail = row.get("error") or f"{row['rows']} rows"
+        print(f"{row['status']:>5}  {row['file']}  ({detail}, {row['seconds']:.2f}s)")
+
+    summary, elapsed = run_batch(
+        args.input_dir,
+        args.output_dir,
+        settings,
+        monitor=args.monitor_data,
+        workers=args.workers or os.cpu_count(),
+        progress=progress,
+    )
+
+    n_files = len(summary)
+    n_failed = int((summary["status"] != "ok").sum()) if n_files else 0
+    rate = n_files / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Processed {n_files} files ({n_failed} failed) in {elapsed:.2f}s "
+        f"({rate:.2f} files/sec). Summary: {Path(args.output_dir) / SUMMARY_FILE}"
+    )
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
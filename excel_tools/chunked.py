@@ -0,0 +1,357 @@
+"""
+Chunked cleaning for very large sheets.
+
+run_plan holds the whole sheet in one DataFrame and copies it at every
+stage, which near Excel's row limit takes gigabytes. run_plan_chunked
+reads the sheet once, spools the rows to a temporary file in chunks of
+CHUNK_ROWS and runs each chunk through the same stages, so only one chunk
+and the cleaned output are held in memory.
+
+Everything that depends on rows outside a chunk is settled so the result
+matches run_plan:
+- Column types are inferred for the whole sheet before any chunk is cleaned.
+- Forward fills carry the last value of each chunk into the next.
+- Dates are parsed as if the first date of the sheet came first, so the
+  date format pandas guesses is the same in every chunk.
+- An auto-detected date column is scored on the whole sheet, in one extra
+  pass over the spooled chunks.
+- Realigned columns get their types once, after the chunks are joined.
+
+Back fills need the rows after each gap, so plans that back-fill run in
+memory with run_plan instead.
+"""
+
+# Import Libraries
+import pickle
+import tempfile
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from .clean import (
+    date_stage,
+    fill_stage,
+    find_date_col,
+    header_stage,
+    keyword_stage,
+    plan_clean,
+    run_plan,
+    sheet_window,
+    truncate_stage,
+)
+from .dates import detect_date_column, parse_dates
+from .realign import realign_left
+from .workbook import iter_sheet_window, named_width
+
+# Data rows cleaned at a time
+CHUNK_ROWS = 50_000
+
+# Uploads at least this large are cleaned chunk by chunk in the General App
+CHUNKED_UPLOAD_BYTES = 10 * 1024 * 1024
+
+
+def can_chunk(plan):
+    """
+    True if a plan from plan_clean can run chunk by chunk.
+    """
+    if plan["date"]["date_fill_method"] == 'bfill':
+        return False
+    fill = plan["fill"]
+    return fill is None or 'bfill' not in fill["fill_methods"].values()
+
+
+def spool_chunks(rows, spool, chunk_rows):
+    """
+    Pickle rows into spool, chunk_rows at a time.
+
+    Returns:
+    - (number of chunks, width of the widest row without trailing blanks).
+    """
+    n_chunks, width = 0, 0
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return n_chunks, width
+        pickle.dump(chunk, spool, protocol=pickle.HIGHEST_PROTOCOL)
+        width = max(width, max(named_width(row) for row in chunk))
+        n_chunks += 1
+
+
+def read_chunks(spool, n_chunks):
+    """
+    Read the chunks written by spool_chunks back, in order.
+    """
+    spool.seek(0)
+    for _ in range(n_chunks):
+        yield pickle.load(spool)
+
+
+def parse_chunk(header, rows, width, dtype=None):
+    """
+    Parse one chunk of rows below the header, padded to the width of the
+    whole sheet, the same way grid_to_frame parses a sheet.
+    """
+    window = [row[:width] + [""] * (width - len(row)) for row in [header, *rows]]
+    return TextParser(window, header=0, skip_blank_lines=False, dtype=dtype).read()
+
+
+def is_boolean(values):
+    """
+    True if every non-empty value is a boolean. pandas only turns text such
+    as "TRUE" into booleans when the whole column allows it.
+    """
+    if values.dtype == bool:
+        return True
+    if values.dtype == object:
+        return all(isinstance(value, (bool, np.bool_)) for value in values.dropna())
+    return bool(values.isna().all())
+
+
+def sheet_types(spool, n_chunks, header, width):
+    """
+    The column types grid_to_frame would infer for the whole sheet.
+
+    pandas infers each column's type from all of its values, so a chunk on
+    its own can come out differently (only numbers in one chunk, text in
+    another). A column that is text in any chunk is text, and a column with
+    the same type in every chunk keeps it. Only columns whose chunks
+    disagree otherwise are gathered and parsed as a whole.
+
+    Returns:
+    - (types, boolean): The dtype of each column and whether all of its
+      values are booleans.
+    """
+    seen = [set() for _ in range(width)]
+    boolean = [True] * width
+    for rows in read_chunks(spool, n_chunks):
+        frame = parse_chunk(header, rows, width)
+        for i in range(width):
+            values = frame.iloc[:, i]
+            seen[i].add(values.dtype)
+            boolean[i] = boolean[i] and is_boolean(values)
+
+    object_dtype = np.dtype(object)
+    types = [object_dtype if object_dtype in dtypes else next(iter(dtypes)) for dtypes in seen]
+
+    mixed = [i for i, dtypes in enumerate(seen) if len(dtypes) > 1 and object_dtype not in dtypes]
+    if mixed:
+        columns = {i: [] for i in mixed}
+        for rows in read_chunks(spool, n_chunks):
+            for i in mixed:
+                columns[i].extend([row[i] if i < len(row) else ""] for row in rows)
+        for i in mixed:
+            types[i] = parse_chunk([""], columns.pop(i), 1).dtypes.iloc[0]
+
+    return types, boolean
+
+
+def typed_chunks(spool, n_chunks, header, width, types, boolean):
+    """
+    Parse each spooled chunk with the column types of the whole sheet.
+    Index labels run on from chunk to chunk, as in one DataFrame.
+    """
+    start = 0
+    for rows in read_chunks(spool, n_chunks):
+        frame = parse_chunk(header, rows, width)
+        raw = None
+        for i, dtype in enumerate(types):
+            values = frame.iloc[:, i]
+            if dtype == object and not boolean[i] and (values.dtype != object or is_boolean(values)):
+                # Numbers or booleans here are text in the whole sheet
+                if raw is None:
+                    raw = parse_chunk(header, rows, width, dtype=object)
+                frame.isetitem(i, raw.iloc[:, i])
+            elif values.dtype != dtype:
+                frame.isetitem(i, values.astype(dtype))
+
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        start += len(frame)
+        yield frame
+
+
+def filled_chunks(frames, plan, fill_types=None):
+    """
+    Run the header, keyword and fill stages on each chunk.
+
+    The last filled row of each chunk is put in front of the next one for
+    the fill and dropped again, so forward fills carry across chunks.
+
+    pandas infers a new type for a text column after filling it, from the
+    values of that column alone, so a chunk can settle on a different
+    type than the whole column. Chunks are filled without that inference
+    and filled text columns get fill_types, their types over the whole
+    sheet (see survey_chunks), instead.
+
+    Yields:
+    - (DataFrame, named columns) for each chunk.
+    """
+    carry = None
+    for frame in frames:
+        df, filtered_columns = header_stage(frame)
+        df = keyword_stage(df, **plan["keywords"])
+        if plan["fill"] is None:
+            yield df, filtered_columns
+            continue
+
+        columns = df.columns
+        if carry is not None:
+            df = pd.concat([carry, df])
+        with pd.option_context("future.no_silent_downcasting", True):
+            df, fill_columns = fill_stage((df, filtered_columns), **plan["fill"])
+        if carry is not None:
+            df = df.iloc[1:]
+        for col, dtype in (fill_types or {}).items():
+            if df[col].dtype != dtype:
+                df[col] = df[col].infer_objects().astype(dtype)
+
+        if not df.empty:
+            carry = df.iloc[[-1]][columns]
+        yield df, fill_columns
+
+
+def text_fill_columns(plan, columns, types):
+    """
+    The fill columns that hold text before filling, as named after the
+    header stage.
+    """
+    if plan["fill"] is None:
+        return []
+
+    # Same lookup as fill_stage
+    col_map = {col.lower(): (col, dtype) for col, dtype in zip(columns, types)}
+    found = [col_map.get(col.lower()) for col in plan["fill"]["fill_cols"]]
+    return [col for col, dtype in filter(None, found) if dtype == object]
+
+
+def survey_chunks(chunks, date_col, date_format, fill_columns):
+    """
+    One pass over the filled chunks for what depends on the whole sheet:
+    the auto-detected date column (when date_col is not set) and the types
+    of the filled text columns. Only those columns are kept in memory.
+
+    Returns:
+    - (date column or None, dict of filled text column to its dtype when
+      that is not object).
+    """
+    candidates, filled = [], []
+    for df, _ in chunks:
+        if not date_col:
+            candidates.append(df[[col for col in df.columns if 'date' in col.lower()]])
+        filled.append(df[fill_columns])
+
+    if not date_col:
+        date_col, _ = detect_date_column(pd.concat(candidates, ignore_index=True), date_format)
+
+    dtypes = pd.concat(filled, ignore_index=True).infer_objects().dtypes
+    return date_col, {col: dtype for col, dtype in dtypes.items() if dtype != object}
+
+
+def dated_chunks(chunks, date, date_col):
+    """
+    Run the date stage on each chunk with a known date column.
+
+    Two rows go in front of each chunk and are dropped again: the first
+    date of the sheet, so pandas guesses the same date format as for the
+    whole column, and the last date so far, so the forward fill carries
+    across chunks.
+
+    Yields:
+    - (DataFrame, named columns, date column or None) for each chunk.
+    """
+    first = last = None
+    for df, filtered_columns in chunks:
+        if date_col is None:
+            yield df, filtered_columns, None
+            continue
+
+        real_date_col = find_date_col(df.columns, date_col)
+        options = {**date, "date_col": real_date_col}
+        if df.empty:
+            yield date_stage((df, filtered_columns), **options)
+            continue
+
+        dates = df[real_date_col].dropna()
+        if first is None:
+            df, filtered_columns, _ = date_stage((df, filtered_columns), **options)
+        else:
+            lead = df.iloc[[0, 0]].copy()
+            lead.index = [-2, -1]
+            # Keep the chunk's dtype, so the concat does not depend on all-NA columns
+            lead[real_date_col] = pd.Series([first, last], index=lead.index, dtype=df[real_date_col].dtype)
+            df, filtered_columns, _ = date_stage((pd.concat([lead, df]), filtered_columns), **options)
+
+            # Lead rows whose date does not parse were dropped already
+            kept = parse_dates(pd.Series([first, last], dtype=object), date["date_format"]).notna().sum()
+            df = df.iloc[kept:].reset_index(drop=True)
+
+        if not dates.empty:
+            first = dates.iloc[0] if first is None else first
+            last = dates.iloc[-1]
+        yield df, filtered_columns, real_date_col
+
+
+def run_plan_chunked(file, plan, chunk_rows=CHUNK_ROWS):
+    """
+    Run a plan from plan_clean chunk by chunk. The result matches run_plan,
+    but memory is bounded by the chunk size and the cleaned output.
+
+    Plans that back-fill, and sheets with no rows below the header, run
+    with run_plan instead. Passing date_col saves the extra pass that
+    auto-detection takes.
+
+    Parameters:
+    - file: Uploaded file, file-like object or path.
+    - plan: Plan from plan_clean.
+    - chunk_rows: Number of data rows cleaned at a time.
+    """
+    if not can_chunk(plan):
+        return run_plan(file, plan)
+
+    rows = iter_sheet_window(file, **sheet_window(**plan["ingest"]))
+    header = next(rows, [])
+
+    with tempfile.TemporaryFile() as spool:
+        n_chunks, width = spool_chunks(rows, spool, chunk_rows)
+        width = max(width, named_width(header))
+        if n_chunks == 0 or width == 0:
+            return run_plan(file, plan)
+
+        types, boolean = sheet_types(spool, n_chunks, header, width)
+
+        def chunks(fill_types=None):
+            return filled_chunks(typed_chunks(spool, n_chunks, header, width, types, boolean), plan, fill_types)
+
+        date_col = plan["date"]["date_col"]
+        names = header_stage(parse_chunk(header, [], width))[0].columns
+        fill_columns = text_fill_columns(plan, names, types)
+        fill_types = {}
+        if not date_col or fill_columns:
+            date_col, fill_types = survey_chunks(chunks(), date_col, plan["date"]["date_format"], fill_columns)
+
+        cleaned = []
+        for df, filtered_columns, real_date_col in dated_chunks(chunks(fill_types), plan["date"], date_col):
+            if plan["realign"]:
+                df = realign_left(df, infer=False)
+
+            # Adjust n_cols if tracking columns were added
+            extra_cols = plan["truncate"]["fill_tracking_cols"]
+            if plan["date"]["track_date_fill"] and real_date_col:
+                extra_cols += 1
+
+            df = truncate_stage((df, filtered_columns), plan["truncate"]["n_cols"], extra_cols)
+            if not df.empty:
+                cleaned.append(df)
+
+    # When every row was dropped, the last (empty) chunk has the columns
+    df = pd.concat(cleaned, ignore_index=True) if cleaned else df
+    return df.infer_objects() if plan["realign"] else df
+
+
+def clean_excel_chunked(file, chunk_rows=CHUNK_ROWS, **options):
+    """
+    clean_excel for sheets too large to clean in memory. Takes the same
+    options as clean_excel (see run_plan_chunked).
+    """
+    return run_plan_chunked(file, plan_clean(**options), chunk_rows)
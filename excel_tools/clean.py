@@ -0,0 +1,425 @@
+"""
+The General App cleaning pipeline.
+
+clean_excel runs a sheet through a fixed series of stages (read, headers,
+keywords, fill, dates, realign, truncate). Each stage is cached on its
+own options and the stages before it, so changing a later option reuses
+the earlier stages.
+"""
+
+# Import Libraries
+import string
+
+import pandas as pd
+
+from .dates import detect_date_column, fill_parsed_dates, parse_dates, to_date
+from .keywords import drop_keyword_rows
+from .realign import realign_left
+from .stages import cached_stage
+from .workbook import file_hash, grid_to_frame, read_sheet_window
+
+
+def col_letter_to_index(letter):
+    """
+    Change a column letter (A, B, ..., AA) to a 0-based index.
+    """
+    letter = letter.upper()
+    num = 0
+    for c in letter:
+        if c in string.ascii_uppercase:
+            num = num * 26 + (ord(c) - ord('A')) + 1
+        else:
+            raise ValueError(f"Invalid column letter: {letter}")
+    return num - 1
+
+
+def sheet_window(sheet_name, header_row_guess, skip_last_rows, skip_num, start_col_letter, n_cols_read):
+    """
+    Turn the ingest options into read_sheet_window arguments.
+    Columns before start_col_letter are never read; n_cols_read caps how
+    many columns are read from there (named header columns are always kept).
+    """
+    first_col = 1
+    if start_col_letter is not None:
+        first_col = col_letter_to_index(start_col_letter) + 1
+
+    last_col = None
+    if n_cols_read is not None:
+        last_col = first_col + n_cols_read - 1
+
+    # Crop rows at bottom at the row listed in skip_num
+    last_row = skip_num if skip_last_rows else None
+
+    return {
+        "sheet_name": sheet_name,
+        "header_row": header_row_guess,
+        "last_row": last_row,
+        "first_col": first_col,
+        "last_col": last_col,
+    }
+
+
+def ingest_stage(file, sheet_name, header_row_guess, skip_last_rows, skip_num, start_col_letter, n_cols_read):
+    """
+    Read the sheet starting at the header row, limited to the column window.
+    """
+    rows = read_sheet_window(file, **sheet_window(
+        sheet_name, header_row_guess, skip_last_rows, skip_num, start_col_letter, n_cols_read,
+    ))
+    return grid_to_frame(rows)
+
+
+def header_stage(df):
+    """
+    Clean up the column headers.
+    Returns the DataFrame and the list of named (non "Unnamed") columns.
+    """
+    df = df.copy()
+    df.columns = (
+        df.columns.astype(str)
+        .str.strip()
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.replace(r'\xa0|\t', ' ', regex=True)
+    )
+
+    # Remove unnecessary additional columns "Unnamed"
+    column_names = df.columns.tolist()
+    filtered_columns = [col for col in column_names if "Unnamed" not in col]
+
+    return df, filtered_columns
+
+
+def keyword_stage(df, drop_keywords):
+    """
+    Drop rows with keywords, then fully empty rows.
+    """
+    if drop_keywords:
+        df = drop_keyword_rows(df, drop_keywords)
+
+    return df.dropna(how='all')
+
+
+def fill_stage(state, fill_cols, fill_methods, track_fill):
+    """
+    Fill missing values in the chosen non-date columns.
+    """
+    df, filtered_columns = state
+    if not fill_cols:
+        return df, filtered_columns
+
+    df = df.copy()
+    filtered_columns = list(filtered_columns)
+
+    # Map column names to lower for safe matching
+    col_map = {col.lower(): col for col in df.columns}
+
+    for col in fill_cols:
+        col_lower = col.lower()
+        if col_lower not in col_map:
+            raise ValueError(f"fill_col '{col}' not found in columns: {df.columns.tolist()}")
+
+        real_col = col_map[col_lower]
+        method = fill_methods.get(col_lower, 'ffill')
+
+        # Save missing mask before fill
+        if track_fill:
+            was_na = df[real_col].isna()
+
+        # bfill, ffill, or str based on user input
+        if method == 'ffill':
+            df[real_col] = df[real_col].ffill()
+        elif method == 'bfill':
+            df[real_col] = df[real_col].bfill()
+        elif isinstance(method, (int, float, str)):
+            df[real_col] = df[real_col].fillna(method)
+        else:
+            raise ValueError(
+                f"Invalid fill_method '{method}' for column '{col}'. "
+                "Use 'ffill', 'bfill', or a literal value."
+            )
+
+        # Add indicator column if requested
+        if track_fill:
+            filled_col_name = f"{real_col}_filled"
+            insert_pos = df.columns.get_loc(filtered_columns[-1]) + 1
+            fill_values = was_na & df[real_col].notna()
+            df.insert(insert_pos, filled_col_name, fill_values)
+            filtered_columns.append(filled_col_name)
+
+    return df, filtered_columns
+
+
+def find_date_col(columns, date_col):
+    """
+    The column matching date_col, ignoring case and surrounding spaces.
+    """
+    cleaned_cols_lower = [col.lower().strip() for col in columns]
+    if date_col.lower().strip() not in cleaned_cols_lower:
+        raise ValueError(f"date_col '{date_col}' not found.")
+    return columns[cleaned_cols_lower.index(date_col.lower().strip())]
+
+
+def date_stage(state, date_col, date_format, date_fill_method, track_date_fill):
+    """
+    Find, fill and parse the date column, dropping rows without a date.
+    Returns the DataFrame, the named columns and the date column (or None).
+    """
+    df, filtered_columns = state
+
+    # Handle date_col or auto-detect
+    real_date_col = None
+    parsed_dates = None
+
+    if date_col:
+        real_date_col = find_date_col(df.columns, date_col)
+    else:
+        # Auto detect, reusing the parse when the whole column was scored
+        real_date_col, parsed_dates = detect_date_column(df, date_format)
+
+    if not real_date_col:
+        return df, filtered_columns, None
+
+    if date_fill_method not in ('ffill', 'bfill'):
+        raise ValueError(f"Invalid date_fill_method '{date_fill_method}'")
+
+    df = df.copy()
+    filtered_columns = list(filtered_columns)
+
+    # Parse once before filling
+    raw_dates = df[real_date_col]
+    if parsed_dates is None:
+        parsed_dates = parse_dates(raw_dates, date_format)
+
+    # Make a boolean marker before filling
+    if track_date_fill:
+        was_na = raw_dates.isna()
+
+    # Fill dates with chosen method
+    with pd.option_context("future.no_silent_downcasting", True):
+        if date_fill_method == 'ffill':
+            filled = raw_dates.ffill()
+        else:
+            filled = raw_dates.bfill()
+    df[real_date_col] = filled.infer_objects(copy=False)
+
+    # Add marker column if requested
+    if track_date_fill:
+        marker_col_name = f"{real_date_col}_was_{date_fill_method}ed"
+        insert_pos = df.columns.get_loc(filtered_columns[-1]) + 1
+        fill_values = was_na & df[real_date_col].notna()
+        df.insert(insert_pos, marker_col_name, fill_values)
+        filtered_columns.append(marker_col_name)
+
+    # Fill the parsed values the same way and clean
+    df[real_date_col] = to_date(fill_parsed_dates(parsed_dates, raw_dates, date_fill_method))
+    df = df.dropna(subset=[real_date_col]).reset_index(drop=True)
+
+    return df, filtered_columns, real_date_col
+
+
+def realign_stage(df, realign):
+    """
+    Realign rows to the left if true.
+    """
+    return realign_left(df) if realign else df
+
+
+def truncate_stage(state, n_cols, extra_cols):
+    """
+    Drop columns after the specified number and apply the final headers.
+    """
+    df, filtered_columns = state
+
+    if n_cols is not None:
+        df = df.iloc[:, :n_cols + extra_cols]
+
+    df = df.copy()
+    df.columns = filtered_columns[-len(df.columns):]
+    return df.reset_index(drop=True)
+
+
+def plan_clean(
+    header_row_guess=1,
+    sheet_name=0,
+    date_col=None,
+    date_format=None,
+    date_fill_method='ffill',
+    track_date_fill=False,
+    drop_keywords=None,
+    realign=True,
+    n_cols=None,
+    skip_last_rows=False,
+    skip_num=0,
+    start_col_letter=None,
+    fill_cols=None,
+    fill_methods='ffill',
+    track_fill=False
+):
+    """
+    Turn clean_excel options into a plan: the options each stage runs
+    with, checked and normalized once up front.
+
+    Stages that would not change anything (fill without fill_cols,
+    realign turned off) are left out of the plan. The plan is a plain
+    dict, so it can be stored and replayed with run_plan.
+    """
+    # A named date column always runs the date stage, so check its fill
+    # now. Without one, date_stage checks it only if a date column is found.
+    if date_col and date_fill_method not in ('ffill', 'bfill'):
+        raise ValueError(f"Invalid date_fill_method '{date_fill_method}'")
+
+    # Normalize fill options
+    if fill_cols:
+        # If user gives a single string, make it a list
+        if isinstance(fill_cols, str):
+            fill_cols = [fill_cols]
+
+        # Normalize fill_methods: ensure it's a dict with lowercase keys
+        if not isinstance(fill_methods, dict):
+            fill_methods = {col.lower(): fill_methods for col in fill_cols}
+        else:
+            # Also normalize keys if user passed dict directly
+            fill_methods = {col.lower(): method for col, method in fill_methods.items()}
+
+        for col in fill_cols:
+            method = fill_methods.get(col.lower(), 'ffill')
+            if not isinstance(method, (int, float, str)):
+                raise ValueError(
+                    f"Invalid fill_method '{method}' for column '{col}'. "
+                    "Use 'ffill', 'bfill', or a literal value."
+                )
+
+    # Only read the columns that can reach the output. Realign pulls values
+    # in from any column and keywords are matched across the whole row, so
+    # those need the full width; otherwise n_cols plus room for the
+    # tracking columns is enough.
+    n_cols_read = None
+    if n_cols is not None and not realign and not drop_keywords:
+        n_cols_read = n_cols + int(bool(track_date_fill))
+        if track_fill and fill_cols:
+            n_cols_read += len(fill_cols)
+
+    plan = {
+        "ingest": {
+            "sheet_name": sheet_name,
+            "header_row_guess": header_row_guess,
+            "skip_last_rows": skip_last_rows,
+            "skip_num": skip_num,
+            "start_col_letter": start_col_letter,
+            "n_cols_read": n_cols_read,
+        },
+        # Keyword and empty rows are dropped before any fill, so fills
+        # never carry values out of rows that are thrown away
+        "keywords": {"drop_keywords": drop_keywords},
+        "fill": None,
+        "date": {
+            "date_col": date_col,
+            "date_format": date_format,
+            "date_fill_method": date_fill_method,
+            "track_date_fill": track_date_fill,
+        },
+        "realign": bool(realign),
+        "truncate": {
+            "n_cols": n_cols,
+            "fill_tracking_cols": len(fill_cols) if track_fill and fill_cols else 0,
+        },
+    }
+    if fill_cols:
+        plan["fill"] = {
+            "fill_cols": list(fill_cols),
+            "fill_methods": fill_methods,
+            "track_fill": track_fill,
+        }
+    return plan
+
+
+def run_plan(file, plan):
+    """
+    Run a plan from plan_clean on an Excel file.
+
+    Each stage is cached on its own options and the stages before it,
+    so changing a later option reuses the earlier stages.
+    """
+    key, df = cached_stage(
+        "ingest", ingest_stage, file_hash(file), file,
+        **plan["ingest"],
+    )
+    key, state = cached_stage(
+        "headers", header_stage, key, df,
+    )
+    key, df = cached_stage(
+        "keywords", keyword_stage, key, state[0],
+        **plan["keywords"],
+    )
+    state = (df, state[1])
+    if plan["fill"] is not None:
+        key, state = cached_stage(
+            "fill", fill_stage, key, state,
+            **plan["fill"],
+        )
+    key, (df, filtered_columns, real_date_col) = cached_stage(
+        "date", date_stage, key, state,
+        **plan["date"],
+    )
+    if plan["realign"]:
+        key, df = cached_stage(
+            "realign", realign_stage, key, df,
+            realign=True,
+        )
+
+    # Adjust n_cols if tracking columns were added
+    extra_cols = plan["truncate"]["fill_tracking_cols"]
+    if plan["date"]["track_date_fill"] and real_date_col:
+        extra_cols += 1
+
+    key, df = cached_stage(
+        "truncate", truncate_stage, key, (df, filtered_columns),
+        n_cols=plan["truncate"]["n_cols"],
+        extra_cols=extra_cols,
+    )
+
+    return df.copy()
+
+
+def clean_excel(
+    file,
+    header_row_guess=1,
+    sheet_name=0,
+    date_col=None,
+    date_format=None,
+    date_fill_method='ffill',
+    track_date_fill=False,
+    drop_keywords=None,
+    realign=True,
+    n_cols=None,
+    skip_last_rows=False,
+    skip_num=0,
+    start_col_letter=None,
+    fill_cols=None,
+    fill_methods='ffill',
+    track_fill=False
+):
+    """
+    Clean and preprocess an Excel sheet with flexible options.
+
+    Each stage is cached on its own options and the stages before it,
+    so changing a later option reuses the earlier stages.
+    """
+    plan = plan_clean(
+        header_row_guess=header_row_guess,
+        sheet_name=sheet_name,
+        date_col=date_col,
+        date_format=date_format,
+        date_fill_method=date_fill_method,
+        track_date_fill=track_date_fill,
+        drop_keywords=drop_keywords,
+        realign=realign,
+        n_cols=n_cols,
+        skip_last_rows=skip_last_rows,
+        skip_num=skip_num,
+        start_col_letter=start_col_letter,
+        fill_cols=fill_cols,
+        fill_methods=fill_methods,
+        track_fill=track_fill,
+    )
+    return run_plan(file, plan)
@@ -0,0 +1,130 @@
+"""
+Key-based comparison of two cleaned DataFrames for the General App.
+"""
+
+# Import Libraries
+import pandas as pd
+
+
+def compare_dfs(
+    excel_1,
+    pair1,
+    excel_2,
+    pair2,
+    compare1=None,
+    compare2=None,
+    case_insensitive_match=True,
+):
+    """
+    Generalized Excel comparison function.
+    """
+
+    # Work on copies so original DataFrames aren't modified
+    excel_1 = excel_1.copy()
+    excel_2 = excel_2.copy()
+
+    def resolve_column(df, name):
+        lower_map = {col.lower(): col for col in df.columns}
+        name_lower = name.lower()
+        if name_lower not in lower_map:
+            raise ValueError(f"Column '{name}' not found in DataFrame columns: {list(df.columns)}")
+        return lower_map[name_lower]
+
+    def resolve_column_list(df, names):
+        return [resolve_column(df, name) for name in names]
+
+    # Normalize column names
+    pair1 = resolve_column(excel_1, pair1)
+    pair2 = resolve_column(excel_2, pair2)
+
+    # Convert single column to list
+    if isinstance(compare1, str):
+        compare1 = [compare1]
+    if isinstance(compare2, str):
+        compare2 = [compare2]
+
+    if (compare1 is None) != (compare2 is None):
+        raise ValueError("Both compare1 and compare2 must be provided together, or not at all.")
+    if compare1 and compare2:
+        if not isinstance(compare1, list) or not isinstance(compare2, list):
+            raise TypeError("compare1 and compare2 must be lists.")
+        if len(compare1) != len(compare2):
+            raise ValueError("compare1 and compare2 must be the same length.")
+
+        compare1 = resolve_column_list(excel_1, compare1)
+        compare2 = resolve_column_list(excel_2, compare2)
+
+    # Create comparison keys
+    if case_insensitive_match:
+        excel_1['_key'] = excel_1[pair1].astype(str).str.lower()
+        excel_2['_key'] = excel_2[pair2].astype(str).str.lower()
+    else:
+        excel_1['_key'] = excel_1[pair1].astype(str)
+        excel_2['_key'] = excel_2[pair2].astype(str)
+
+    # Find unmatched rows
+    filter1 = excel_1['_key'].isin(excel_2['_key'])
+    missing_from_excel_2 = excel_1[~filter1]
+
+    filter2 = excel_2['_key'].isin(excel_1['_key'])
+    missing_from_excel_1 = excel_2[~filter2]
+
+    # Only the first row for each key takes part in the comparison
+    first_1 = excel_1.drop_duplicates(subset='_key')
+    first_2 = excel_2.drop_duplicates(subset='_key')
+
+    # Build tidy mismatch DataFrame from one join on the keys
+    diff_parts = []
+    if compare1 and compare2:
+        left = pd.DataFrame({'_key': first_1['_key'].to_numpy(), 'ID': first_1[pair1].to_numpy()})
+        right = pd.DataFrame({'_key': first_2['_key'].to_numpy()})
+        for i, (col1, col2) in enumerate(zip(compare1, compare2)):
+            left[f'_val_{i}'] = first_1[col1].to_numpy()
+            right[f'_val_{i}'] = first_2[col2].to_numpy()
+
+        matched = left.merge(right, on='_key', how='inner', suffixes=('_1', '_2'))
+
+        def normalize(values):
+            if values.dtype != object:
+                return values
+            # Only the text values; the column can also hold numbers, times, ...
+            is_str = values.map(lambda v: isinstance(v, str)).astype(bool)
+            return values.mask(is_str, values[is_str].map(lambda s: s.strip().lower()))
+
+        for i, (col1, col2) in enumerate(zip(compare1, compare2)):
+            val1 = matched[f'_val_{i}_1']
+            val2 = matched[f'_val_{i}_2']
+            val1_norm = normalize(val1)
+            val2_norm = normalize(val2)
+
+            both_null = val1_norm.isna() & val2_norm.isna()
+            is_diff = (val1_norm != val2_norm) & ~both_null
+            if is_diff.any():
+                diff_parts.append(pd.DataFrame({
+                    "ID": matched.loc[is_diff, 'ID'],
+                    "Column (Excel 1 | Excel2)": f"{col1} | {col2}",
+                    "Excel 1": val1[is_diff],
+                    "Excel 2": val2[is_diff],
+                }))
+
+    if diff_parts:
+        diff_qty_df = pd.concat(diff_parts, ignore_index=True).infer_objects()
+        diff_qty_df.sort_values(by=["ID", "Column (Excel 1 | Excel2)"], inplace=True)
+    else:
+        diff_qty_df = pd.DataFrame()
+
+    # Unmatched keys, reported with their original IDs
+    original_ids = pd.concat([
+        first_1.loc[~first_1['_key'].isin(first_2['_key']), pair1],
+        first_2.loc[~first_2['_key'].isin(first_1['_key']), pair2],
+    ], ignore_index=True)
+
+    combo = pd.DataFrame({'Missing list': original_ids}).sort_values(
+        by='Missing list', ascending=False
+    )
+
+    # Remove _key from the return values
+    missing_from_excel_1 = missing_from_excel_1.drop(columns=['_key'], errors='ignore')
+    missing_from_excel_2 = missing_from_excel_2.drop(columns=['_key'], errors='ignore')
+
+    return missing_from_excel_1, missing_from_excel_2, diff_qty_df, combo
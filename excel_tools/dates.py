@@ -0,0 +1,140 @@
+"""
+Date column detection, parsing and filling.
+"""
+
+# Import Libraries
+import numpy as np
+import pandas as pd
+
+# Rows used to score each candidate date column
+DATE_SAMPLE_SIZE = 500
+
+
+def parse_dates(values, date_format=None):
+    """
+    Parse a column to datetimes. Values that do not parse become NaT.
+
+    Only the distinct raw values are parsed and the results are mapped
+    back by position, so a few hundred invoice dates repeated over many
+    rows cost a few hundred parses.
+
+    Parameters:
+    - values: Series of raw cell values.
+    - date_format: Format passed to pd.to_datetime. (optional)
+
+    Returns:
+    - datetime64 Series aligned to values.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=date_format, errors='coerce')
+
+    # Code -1 (empty cell) has no label in parsed and becomes NaT
+    result = parsed.reindex(codes)
+    result.index = values.index
+    result.name = values.name
+    return result
+
+
+def to_date(values):
+    """
+    Drop the time of day, keeping a datetime64 dtype instead of date objects.
+    """
+    return values.dt.normalize()
+
+
+def is_date_only(values):
+    """
+    True if a datetime64 column holds only midnight values (plain dates).
+    """
+    return bool(((values.dt.normalize() == values) | values.isna()).all())
+
+
+def dates_for_excel(df):
+    """
+    Return df with date-only datetime64 columns as date objects, so Excel
+    shows them as dates instead of date and midnight time.
+    """
+    date_cols = [
+        col for col in df.select_dtypes(include='datetime64').columns
+        if is_date_only(df[col])
+    ]
+    if not date_cols:
+        return df
+    return df.assign(**{col: df[col].dt.date for col in date_cols})
+
+
+def sample_positions(n_rows, sample_size=DATE_SAMPLE_SIZE):
+    """
+    Evenly spaced row positions, or None when every row fits in the sample.
+    """
+    if n_rows <= sample_size:
+        return None
+    return np.unique(np.linspace(0, n_rows - 1, sample_size).astype(np.int64))
+
+
+def detect_date_column(df, date_format=None, sample_size=DATE_SAMPLE_SIZE):
+    """
+    Pick the column with "date" in its name whose values parse best.
+
+    Candidates are scored on the same bounded sample of rows. Scoring
+    stops early once a column parses on every sampled row, since no later
+    column can beat it.
+
+    Parameters:
+    - df: DataFrame to search.
+    - date_format: Format passed to pd.to_datetime. (optional)
+    - sample_size: Maximum number of rows used for scoring.
+
+    Returns:
+    - (column, parsed): The best column and its parsed values when the
+      sample covered the whole column, so they can be reused. parsed is
+      None if the column still needs a full parse. column is None if no
+      candidate has any dates.
+    """
+    positions = sample_positions(len(df), sample_size)
+    n_sampled = len(df) if positions is None else len(positions)
+
+    best_col, best_score, best_parsed = None, 0, None
+    for col in [col for col in df.columns if 'date' in col.lower()]:
+        values = df[col] if positions is None else df[col].iloc[positions]
+        try:
+            parsed = parse_dates(values, date_format)
+            score = parsed.notna().sum()
+        except Exception:
+            continue
+
+        if score > best_score:
+            best_col, best_score = col, score
+            best_parsed = parsed if positions is None else None
+            if score == n_sampled:
+                break
+
+    return best_col, best_parsed
+
+
+def fill_parsed_dates(parsed, raw, method='ffill'):
+    """
+    Fill parsed dates exactly as parsing raw.ffill() or raw.bfill() would.
+
+    Each empty raw cell takes the parse result of the cell it would have
+    been filled from, so the raw column never has to be parsed twice.
+
+    Parameters:
+    - parsed: Parsed values of raw, aligned with it.
+    - raw: Column before filling.
+    - method: 'ffill' or 'bfill'.
+    """
+    has_value = raw.notna().to_numpy()
+    source = pd.Series(np.where(has_value, np.arange(len(raw)), np.nan))
+
+    if method == 'ffill':
+        source = source.ffill()
+    elif method == 'bfill':
+        source = source.bfill()
+    else:
+        raise ValueError(f"Invalid date_fill_method '{method}'")
+
+    has_source = source.notna().to_numpy()
+    filled = parsed.iloc[source.fillna(0).to_numpy(dtype=np.int64)]
+    filled.index = raw.index
+    return filled.where(has_source)
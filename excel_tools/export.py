@@ -0,0 +1,276 @@
+"""
+Excel and data file export.
+
+Excel workbooks are written through a small set of named engines. Small
+exports go through pandas' openpyxl writer; large ones use the streaming
+writer in xlsx.py, which writes rows to the file instead of building the
+whole workbook in memory.
+
+CSV, Parquet and Arrow IPC hold one table per file, so exports with
+several sheets are bundled into a zip with one file per sheet.
+"""
+
+# Import Libraries
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+
+from .dates import dates_for_excel
+from .xlsx import write_xlsx
+
+# Exports with more rows than this use the streaming engine by default
+STREAMING_ROW_THRESHOLD = 50_000
+
+# Data rows per sheet: Excel's 1,048,576-row limit minus the header row
+EXCEL_MAX_DATA_ROWS = 1_048_575
+
+# Longest sheet name Excel accepts
+EXCEL_MAX_SHEET_NAME = 31
+
+# Sheet written when a report has no data at all
+NO_DATA_SHEET = "No_Data"
+
+# Export formats offered next to Excel, with their labels
+EXPORT_FORMATS = {
+    "xlsx": "Excel (.xlsx)",
+    "csv": "CSV (.csv / .zip)",
+    "parquet": "Parquet (.parquet / .zip)",
+    "arrow": "Arrow IPC (.arrow / .zip)",
+}
+
+
+def write_with_pandas(sheets, output, index):
+    """
+    Write every sheet with pd.ExcelWriter and the openpyxl engine.
+    """
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for sheet_name, df in sheets.items():
+            dates_for_excel(df).to_excel(writer, sheet_name=sheet_name, index=sheet_name in index)
+
+
+def write_streaming(sheets, output, index):
+    """
+    Write every sheet with the streaming xlsx writer. Rows are formatted
+    in batches and written straight into the archive, so memory stays
+    flat as the export grows.
+    """
+    write_xlsx(sheets, output, index=index)
+
+
+EXPORT_ENGINES = {
+    "pandas": write_with_pandas,
+    "streaming": write_streaming,
+}
+
+
+def continuation_name(name, number, taken):
+    """
+    First free "name_<n>" for n from number up, with name cut so the whole
+    name fits Excel's sheet name limit. Excel compares sheet names without case, so taken holds
+    casefolded names.
+    """
+    while True:
+        suffix = f"_{number}"
+        part_name = f"{name[:EXCEL_MAX_SHEET_NAME - len(suffix)]}{suffix}"
+        if part_name.casefold() not in taken:
+            return part_name
+        number += 1
+
+
+def split_sheets(sheets, index=(), max_rows=EXCEL_MAX_DATA_ROWS):
+    """
+    Split frames longer than max_rows into numbered continuation sheets
+    ("name", "name_2", "name_3", ...). Each part is a row slice of the
+    original frame, so nothing is copied. Numbers already used by another
+    sheet are skipped.
+
+    Returns:
+    - The new dict of sheets and the names of the sheets that get the index.
+    """
+    split = {}
+    split_index = set()
+    taken = {name.casefold() for name in sheets}
+    for name, df in sheets.items():
+        for part, start in enumerate(range(0, max(len(df), 1), max_rows), start=1):
+            part_name = name
+            if part > 1:
+                part_name = continuation_name(name, part, taken)
+                taken.add(part_name.casefold())
+            split[part_name] = df.iloc[start:start + max_rows]
+            if name in index:
+                split_index.add(part_name)
+    return split, split_index
+
+
+def choose_engine(sheets):
+    """
+    Pick the streaming engine once the export is large enough to matter.
+    """
+    total_rows = sum(len(df) for df in sheets.values())
+    return "streaming" if total_rows > STREAMING_ROW_THRESHOLD else "pandas"
+
+
+def write_excel(sheets, index=(), engine=None):
+    """
+    Write DataFrames to an in-memory Excel workbook.
+
+    Parameters:
+    - sheets: Dict of sheet name to DataFrame, in sheet order.
+    - index: Names of the sheets that also get the DataFrame index.
+    - engine: Name in EXPORT_ENGINES. Picked from the row count if not given.
+
+    Frames longer than Excel's row limit continue on numbered sheets.
+
+    Returns:
+    - The workbook as bytes.
+    """
+    if engine is None:
+        engine = choose_engine(sheets)
+    if engine not in EXPORT_ENGINES:
+        raise ValueError(f"Unknown export engine '{engine}'")
+
+    sheets, index = split_sheets(sheets, index)
+
+    output = BytesIO()
+    EXPORT_ENGINES[engine](sheets, output, index)
+    return output.getvalue()
+
+
+def report_sheets(frames):
+    """
+    Sheets for a multi-frame report. Every non-empty frame gets a sheet;
+    if all of them are empty, a single notice sheet is used instead.
+
+    Parameters:
+    - frames: Dict of sheet name to DataFrame, in sheet order.
+    """
+    sheets = {name: df for name, df in frames.items() if not df.empty}
+    if not sheets:
+        sheets = {NO_DATA_SHEET: pd.DataFrame({"Notice": ["No data available"]})}
+    return sheets
+
+
+def write_report(frames, index=(), engine=None):
+    """
+    Write a multi-frame report workbook, skipping empty frames.
+
+    Parameters:
+    - frames: Dict of sheet name to DataFrame, in sheet order.
+    - index: Names of the sheets that also get the DataFrame index.
+    - engine: Name in EXPORT_ENGINES. Picked from the row count if not given.
+
+    Returns:
+    - The workbook as bytes.
+    """
+    return write_excel(report_sheets(frames), index=index, engine=engine)
+
+
+def to_excel(df):
+    """
+    Write a single DataFrame to an in-memory workbook with one sheet.
+    """
+    return write_excel({'Sheet1': df})
+
+
+def arrow_table(df, index=False):
+    """
+    Convert df to a pyarrow Table. Columns that mix types (common in
+    cleaned Excel data) are stored as text, keeping missing values empty.
+    """
+    import pyarrow as pa
+
+    if index:
+        df = df.reset_index()
+
+    arrays = []
+    for position in range(df.shape[1]):
+        values = df.iloc[:, position]
+        try:
+            arrays.append(pa.array(values, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            text = values.astype(str).where(values.notna(), None)
+            arrays.append(pa.array(text, type=pa.string(), from_pandas=True))
+
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+
+
+def csv_bytes(df, index=False):
+    """
+    Write df as UTF-8 CSV.
+    """
+    return df.to_csv(index=index).encode("utf-8")
+
+
+def parquet_bytes(df, index=False):
+    """
+    Write df as a Parquet file.
+    """
+    import pyarrow.parquet as pq
+
+    output = BytesIO()
+    pq.write_table(arrow_table(df, index), output)
+    return output.getvalue()
+
+
+def arrow_bytes(df, index=False):
+    """
+    Write df as an Arrow IPC (Feather v2) file.
+    """
+    import pyarrow as pa
+
+    table = arrow_table(df, index)
+    output = BytesIO()
+    with pa.ipc.new_file(output, table.schema) as writer:
+        writer.write_table(table)
+    return output.getvalue()
+
+
+TABLE_WRITERS = {
+    "csv": csv_bytes,
+    "parquet": parquet_bytes,
+    "arrow": arrow_bytes,
+}
+
+
+def export_frames(sheets, fmt="xlsx", index=(), bundle=False):
+    """
+    Export DataFrames in one of EXPORT_FORMATS.
+
+    Parameters:
+    - sheets: Dict of sheet name to DataFrame, in sheet order.
+    - fmt: Key in EXPORT_FORMATS.
+    - index: Names of the sheets that also get the DataFrame index.
+    - bundle: Zip single-table formats even when there is only one sheet.
+
+    Returns:
+    - (bytes, file extension). Single-table formats with several sheets
+      come back as a zip with one file per sheet.
+    """
+    if fmt == "xlsx":
+        return write_excel(sheets, index=index), ".xlsx"
+    if fmt not in TABLE_WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+
+    write_table = TABLE_WRITERS[fmt]
+    if len(sheets) == 1 and not bundle:
+        (name, df), = sheets.items()
+        return write_table(df, index=name in index), f".{fmt}"
+
+    output = BytesIO()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, df in sheets.items():
+            archive.writestr(f"{name}.{fmt}", write_table(df, index=name in index))
+    return output.getvalue(), ".zip"
+
+
+def export_report(frames, fmt="xlsx", index=()):
+    """
+    Export a multi-frame report in one of EXPORT_FORMATS, skipping empty
+    frames like write_report. Single-table formats always come back as a
+    zip named by sheet.
+
+    Returns:
+    - (bytes, file extension).
+    """
+    return export_frames(report_sheets(frames), fmt, index=index, bundle=True)
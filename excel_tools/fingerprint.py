@@ -0,0 +1,49 @@
+"""
+Cheap content fingerprints used as cache keys instead of whole DataFrames.
+
+A fingerprint is computed once when a frame is produced and carried along
+with it, so downstream caches never have to rehash every cell.
+"""
+
+# Import Libraries
+import hashlib
+
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+
+def object_kinds(df):
+    """
+    The kind of values in each object column ("string", "date", "mixed",
+    ...). pandas hashes object values through their text, so without
+    these 1 and "1" would hash the same.
+    """
+    return [
+        infer_dtype(df.iloc[:, position], skipna=True) if df.dtypes.iloc[position] == object else ""
+        for position in range(df.shape[1])
+    ]
+
+
+def frame_fingerprint(df):
+    """
+    Hash the columns, dtypes, index and values of a DataFrame.
+    """
+    kinds = object_kinds(df)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((df.shape, [str(c) for c in df.columns], [str(t) for t in df.dtypes], kinds)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+
+    # Columns mixing types also hash the type of every value
+    for position, kind in enumerate(kinds):
+        if kind.startswith("mixed"):
+            types = df.iloc[:, position].map(type)
+            h.update(pd.util.hash_pandas_object(types, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def combine_fingerprints(*parts):
+    """
+    Derive a fingerprint from other fingerprints and options, for example
+    a file hash plus the cleaning settings applied to it.
+    """
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
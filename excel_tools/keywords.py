@@ -0,0 +1,83 @@
+"""
+Column-wise keyword matching used to drop totals, notes and other junk rows.
+"""
+
+# Import Libraries
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+
+@lru_cache(maxsize=64)
+def _compile_keywords(keywords):
+    # One case-insensitive alternation, longest keywords first
+    unique_keywords = sorted({k.casefold() for k in keywords if k}, key=len, reverse=True)
+    if not unique_keywords:
+        return None
+    return re.compile("|".join(re.escape(k) for k in unique_keywords))
+
+
+def compile_keywords(keywords):
+    """
+    Compile keywords into one case-insensitive matcher.
+
+    Parameters:
+    - keywords: A keyword string or a list of keywords.
+
+    Returns:
+    - Compiled pattern, or None if there is nothing to match.
+    """
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    return _compile_keywords(tuple(str(k) for k in keywords))
+
+
+def keyword_row_mask(df, keywords):
+    """
+    Flag rows where any text cell contains one of the keywords.
+
+    Only object and string columns are scanned. Each column is factorized
+    so every distinct value is tested once, and the per-column results are
+    ORed together. Empty cells never match.
+
+    Parameters:
+    - df: DataFrame to scan.
+    - keywords: A keyword string or a list of keywords.
+
+    Returns:
+    - Boolean Series aligned to df.index.
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    pattern = compile_keywords(keywords)
+    if pattern is None or df.empty:
+        return pd.Series(mask, index=df.index)
+
+    search = pattern.search
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        if not (is_object_dtype(col.dtype) or is_string_dtype(col.dtype)):
+            continue
+
+        codes, uniques = pd.factorize(col, use_na_sentinel=True)
+        if len(uniques) == 0:
+            continue
+
+        hits = np.fromiter(
+            (search(str(value).casefold()) is not None for value in uniques),
+            dtype=bool,
+            count=len(uniques),
+        )
+        if hits.any():
+            mask |= (codes >= 0) & hits[codes]
+
+    return pd.Series(mask, index=df.index)
+
+
+def drop_keyword_rows(df, keywords):
+    """
+    Drop every row that contains one of the keywords in a text cell.
+    """
+    return df[~keyword_row_mask(df, keywords)]
@@ -0,0 +1,80 @@
+"""
+Layout fingerprints for recognizing a known invoice layout on upload.
+
+Invoices from the same vendor repeat their PDF-to-Excel layout exactly:
+the same sheet names, the same header text on the same row and the same
+number of columns. Those are read from the top of the workbook only, so
+recognizing a layout never parses the whole file.
+"""
+
+# Import Libraries
+from .fingerprint import combine_fingerprints
+from .workbook import named_width, read_top_rows
+
+# Rows read from the top of each sheet when fingerprinting
+LAYOUT_SCAN_ROWS = 50
+
+
+def scan_layout(file, scan_rows=LAYOUT_SCAN_ROWS):
+    """
+    Read the top scan_rows of every sheet for layout_signature.
+    """
+    return read_top_rows(file, scan_rows)
+
+
+def layout_scan_rows(*header_rows):
+    """
+    Rows scan_layout must read to see every given header row: at least
+    LAYOUT_SCAN_ROWS, more when a header sits further down.
+    """
+    return max([LAYOUT_SCAN_ROWS, *(int(row) for row in header_rows if row)])
+
+
+def layout_signature(top_rows, sheet_name=0, header_row=1):
+    """
+    The structure of an upload seen from one header row.
+
+    Parameters:
+    - top_rows: Result of scan_layout.
+    - sheet_name: Sheet name or 0-based sheet position.
+    - header_row: 1-based row holding the column headers.
+
+    Returns:
+    - Dict of the sheet names, the sheet, the header row, its text
+      (whitespace collapsed, case folded) and the number of named columns,
+      or None if the header row is empty or below the scanned rows.
+    """
+    sheets = list(top_rows)
+    if isinstance(sheet_name, int):
+        if not 0 <= sheet_name < len(sheets):
+            return None
+        sheet_name = sheets[sheet_name]
+    if sheet_name not in top_rows:
+        return None
+
+    rows = top_rows[sheet_name]
+    if not 1 <= header_row <= len(rows):
+        return None
+
+    header = rows[header_row - 1]
+    n_cols = named_width(header)
+    if n_cols == 0:
+        return None
+
+    return {
+        "sheets": sheets,
+        "sheet": sheet_name,
+        "header_row": header_row,
+        "header": [" ".join(str(value).split()).casefold() for value in header[:n_cols]],
+        "n_cols": n_cols,
+    }
+
+
+def layout_fingerprint(top_rows, sheet_name=0, header_row=1):
+    """
+    Hash of layout_signature, or None when there is no signature.
+    """
+    signature = layout_signature(top_rows, sheet_name, header_row)
+    if signature is None:
+        return None
+    return combine_fingerprints("layout", *signature.items())
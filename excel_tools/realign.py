@@ -0,0 +1,49 @@
+"""
+Array-based row realignment for sheets converted from PDF.
+"""
+
+# Import Libraries
+import numpy as np
+import pandas as pd
+
+
+def realign_left(df, n_cols=None, infer=True):
+    """
+    Shift the non-empty values in every row to the left, in order.
+
+    Works on the whole object block at once and gives the same result as
+    applying a per-row realign with df.apply(..., axis=1).
+
+    Parameters:
+    - df: DataFrame to realign.
+    - n_cols: Number of columns to keep from the left. (optional)
+    - infer: Infer the column types of the result. When realigning a sheet
+      in pieces, pass False and infer once on the joined result, since
+      types inferred piece by piece can differ from the whole.
+
+    Returns:
+    - Realigned DataFrame with the original index and column names.
+    """
+    columns = df.columns if n_cols is None else df.columns[:n_cols]
+
+    if df.empty:
+        return df.loc[:, columns].copy()
+
+    values = df.to_numpy(dtype=object)
+    present = ~pd.isna(values)
+
+    # Target column for each value is the count of values before it
+    target = np.cumsum(present, axis=1) - 1
+    rows, cols = np.nonzero(present)
+    target = target[rows, cols]
+
+    keep = target < len(columns)
+    rows, cols, target = rows[keep], cols[keep], target[keep]
+
+    aligned = np.full((len(df), len(columns)), None, dtype=object)
+    aligned[rows, target] = values[rows, cols]
+
+    if not infer:
+        # dtype=object, or the constructor turns all-date columns into datetimes
+        return pd.DataFrame(aligned, index=df.index, columns=columns, dtype=object)
+    return pd.DataFrame(aligned, index=df.index, columns=columns).infer_objects()
@@ -0,0 +1,152 @@
+"""
+Saved cleaning recipes.
+
+A recipe records the clean_excel options picked in the General App's
+cleaning wizard as JSON, so a recurring vendor layout can be cleaned
+again in one step. Replaying a recipe compiles it with plan_clean and
+runs the plan directly, skipping the wizard.
+
+A recipe can also hold the layout fingerprint of the file it was made
+from, so find_recipe can pick it for a new upload with the same layout.
+"""
+
+# Import Libraries
+import inspect
+import json
+from pathlib import Path
+
+from .clean import clean_excel, plan_clean, run_plan
+from .layout import layout_fingerprint, layout_scan_rows
+
+# Bumped when the recipe format changes
+RECIPE_VERSION = 1
+
+# clean_excel options a recipe can hold, with their defaults
+RECIPE_OPTIONS = {
+    name: parameter.default
+    for name, parameter in inspect.signature(clean_excel).parameters.items()
+    if name != "file"
+}
+
+
+def make_recipe(name="", layout=None, **options):
+    """
+    Build a recipe from clean_excel options. Options left out use the
+    clean_excel defaults.
+
+    Parameters:
+    - name: Label for the recipe, for example the vendor. (optional)
+    - layout: Layout fingerprint of the file the recipe was made for. (optional)
+    - options: clean_excel keyword arguments.
+    """
+    unknown = sorted(set(options) - set(RECIPE_OPTIONS))
+    if unknown:
+        raise ValueError(f"Unknown recipe options: {unknown}")
+
+    return {
+        "version": RECIPE_VERSION,
+        "name": name,
+        "layout": layout,
+        "options": {**RECIPE_OPTIONS, **options},
+    }
+
+
+def recipe_to_json(recipe):
+    """
+    Serialize a recipe to JSON text.
+    """
+    return json.dumps(recipe, indent=2)
+
+
+def recipe_from_json(text):
+    """
+    Read a recipe from JSON text (str or bytes), checking its version and
+    options.
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Recipe is not valid JSON: {e}") from e
+
+    if not isinstance(data, dict) or not isinstance(data.get("options"), dict):
+        raise ValueError("Recipe must be a JSON object with an 'options' object")
+    if data.get("version") != RECIPE_VERSION:
+        raise ValueError(f"Unsupported recipe version {data.get('version')!r}")
+
+    return make_recipe(data.get("name", ""), data.get("layout"), **data["options"])
+
+
+def save_recipe(recipe, path):
+    """
+    Write a recipe to a JSON file.
+    """
+    Path(path).write_text(recipe_to_json(recipe), encoding="utf-8")
+
+
+def load_recipe(path):
+    """
+    Read a recipe from a JSON file.
+    """
+    return recipe_from_json(Path(path).read_text(encoding="utf-8"))
+
+
+def load_recipe_folder(folder):
+    """
+    Read every recipe (*.json) in a folder, sorted by file name.
+    """
+    return [load_recipe(path) for path in sorted(Path(folder).glob("*.json"))]
+
+
+def recipe_layout(top_rows, recipe):
+    """
+    Layout fingerprint of an upload, seen from the recipe's sheet and
+    header row.
+
+    Parameters:
+    - top_rows: Result of scan_layout for the upload.
+    - recipe: Recipe to check.
+    """
+    options = recipe["options"]
+    return layout_fingerprint(top_rows, options["sheet_name"], options["header_row_guess"])
+
+
+def recipe_scan_rows(recipes):
+    """
+    Rows scan_layout must read so find_recipe sees the header row of
+    every recipe.
+    """
+    return layout_scan_rows(*(recipe["options"]["header_row_guess"] for recipe in recipes))
+
+
+def find_recipe(top_rows, recipes):
+    """
+    The first recipe whose saved layout matches the upload, or None.
+
+    Parameters:
+    - top_rows: Result of scan_layout for the upload, reading at least
+      recipe_scan_rows(recipes) rows.
+    - recipes: Recipes to choose from.
+    """
+    for recipe in recipes:
+        if recipe.get("layout") and recipe_layout(top_rows, recipe) == recipe["layout"]:
+            return recipe
+    return None
+
+
+def compile_recipe(recipe):
+    """
+    Compile a recipe into a plan for run_plan. Bad options are reported
+    here, before any file is read.
+    """
+    return plan_clean(**recipe["options"])
+
+
+def apply_recipe(file, recipe):
+    """
+    Clean an Excel file with a recipe.
+
+    Parameters:
+    - file: Uploaded file, file-like object or path.
+    - recipe: Recipe from make_recipe or load_recipe.
+    """
+    return run_plan(file, compile_recipe(recipe))
@@ -0,0 +1,155 @@
+"""
+Stage-level memoization for the cleaning pipeline.
+
+Each stage result is cached under a key built from the upstream stage's
+key, the stage name and the stage's own options. Changing a late option
+therefore reuses every earlier stage's output.
+
+Every consumer (cleaning stages, table views, the sheet preview, layout
+scans) has its own cache, bounded by the size of the results it holds,
+so paging through one large table cannot evict the cleaning stages.
+"""
+
+# Import Libraries
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Bytes of results kept in memory by each cache
+STAGE_CACHE_BYTES = {
+    "clean": 512 * 1024 * 1024,
+    "view": 64 * 1024 * 1024,
+    "preview": 32 * 1024 * 1024,
+    "layout": 16 * 1024 * 1024,
+}
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class SizedCache:
+    """
+    Least recently used cache bounded by the total size of its values.
+    Values larger than the whole budget are not kept.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = value_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def value_size(value):
+    """
+    Approximate bytes held by a cached result: frames and arrays by their
+    data, containers by their items.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(value_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            value_size(key) + value_size(item) for key, item in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+def stage_cache(cache="clean"):
+    """
+    The cache with this name, created with its STAGE_CACHE_BYTES budget
+    on first use.
+    """
+    with _caches_lock:
+        if cache not in _caches:
+            _caches[cache] = SizedCache(STAGE_CACHE_BYTES[cache])
+        return _caches[cache]
+
+
+def freeze(value):
+    """
+    Turn lists, sets and dicts into hashable tuples for use in cache keys.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(freeze(v) for v in value))
+    return value
+
+
+_missing = object()
+
+
+def cached_stage(name, func, upstream_key, upstream, cache="clean", **options):
+    """
+    Run func(upstream, **options) once per upstream key and option set.
+
+    Parameters:
+    - name: Stage name, part of the cache key.
+    - func: Stage function. It must not modify upstream in place.
+    - upstream_key: Key of the stage (or file) that produced upstream.
+    - upstream: Input passed to func.
+    - cache: Name of the cache to use (a key of STAGE_CACHE_BYTES).
+    - options: Stage options, passed to func and used in the key.
+
+    Returns:
+    - (key, result): The key for this stage's output and the output. The
+      output is shared with later calls and must not be modified.
+    """
+    key = (upstream_key, name, freeze(options))
+    results = stage_cache(cache)
+
+    result = results.get(key, _missing)
+    if result is _missing:
+        result = func(upstream, **options)
+        results.put(key, result)
+
+    return key, result
+
+
+def clear_stage_cache(cache=None):
+    """
+    Drop every result in one cache, or in all of them.
+    """
+    with _caches_lock:
+        caches = list(_caches.values()) if cache is None else [_caches.get(cache)]
+    for results in filter(None, caches):
+        results.clear()
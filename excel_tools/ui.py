@@ -0,0 +1,95 @@
+"""
+Streamlit widgets shared by the pages.
+
+This is the only module of the package that imports Streamlit. It is not
+re-exported from excel_tools, so batch jobs and worker processes that
+import the package never load Streamlit; the pages import it directly.
+"""
+
+# Import Libraries
+import streamlit as st
+
+from .export import EXPORT_FORMATS
+from .viewer import VIEW_PAGE_SIZE, cached_view_positions, page_count, view_window
+
+
+def download_on_demand(label, fingerprint, build, file_name, key):
+    """
+    Build an export only when the user asks for it, then offer it for
+    download. The bytes of each format are kept until the fingerprint
+    changes, so other reruns and switching back to a format already
+    prepared skip the export entirely.
+
+    Parameters:
+    - label: Label of the download button.
+    - fingerprint: Identity of the data being exported.
+    - build: Function taking a format from EXPORT_FORMATS and returning
+      the file bytes and extension.
+    - file_name: Name of the downloaded file, without extension.
+    - key: Unique widget key.
+    """
+    fmt = st.selectbox(
+        "Download format",
+        list(EXPORT_FORMATS),
+        format_func=EXPORT_FORMATS.get,
+        key=f"{key}_format",
+    )
+
+    # Prepared (bytes, extension) per format, for the current fingerprint only
+    prepared_key = f"{key}_prepared"
+    prepared_for, prepared = st.session_state.get(prepared_key, (None, {}))
+    if prepared_for != fingerprint:
+        prepared = {}
+        st.session_state[prepared_key] = (fingerprint, prepared)
+
+    if fmt not in prepared:
+        if not st.button(f"⚙️ Prepare {file_name}", key=f"{key}_prepare"):
+            return
+        with st.spinner("Preparing download..."):
+            prepared[fmt] = build(fmt)
+
+    data, extension = prepared[fmt]
+    st.download_button(label, data=data, file_name=f"{file_name}{extension}", key=key)
+
+
+def show_frame(df, key, fingerprint=None):
+    """
+    Show a DataFrame one page at a time. Filtering, sorting and paging
+    run on the server, so only the visible rows are sent to the browser.
+
+    Parameters:
+    - df: DataFrame to show.
+    - key: Unique widget key prefix.
+    - fingerprint: Identity of df, used to cache the row order. (optional)
+    """
+    filter_col, sort_col, order_col, page_col = st.columns([3, 2, 1, 1])
+
+    query = filter_col.text_input(
+        "Filter rows",
+        key=f"{key}_filter",
+        placeholder="Text to search for in any column",
+    )
+    sort_column = sort_col.selectbox(
+        "Sort by",
+        [None, *range(df.shape[1])],
+        format_func=lambda i: "Original order" if i is None else str(df.columns[i]),
+        key=f"{key}_sort",
+    )
+    descending = order_col.toggle("Descending", key=f"{key}_descending")
+
+    positions = cached_view_positions(fingerprint, df, query, sort_column, descending)
+
+    # Keep the page in range when the filter shrinks the result
+    n_pages = page_count(len(positions))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+    page = page_col.number_input("Page", min_value=1, max_value=n_pages, key=page_key)
+
+    st.dataframe(view_window(df, positions, page), hide_index=True)
+
+    start = (page - 1) * VIEW_PAGE_SIZE
+    shown = f"Rows {min(start + 1, len(positions))}-{min(start + VIEW_PAGE_SIZE, len(positions))} of {len(positions)}"
+    if len(positions) != len(df):
+        shown += f" (filtered from {len(df)})"
+    st.caption(shown)
@@ -0,0 +1,105 @@
+"""
+Server-side paging, sorting and filtering for large result tables.
+
+The pages only send one window of rows to the browser. The row order for
+a given filter and sort is computed once and kept in the "view" stage
+cache, keyed on the frame's fingerprint, so turning pages costs a slice.
+"""
+
+# Import Libraries
+import numpy as np
+import pandas as pd
+
+from .stages import cached_stage
+
+# Rows shown per page
+VIEW_PAGE_SIZE = 100
+
+
+def filter_mask(df, query):
+    """
+    Rows where any cell contains query, ignoring case.
+
+    Each distinct value in a column is only converted to text and
+    searched once.
+    """
+    needle = query.casefold()
+    mask = np.zeros(len(df), dtype=bool)
+    for position in range(df.shape[1]):
+        codes, uniques = pd.factorize(df.iloc[:, position], use_na_sentinel=True)
+        if len(uniques) == 0:
+            continue
+        hits = np.fromiter(
+            (needle in str(value).casefold() for value in uniques),
+            dtype=bool,
+            count=len(uniques),
+        )
+        mask |= (codes >= 0) & hits[codes]
+    return mask
+
+
+def sort_positions(values, positions, descending=False):
+    """
+    Reorder row positions by values, keeping ties stable and missing
+    values last. Columns that mix types are sorted by their text.
+    """
+    column = pd.Series(values.to_numpy()[positions], index=positions)
+    try:
+        ordered = column.sort_values(ascending=not descending, kind="stable", na_position="last")
+    except TypeError:
+        text = column.astype(str).where(column.notna(), None)
+        ordered = text.sort_values(ascending=not descending, kind="stable", na_position="last")
+    return ordered.index.to_numpy()
+
+
+def view_positions(df, query=None, sort_column=None, descending=False):
+    """
+    Row positions of df to show, after filtering and sorting.
+
+    Parameters:
+    - df: DataFrame being viewed.
+    - query: Text to search for in any cell. (optional)
+    - sort_column: 0-based position of the column to sort by. (optional)
+    - descending: Sort from largest to smallest.
+    """
+    positions = np.arange(len(df))
+    if query:
+        positions = positions[filter_mask(df, query)]
+    if sort_column is not None:
+        positions = sort_positions(df.iloc[:, sort_column], positions, descending)
+    return positions
+
+
+def cached_view_positions(fingerprint, df, query=None, sort_column=None, descending=False):
+    """
+    view_positions, cached on the frame fingerprint and view options.
+    Without a fingerprint the order is computed every time.
+    """
+    if fingerprint is None:
+        return view_positions(df, query, sort_column, descending)
+
+    _, positions = cached_stage(
+        "view", view_positions, fingerprint, df,
+        cache="view",
+        query=query or None,
+        sort_column=sort_column,
+        descending=descending,
+    )
+    return positions
+
+
+def page_count(n_rows, page_size=VIEW_PAGE_SIZE):
+    """
+    Number of pages needed for n_rows, at least one.
+    """
+    return max(1, -(-n_rows // page_size))
+
+
+def view_window(df, positions, page=1, page_size=VIEW_PAGE_SIZE):
+    """
+    The rows of df on a 1-based page of positions. Pages out of range
+    show the first or last page.
+    """
+    page = min(max(page, 1), page_count(len(positions), page_size))
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
@@ -0,0 +1,516 @@
+"""
+Single-pass workbook loading.
+
+Each upload is parsed once into a raw cell grid (the same values pandas
+would read) and cached by a hash of the file content, so the sheet picker,
+preview, footer trim and cleaning all share one parse.
+"""
+
+# Import Libraries
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from openpyxl.utils import column_index_from_string
+from pandas.io.parsers import TextParser
+
+# openpyxl's worksheet XML parser is private; without it rows are read
+# through the public iter_rows instead (see worksheet_rows)
+try:
+    from openpyxl.worksheet._reader import WorkSheetParser
+except ImportError:
+    WorkSheetParser = None
+
+# Number of parsed workbooks kept in memory
+GRID_CACHE_SIZE = 8
+
+_grid_cache = OrderedDict()
+_grid_cache_lock = threading.Lock()
+
+
+def file_bytes(file):
+    """
+    Return the raw bytes of an uploaded file, file-like object or path.
+    """
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    if hasattr(file, "read"):
+        file.seek(0)
+        data = file.read()
+        file.seek(0)
+        return data
+    with open(file, "rb") as f:
+        return f.read()
+
+
+def content_hash(data):
+    """
+    Cheap, stable hash of file bytes used as the cache key.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_hash(file):
+    """
+    Content hash of an uploaded file, file-like object or path.
+    """
+    return content_hash(file_bytes(file))
+
+
+def convert_value(value, data_type):
+    """
+    Convert a raw cell value the same way pandas does when reading Excel.
+    """
+    if value is None:
+        return ""
+    elif data_type == TYPE_ERROR:
+        return np.nan
+    elif data_type == TYPE_NUMERIC:
+        val = int(value)
+        if val == value:
+            return val
+        return float(value)
+
+    return value
+
+
+def convert_cell(cell):
+    """
+    Convert an openpyxl cell the same way pandas does when reading Excel.
+    """
+    return convert_value(cell.value, cell.data_type)
+
+
+if WorkSheetParser is not None:
+
+    class WindowParser(WorkSheetParser):
+        """
+        Worksheet parser that skips cells outside a row and column window
+        before converting them, so unused cells cost almost nothing.
+        """
+
+        def __init__(self, *args, first_row=1, first_col=1, last_col=None, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.first_row = first_row
+            self.first_col = first_col
+            self.last_col = last_col
+
+        def parse_cell(self, element):
+            if self.row_counter < self.first_row:
+                return None
+
+            coordinate = element.get("r")
+            if coordinate:
+                column = column_index_from_string(coordinate.rstrip("0123456789"))
+            else:
+                column = self.col_counter + 1
+
+            if column < self.first_col or (self.last_col is not None and column > self.last_col):
+                self.col_counter = column
+                return None
+
+            return super().parse_cell(element)
+
+else:
+    WindowParser = None
+
+
+def trim_row(row):
+    """
+    A row without its trailing empty cells.
+    """
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+def pad_rows(rows):
+    """
+    Drop trailing empty rows and pad the rest to a common width.
+    """
+    trimmed = []
+    last_row_with_data = -1
+    for row_number, row in enumerate(rows):
+        row = trim_row(row)
+        if row:
+            last_row_with_data = row_number
+        trimmed.append(row)
+
+    trimmed = trimmed[: last_row_with_data + 1]
+
+    if trimmed:
+        max_width = max(len(row) for row in trimmed)
+        trimmed = [row + [""] * (max_width - len(row)) for row in trimmed]
+
+    return trimmed
+
+
+def parse_workbook(data):
+    """
+    Parse workbook bytes into {sheet_name: rows}, keeping sheet order.
+    """
+    wb = openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True, keep_links=False)
+    try:
+        grid = {}
+        for ws in wb.worksheets:
+            ws.reset_dimensions()
+            grid[ws.title] = pad_rows(
+                [convert_cell(cell) for cell in row] for row in ws.rows
+            )
+        return grid
+    finally:
+        wb.close()
+
+
+def load_workbook_grid(file):
+    """
+    Load every sheet of an Excel file as a raw cell grid, parsing each
+    distinct upload only once.
+
+    Parameters:
+    - file: Uploaded file, file-like object or path.
+
+    Returns:
+    - Dict of sheet name to a list of rows. Empty cells are "".
+      The grid is shared between callers and must not be modified.
+    """
+    data = file_bytes(file)
+    key = content_hash(data)
+
+    with _grid_cache_lock:
+        if key in _grid_cache:
+            _grid_cache.move_to_end(key)
+            return _grid_cache[key]
+
+    grid = parse_workbook(data)
+
+    with _grid_cache_lock:
+        _grid_cache[key] = grid
+        while len(_grid_cache) > GRID_CACHE_SIZE:
+            _grid_cache.popitem(last=False)
+
+    return grid
+
+
+def cached_workbook_grid(file):
+    """
+    Return the cached grid for this upload, or None if it was never parsed.
+    """
+    key = file_hash(file)
+    with _grid_cache_lock:
+        return _grid_cache.get(key)
+
+
+def window_parser(wb, ws, source, first_row, first_col, last_col):
+    """
+    A WindowParser over a worksheet's XML source, or None when the
+    installed openpyxl lacks the private reader internals it is built on.
+    """
+    if WindowParser is None:
+        return None
+    try:
+        # Same parser setup as openpyxl's read-only iter_rows
+        parser = WindowParser(
+            source,
+            ws._shared_strings,
+            data_only=wb.data_only,
+            epoch=wb.epoch,
+            date_formats=wb._date_formats,
+            timedelta_formats=wb._timedelta_formats,
+            first_row=first_row,
+            first_col=first_col,
+            last_col=last_col,
+        )
+    except (AttributeError, TypeError):
+        return None
+    if not (hasattr(parser, "row_counter") and hasattr(parser, "col_counter")):
+        return None
+    return parser
+
+
+def parsed_rows(parser, first_row, last_row, first_col):
+    """
+    Converted rows from a WindowParser, with missing rows filled in.
+    """
+    expected_row = first_row
+    for row_number, cells in parser.parse():
+        if last_row is not None and row_number > last_row:
+            break
+        if row_number < first_row:
+            continue
+
+        # Rows missing from the file are empty
+        for _ in range(expected_row, row_number):
+            yield []
+        expected_row = row_number + 1
+
+        cells = [cell for cell in cells if cell is not None]
+        width = max((cell["column"] for cell in cells), default=first_col - 1) - first_col + 1
+        values = [""] * width
+        for cell in cells:
+            values[cell["column"] - first_col] = convert_value(cell["value"], cell["data_type"])
+        yield trim_row(values)
+
+
+def worksheet_rows(wb, ws, first_row=1, last_row=None, first_col=1, last_col=None):
+    """
+    Stream converted rows from a worksheet of a read-only workbook that is
+    already open. See iter_sheet_rows for the parameters.
+
+    Cells outside the window are skipped before conversion when openpyxl's
+    reader internals are available; otherwise the same rows are read with
+    the public iter_rows. Trailing empty cells are dropped either way.
+    """
+    first_row = max(first_row, 1)
+    first_col = max(first_col, 1)
+
+    get_source = getattr(ws, "_get_source", None)
+    if WindowParser is not None and get_source is not None:
+        with get_source() as source:
+            parser = window_parser(wb, ws, source, first_row, first_col, last_col)
+            if parser is not None:
+                yield from parsed_rows(parser, first_row, last_row, first_col)
+                return
+
+    # Cells rather than values_only, so error cells still convert to NaN
+    ws.reset_dimensions()
+    for row in ws.iter_rows(min_row=first_row, max_row=last_row, min_col=first_col, max_col=last_col):
+        yield trim_row(convert_cell(cell) for cell in row)
+
+
+def iter_sheet_rows(file, sheet_name=0, first_row=1, last_row=None, first_col=1, last_col=None):
+    """
+    Stream converted rows from one sheet with openpyxl read-only iteration.
+
+    Reading stops at last_row, so rows below it are never parsed, and only
+    cells between first_col and last_col are converted.
+
+    Parameters:
+    - file: Uploaded file, file-like object or path.
+    - sheet_name: Sheet name or 0-based sheet position.
+    - first_row: 1-based first row to read.
+    - last_row: 1-based final row to read. (optional)
+    - first_col: 1-based first column to read.
+    - last_col: 1-based final column to read. (optional)
+    """
+    if hasattr(file, "seek"):
+        file.seek(0)
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True, keep_links=False)
+    try:
+        if isinstance(sheet_name, int):
+            ws = wb.worksheets[sheet_name]
+        else:
+            ws = wb[sheet_name]
+        yield from worksheet_rows(wb, ws, first_row, last_row, first_col, last_col)
+    finally:
+        wb.close()
+
+
+def read_top_rows(file, n_rows):
+    """
+    The first n_rows of every sheet, read in one pass over the workbook.
+    Rows further down are never parsed. A workbook that is already in the
+    grid cache is sliced in memory instead.
+
+    Returns:
+    - Dict of sheet name to rows, in sheet order. Empty cells are "".
+    """
+    grid = cached_workbook_grid(file)
+    if grid is not None:
+        return {name: pad_rows(rows[:n_rows]) for name, rows in grid.items()}
+
+    if hasattr(file, "seek"):
+        file.seek(0)
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True, keep_links=False)
+    try:
+        return {ws.title: pad_rows(worksheet_rows(wb, ws, last_row=n_rows)) for ws in wb.worksheets}
+    finally:
+        wb.close()
+
+
+def named_width(header):
+    """
+    Number of columns up to and including the last non-empty header cell.
+    """
+    width = len(header)
+    while width and header[width - 1] == "":
+        width -= 1
+    return width
+
+
+def skip_trailing_blank_rows(rows):
+    """
+    Pass rows through, holding back empty rows until a row with data
+    follows, so the empty rows at the end are left out.
+    """
+    blank = 0
+    for row in rows:
+        if not row:
+            blank += 1
+            continue
+        for _ in range(blank):
+            yield []
+        blank = 0
+        yield row
+
+
+def iter_sheet_window(file, sheet_name=0, header_row=1, last_row=None, first_col=1, last_col=None):
+    """
+    Stream the rows from header_row through last_row of one sheet, keeping
+    only the columns from first_col through last_col. Rows are not padded:
+    trailing empty cells and the empty rows at the end are left out.
+
+    The window never cuts through the header: every column with a header
+    name is kept, so column names and positions match a full-width read.
+
+    A workbook that is already in the grid cache is sliced in memory;
+    otherwise only the requested rows and columns are streamed from the file.
+    Both give the same rows.
+    """
+    first_col = max(first_col, 1)
+    grid = cached_workbook_grid(file)
+
+    if grid is not None:
+        rows = grid[resolve_sheet_name(grid, sheet_name)][max(header_row - 1, 0):last_row]
+        stop = None
+        if last_col is not None and rows:
+            stop = first_col - 1 + max(last_col - first_col + 1, named_width(rows[0][first_col - 1:]))
+        yield from skip_trailing_blank_rows(trim_row(row[first_col - 1:stop]) for row in rows)
+        return
+
+    yield from skip_trailing_blank_rows(
+        stream_window(file, sheet_name, header_row, last_row, first_col, last_col)
+    )
+
+
+def stream_window(file, sheet_name, header_row, last_row, first_col, last_col):
+    """
+    The rows of iter_sheet_window, streamed from the file.
+    """
+    if last_col is None:
+        yield from iter_sheet_rows(
+            file, sheet_name, first_row=header_row, last_row=last_row, first_col=first_col,
+        )
+        return
+
+    # Size the window from the header before streaming the data rows
+    header = next(iter_sheet_rows(
+        file, sheet_name, first_row=header_row, last_row=header_row, first_col=first_col,
+    ), [])
+    last_col = max(last_col, first_col + named_width(header) - 1)
+    yield header[:last_col - first_col + 1]
+    if last_row is not None and last_row <= header_row:
+        return
+
+    yield from iter_sheet_rows(
+        file, sheet_name, first_row=header_row + 1, last_row=last_row,
+        first_col=first_col, last_col=last_col,
+    )
+
+
+def read_sheet_window(file, sheet_name=0, header_row=1, last_row=None, first_col=1, last_col=None):
+    """
+    Read the rows from header_row through last_row of one sheet, keeping
+    only the columns from first_col through last_col (see iter_sheet_window).
+
+    Returns:
+    - Rows padded to the width of the window, ready for grid_to_frame.
+    """
+    return pad_rows(iter_sheet_window(file, sheet_name, header_row, last_row, first_col, last_col))
+
+
+def read_sheet_page(file, sheet_name=0, header_row=1, nrows=100, offset=0):
+    """
+    A page of data rows below the header as a DataFrame, the same frame
+    grid_to_frame builds from the full grid with nrows and offset.
+
+    Only rows down to the end of the page are read, and only the rows
+    down to the header and the page itself are kept, so a preview of a
+    very large sheet costs the rows on screen.
+
+    Parameters:
+    - file: Uploaded file, file-like object or path.
+    - sheet_name: Sheet name or 0-based sheet position.
+    - header_row: 1-based row holding the column headers.
+    - nrows: Number of data rows on the page.
+    - offset: Number of data rows to skip below the header.
+    """
+    header_row = max(header_row, 1)
+    first = header_row + offset
+    rows = iter_sheet_window(file, sheet_name, header_row=1, last_row=first + nrows)
+
+    # Rows above the header size the columns, as in pd.read_excel
+    window = [row for number, row in enumerate(rows, start=1) if number <= header_row or number > first]
+    return grid_to_frame(window, header_row=header_row, nrows=nrows)
+
+
+def count_sheet_rows(file, sheet_name=0):
+    """
+    Number of rows in one sheet, down to its last row.
+
+    Exact for a workbook in the grid cache. Otherwise it is read from the
+    sheet's dimension record, without parsing any rows; that record can
+    include formatted empty rows at the end. Sheets without one are
+    counted by streaming them.
+    """
+    grid = cached_workbook_grid(file)
+    if grid is not None:
+        return len(grid[resolve_sheet_name(grid, sheet_name)])
+
+    if hasattr(file, "seek"):
+        file.seek(0)
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        if ws.max_row is not None:
+            return ws.max_row
+    finally:
+        wb.close()
+
+    return sum(1 for _ in iter_sheet_window(file, sheet_name))
+
+
+def resolve_sheet_name(grid, sheet_name=0):
+    """
+    Accept a sheet name or a 0-based sheet position and return the name.
+    """
+    if isinstance(sheet_name, int):
+        return list(grid)[sheet_name]
+    if sheet_name not in grid:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    return sheet_name
+
+
+def grid_to_frame(rows, header_row=1, last_row=None, nrows=None, offset=0):
+    """
+    Build a DataFrame from a sheet grid, matching pd.read_excel.
+
+    Parameters:
+    - rows: Sheet grid from load_workbook_grid.
+    - header_row: 1-based row holding the column headers.
+    - last_row: 1-based final row to keep. (optional)
+    - nrows: Number of data rows to read below the header. (optional)
+    - offset: Number of data rows to skip below the header, for paging.
+    """
+    start = max(header_row - 1, 0)
+    first = start + 1 + offset
+    stop = last_row
+    if nrows is not None:
+        stop = first + nrows if stop is None else min(stop, first + nrows)
+
+    window = rows[start:start + 1] + rows[first:stop]
+    if nrows is not None:
+        # pandas only sizes the columns from the rows it actually read
+        window = pad_rows(rows[:start + 1] + rows[first:stop])[start:]
+
+    if not window:
+        return pd.DataFrame()
+
+    parser = TextParser(window, header=0, skip_blank_lines=False)
+    return parser.read()
@@ -0,0 +1,312 @@
+"""
+Minimal streaming xlsx writer.
+
+Rows are formatted straight into the sheet XML and written into the zip
+archive as they are produced, so memory stays flat no matter how many rows
+are exported. Only what the exports need is supported: one header row,
+inline strings, numbers, booleans and dates.
+"""
+
+# Import Libraries
+import datetime
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+import pandas as pd
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.datetime import to_excel
+
+from .dates import is_date_only
+
+# Cell style ids, matching the cellXfs order in STYLES_XML
+STYLE_HEADER = 1
+STYLE_DATE = 2
+STYLE_DATETIME = 3
+
+# Rows formatted per write to the archive
+WRITE_BATCH_ROWS = 2_000
+
+# Characters that are not allowed in XML 1.0
+ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+EXCEL_EPOCH = np.datetime64("1899-12-30")
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "{sheets}"
+    "</Types>"
+)
+
+CONTENT_TYPE_SHEET = (
+    '<Override PartName="/xl/worksheets/sheet{number}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+
+WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    "<sheets>{sheets}</sheets>"
+    "</workbook>"
+)
+
+WORKBOOK_SHEET = '<sheet name={name} sheetId="{number}" r:id="rId{number}"/>'
+
+WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    "{sheets}"
+    '<Relationship Id="rId{styles}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    "</Relationships>"
+)
+
+WORKBOOK_RELS_SHEET = (
+    '<Relationship Id="rId{number}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{number}.xml"/>'
+)
+
+# Default, header (bold, thin border, centered like pandas), date, datetime
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="YYYY-MM-DD"/>'
+    '<numFmt numFmtId="165" formatCode="YYYY-MM-DD HH:MM:SS"/>'
+    "</numFmts>"
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    "</fonts>"
+    '<fills count="2">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    "</fills>"
+    '<borders count="2">'
+    "<border><left/><right/><top/><bottom/><diagonal/></border>"
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/>'
+    '<bottom style="thin"/><diagonal/></border>'
+    "</borders>"
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" '
+    'applyFont="1" applyBorder="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="top"/></xf>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    "</cellXfs>"
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+
+SHEET_END = "</sheetData></worksheet>"
+
+
+def string_cell(ref, text, style=0):
+    """
+    Inline string cell.
+    """
+    text = escape(ILLEGAL_XML_CHARS.sub("", text))
+    style_attr = f' s="{style}"' if style else ""
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def number_cell(ref, number, style=0):
+    """
+    Numeric cell. Infinite values are written as text, like pandas does.
+    """
+    if np.isinf(number):
+        return string_cell(ref, "inf" if number > 0 else "-inf", style)
+    style_attr = f' s="{style}"' if style else ""
+    return f'<c r="{ref}"{style_attr}><v>{number!r}</v></c>'
+
+
+def value_cell(ref, value, style=0):
+    """
+    Cell XML for a single Python value, or "" for a missing value.
+    """
+    if value is None or value is pd.NaT or value is pd.NA:
+        return ""
+    if isinstance(value, (bool, np.bool_)):
+        style_attr = f' s="{style}"' if style else ""
+        return f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return number_cell(ref, int(value), style)
+    if isinstance(value, (float, np.floating)):
+        if np.isnan(value):
+            return ""
+        return number_cell(ref, float(value), style)
+    if isinstance(value, datetime.datetime):
+        return number_cell(ref, float(to_excel(value)), style or STYLE_DATETIME)
+    if isinstance(value, datetime.date):
+        return number_cell(ref, float(to_excel(value)), style or STYLE_DATE)
+    if isinstance(value, datetime.time):
+        # pandas writes times as text
+        return string_cell(ref, str(value), style)
+    if isinstance(value, datetime.timedelta):
+        return number_cell(ref, float(to_excel(value)), style)
+    return string_cell(ref, str(value), style)
+
+
+def column_cells(values, letter, first_row, style=0, date_only=False):
+    """
+    Cell XML for one column of a batch of rows.
+
+    Numeric, boolean and datetime64 columns are formatted in one pass;
+    everything else is formatted value by value. Date-only datetime64
+    columns get the date format instead of date and time.
+    """
+    refs = [f"{letter}{row}" for row in range(first_row, first_row + len(values))]
+    style_attr = f' s="{style}"' if style else ""
+
+    if pd.api.types.is_bool_dtype(values) and not values.hasnans:
+        return [f'<c r="{ref}"{style_attr} t="b"><v>{int(v)}</v></c>' for ref, v in zip(refs, values)]
+
+    if pd.api.types.is_datetime64_dtype(values):
+        serials = (values.to_numpy() - EXCEL_EPOCH) / np.timedelta64(1, "D")
+        # Serials before March 1900 need Excel's leap year correction
+        date_style = style or (STYLE_DATE if date_only else STYLE_DATETIME)
+        if values.min() < pd.Timestamp("1900-03-01"):
+            return [value_cell(ref, v, date_style) for ref, v in zip(refs, values.astype(object))]
+        datetime_attr = f' s="{date_style}"'
+        return [
+            "" if np.isnan(v) else f'<c r="{ref}"{datetime_attr}><v>{v!r}</v></c>'
+            for ref, v in zip(refs, serials.tolist())
+        ]
+
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_extension_array_dtype(values):
+        if pd.api.types.is_float_dtype(values) and np.isinf(values.to_numpy()).any():
+            return [value_cell(ref, v, style) for ref, v in zip(refs, values.tolist())]
+        return [
+            "" if v != v else f'<c r="{ref}"{style_attr}><v>{v!r}</v></c>'
+            for ref, v in zip(refs, values.tolist())
+        ]
+
+    return [value_cell(ref, v, style) for ref, v in zip(refs, values.astype(object))]
+
+
+def sheet_rows_xml(df, index=False, first_row=2, date_only=()):
+    """
+    XML for the data rows of df, starting at first_row. date_only holds
+    the positions of date-only datetime64 columns.
+    """
+    columns = []
+    offset = 1
+    if index:
+        columns.append(column_cells(df.index.to_series(), "A", first_row, STYLE_HEADER))
+        offset = 2
+    for position in range(df.shape[1]):
+        letter = get_column_letter(position + offset)
+        columns.append(column_cells(
+            df.iloc[:, position], letter, first_row, date_only=position in date_only,
+        ))
+
+    rows = []
+    for number, cells in enumerate(zip(*columns), start=first_row):
+        rows.append(f'<row r="{number}">{"".join(cells)}</row>')
+    return "".join(rows)
+
+
+def header_cell(ref, label):
+    """
+    Cell XML for one header label. Numbers and booleans keep their type,
+    as in the pandas engine; anything else is written as text.
+    """
+    if isinstance(label, (bool, np.bool_, int, np.integer, float, np.floating)):
+        return value_cell(ref, label, STYLE_HEADER)
+    if label == "":
+        return ""
+    return string_cell(ref, str(label), STYLE_HEADER)
+
+
+def header_xml(df, index=False):
+    """
+    XML for the bold header row.
+    """
+    labels = list(df.columns)
+    if index:
+        labels.insert(0, "" if df.index.name is None else df.index.name)
+
+    cells = [
+        header_cell(f"{get_column_letter(position)}1", label)
+        for position, label in enumerate(labels, start=1)
+    ]
+    return f'<row r="1">{"".join(cells)}</row>'
+
+
+def write_sheet(archive, path, df, index=False):
+    """
+    Stream one DataFrame into the archive as a worksheet.
+    """
+    date_only = {
+        position for position in range(df.shape[1])
+        if pd.api.types.is_datetime64_dtype(df.iloc[:, position])
+        and is_date_only(df.iloc[:, position])
+    }
+
+    with archive.open(path, "w", force_zip64=True) as part:
+        part.write(SHEET_START.encode("utf-8"))
+        part.write(header_xml(df, index).encode("utf-8"))
+        for start in range(0, len(df), WRITE_BATCH_ROWS):
+            batch = df.iloc[start:start + WRITE_BATCH_ROWS]
+            part.write(sheet_rows_xml(batch, index, start + 2, date_only).encode("utf-8"))
+        part.write(SHEET_END.encode("utf-8"))
+
+
+def write_xlsx(sheets, output, index=()):
+    """
+    Write DataFrames to an xlsx file, one sheet each, streaming the rows.
+
+    Parameters:
+    - sheets: Dict of sheet name to DataFrame, in sheet order.
+    - output: Path or writable binary file-like object.
+    - index: Names of the sheets that also get the DataFrame index.
+    """
+    names = list(sheets)
+
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES_XML.format(
+            sheets="".join(CONTENT_TYPE_SHEET.format(number=n) for n in range(1, len(names) + 1)),
+        ))
+        archive.writestr("_rels/.rels", ROOT_RELS_XML)
+        archive.writestr("xl/workbook.xml", WORKBOOK_XML.format(
+            sheets="".join(
+                WORKBOOK_SHEET.format(name=quoteattr(name), number=n)
+                for n, name in enumerate(names, start=1)
+            ),
+        ))
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS_XML.format(
+            sheets="".join(WORKBOOK_RELS_SHEET.format(number=n) for n in range(1, len(names) + 1)),
+            styles=len(names) + 1,
+        ))
+        archive.writestr("xl/styles.xml", STYLES_XML)
+
+        for n, name in enumerate(names, start=1):
+            write_sheet(archive, f"xl/worksheets/sheet{n}.xml", sheets[name], index=name in index)
@@ -1,10 +1,34 @@
 # Import Libraries 
 import streamlit as st
 import pandas as pd
-import openpyxl
-import string
-import re
-from io import BytesIO
+from pathlib import Path
+
+from excel_tools import (
+    CHUNKED_UPLOAD_BYTES,
+    LAYOUT_SCAN_ROWS,
+    VIEW_PAGE_SIZE,
+    cached_stage,
+    clean_excel,
+    clean_excel_chunked,
+    combine_fingerprints,
+    compare_dfs,
+    count_sheet_rows,
+    export_frames,
+    export_report,
+    file_hash,
+    find_recipe,
+    frame_fingerprint,
+    layout_fingerprint,
+    layout_scan_rows,
+    make_recipe,
+    page_count,
+    read_sheet_page,
+    recipe_from_json,
+    recipe_scan_rows,
+    recipe_to_json,
+    scan_layout,
+)
+from excel_tools.ui import download_on_demand, show_frame
 
 # -----------------------------
 # Page setup
@@ -18,352 +42,86 @@ st.set_page_config(
 # -----------------------------
 # Core functions
 # -----------------------------
-@st.cache_data
-def clean_excel(
-    file,
-    header_row_guess=1,
-    sheet_name=0,
-    date_col=None,
-    date_format=None,
-    date_fill_method='ffill',
-    track_date_fill=False,
-    drop_keywords=None,
-    realign=True,
-    n_cols=None,
-    skip_last_rows=False, 
-    skip_num=0,
-    start_col_letter=None,
-    fill_cols=None,
-    fill_methods='ffill',
-    track_fill=False
-):
+def preview_stage(file, sheet_name, header_row, page):
     """
-    Clean and preprocess an Excel sheet with flexible options.
+    One page of the sheet below the chosen header row. Only the rows down
+    to the end of the page are read from the upload, so previewing a very
+    large sheet never parses or holds the whole workbook.
     """
-
-    # Change letter input to index
-    def col_letter_to_index(letter):
-        letter = letter.upper()
-        num = 0
-        for c in letter:
-            if c in string.ascii_uppercase:
-                num = num * 26 + (ord(c) - ord('A')) + 1
-            else:
-                raise ValueError(f"Invalid column letter: {letter}")
-        return num - 1
-
-    # Crop rows at bottom at the row listed in skip_num
-    if skip_last_rows:
-        xls = pd.ExcelFile(file)
-        if isinstance(sheet_name, int):
-            sheet_name = xls.sheet_names[sheet_name]
-        wb = openpyxl.load_workbook(file, read_only=True)
-        ws = wb[sheet_name]
-        total_rows = ws.max_row
-
-        skipfooter = total_rows - skip_num
-        df = pd.read_excel(file, sheet_name=sheet_name, skiprows=header_row_guess - 1, skipfooter=skipfooter)
-    else:
-        df = pd.read_excel(file, sheet_name=sheet_name, skiprows=header_row_guess - 1)
-
-    # Drop columns before specified letter
-    if start_col_letter is not None:
-        start_idx = col_letter_to_index(start_col_letter)
-        df = df.iloc[:, start_idx:]
-
-    # Clean up column headers
-    df.columns = (
-        df.columns.astype(str)
-        .str.strip()
-        .str.replace(r'\s+', ' ', regex=True)
-        .str.replace(r'\xa0|\t', ' ', regex=True)
+    return read_sheet_page(
+        file,
+        sheet_name,
+        header_row=header_row,
+        nrows=VIEW_PAGE_SIZE,
+        offset=(page - 1) * VIEW_PAGE_SIZE,
     )
 
-    # Remove unnecessary additional columns "Unnamed"
-    column_names = df.columns.tolist()
-    filtered_columns = [col for col in column_names if "Unnamed" not in col]
-
-    # Map column names to lower for safe matching
-    col_map = {col.lower(): col for col in df.columns}
-
-    # Drop rows with keywords
-    if drop_keywords:
-        safe_keywords = [re.escape(str(k)) for k in drop_keywords]
-        pattern = '|'.join(safe_keywords)
-        df = df[~df.apply(lambda row: row.astype(str).str.contains(pattern, case=False, na=False)).any(axis=1)]
-
-    df = df.dropna(how='all')
-
-    # Handle fill_cols
-    if fill_cols:
-        # If user gives a single string, make it a list
-        if isinstance(fill_cols, str):
-            fill_cols = [fill_cols]
-    
-        # Normalize fill_methods: ensure it's a dict with lowercase keys
-        if not isinstance(fill_methods, dict):
-            fill_methods = {col.lower(): fill_methods for col in fill_cols}
-        else:
-            # Also normalize keys if user passed dict directly
-            fill_methods = {col.lower(): method for col, method in fill_methods.items()}
-
-        for col in fill_cols:
-            col_lower = col.lower()
-            if col_lower not in col_map:
-                raise ValueError(f"fill_col '{col}' not found in columns: {df.columns.tolist()}")
-            
-            real_col = col_map[col_lower]
-            method = fill_methods.get(col_lower, 'ffill')
-
-            # Save missing mask before fill
-            if track_fill:
-                was_na = df[real_col].isna()
-
-            # bfill, ffill, or str based on user input
-            if method == 'ffill':
-                df[real_col] = df[real_col].ffill()
-            elif method == 'bfill':
-                df[real_col] = df[real_col].bfill()
-            elif isinstance(method, (int, float, str)):
-                df[real_col] = df[real_col].fillna(method)
-            else:
-                raise ValueError(
-                    f"Invalid fill_method '{method}' for column '{col}'. "
-                    "Use 'ffill', 'bfill', or a literal value."
-                )
-
-            # Add indicator column if requested
-            if track_fill:
-                filled_col_name = f"{real_col}_filled"
-                insert_pos = df.columns.get_loc(filtered_columns[-1]) + 1
-                fill_values = was_na & df[real_col].notna()
-                df.insert(insert_pos, filled_col_name, fill_values)
-                filtered_columns.append(filled_col_name)
-
-    # Handle date_col or auto-detect
-    real_date_col = None
-    cleaned_cols_lower = [col.lower().strip() for col in df.columns]
-
-    if date_col:
-        if date_col.lower().strip() in cleaned_cols_lower:
-            idx = cleaned_cols_lower.index(date_col.lower().strip())
-            real_date_col = df.columns[idx]
-        else:
-            raise ValueError(f"date_col '{date_col}' not found.")
-    else:
-        # Auto detect
-        possible_date_cols = [col for col in df.columns if 'date' in col.lower()]
-        scores = {}
-        for col in possible_date_cols:
-            try:
-                parsed = pd.to_datetime(df[col], format=date_format, errors='coerce').dt.date
-                scores[col] = parsed.notna().sum()
-            except Exception:
-                continue
-        if scores:
-            best_col = max(scores, key=scores.get)
-            if scores[best_col] > 0:
-                real_date_col = best_col
-
-    # Then process date column if found
-    if real_date_col:
-
-        # Make a boolean marker before filling
-        if track_date_fill:
-            was_na = df[real_date_col].isna()
-
-        # Fill dates with chosen method
-        if date_fill_method == 'ffill':
-            df[real_date_col] = df[real_date_col].ffill()
-        elif date_fill_method == 'bfill':
-            df[real_date_col] = df[real_date_col].bfill()
-        else:
-            raise ValueError(f"Invalid date_fill_method '{date_fill_method}'")
-
-        # Add marker column if requested
-        if track_date_fill:
-            marker_col_name = f"{real_date_col}_was_{date_fill_method}ed"
-            insert_pos = df.columns.get_loc(filtered_columns[-1]) + 1
-            fill_values = was_na & df[real_date_col].notna()
-            df.insert(insert_pos, marker_col_name, fill_values)
-            filtered_columns.append(marker_col_name)
-
-        # Parse and clean
-        df[real_date_col] = pd.to_datetime(df[real_date_col], format=date_format, errors='coerce').dt.date
-        df = df.dropna(subset=[real_date_col]).reset_index(drop=True)
-
-    # Realign rows to the left if true
-    if realign:
-        def realign_row(row):
-            non_empty = row.dropna().values
-            aligned = pd.Series([None] * len(df.columns), index=df.columns, dtype=object)
-            aligned[:len(non_empty)] = non_empty
-            return aligned
-
-        df = df.apply(realign_row, axis=1)
-
-    # Adjust n_cols if tracking columns were added
-    extra_cols = 0
-    if track_fill and fill_cols:
-        extra_cols += len(fill_cols)
-    if track_date_fill and real_date_col:
-        extra_cols += 1
-
-    # Drop columns after specified number 
-    if n_cols is not None:
-        df = df.iloc[:, :n_cols + extra_cols]
-
-    df.columns = filtered_columns[-len(df.columns):]
-    df = df.reset_index(drop=True)
-
-    return df
-
 @st.cache_data
-def compare_dfs(
-    excel_1,
-    pair1,
-    excel_2,
-    pair2,
-    compare1=None,
-    compare2=None,
-    case_insensitive_match=True,
-):
-    """
-    Generalized Excel comparison function.
-    """
+def cached_clean_excel(file, **options):
+    # Very large uploads are cleaned in chunks to keep memory bounded
+    if file.size >= CHUNKED_UPLOAD_BYTES:
+        return clean_excel_chunked(file, **options)
+    return clean_excel(file, **options)
 
-    # Work on copies so original DataFrames aren't modified
-    excel_1 = excel_1.copy()
-    excel_2 = excel_2.copy()
-
-    def resolve_column(df, name):
-        lower_map = {col.lower(): col for col in df.columns}
-        name_lower = name.lower()
-        if name_lower not in lower_map:
-            raise ValueError(f"Column '{name}' not found in DataFrame columns: {list(df.columns)}")
-        return lower_map[name_lower]
-
-    def resolve_column_list(df, names):
-        return [resolve_column(df, name) for name in names]
-
-    # Normalize column names
-    pair1 = resolve_column(excel_1, pair1)
-    pair2 = resolve_column(excel_2, pair2)
-
-    # Convert single column to list
-    if isinstance(compare1, str):
-        compare1 = [compare1]
-    if isinstance(compare2, str):
-        compare2 = [compare2]
-
-    if (compare1 is None) != (compare2 is None):
-        raise ValueError("Both compare1 and compare2 must be provided together, or not at all.")
-    if compare1 and compare2:
-        if not isinstance(compare1, list) or not isinstance(compare2, list):
-            raise TypeError("compare1 and compare2 must be lists.")
-        if len(compare1) != len(compare2):
-            raise ValueError("compare1 and compare2 must be the same length.")
-
-        compare1 = resolve_column_list(excel_1, compare1)
-        compare2 = resolve_column_list(excel_2, compare2)
-
-    # Create comparison keys
-    if case_insensitive_match:
-        excel_1['_key'] = excel_1[pair1].astype(str).str.lower()
-        excel_2['_key'] = excel_2[pair2].astype(str).str.lower()
-    else:
-        excel_1['_key'] = excel_1[pair1].astype(str)
-        excel_2['_key'] = excel_2[pair2].astype(str)
-
-    # Find unmatched rows
-    filter1 = excel_1['_key'].isin(excel_2['_key'])
-    missing_from_excel_2 = excel_1[~filter1]
-
-    filter2 = excel_2['_key'].isin(excel_1['_key'])
-    missing_from_excel_1 = excel_2[~filter2]
-
-    # Build unique key list
-    id_list = set(excel_1['_key']).union(set(excel_2['_key']))
-    diff_qty = {}
-    combined_list = []
-
-    for key in id_list:
-        row_1 = excel_1[excel_1['_key'] == key]
-        row_2 = excel_2[excel_2['_key'] == key]
-
-        if row_1.empty or row_2.empty:
-            combined_list.append(key)
-            continue
-
-        if compare1 and compare2:
-            for col1, col2 in zip(compare1, compare2):
-                val1 = row_1.iloc[0][col1]
-                val2 = row_2.iloc[0][col2]
-
-                val1_norm = val1.strip().lower() if isinstance(val1, str) else val1
-                val2_norm = val2.strip().lower() if isinstance(val2, str) else val2
-
-                if pd.isnull(val1_norm) and pd.isnull(val2_norm):
-                    continue
-                if val1_norm != val2_norm:
-                    original_id = row_1.iloc[0][pair1]  # report original value
-                    if original_id not in diff_qty:
-                        diff_qty[original_id] = {}
-                    diff_qty[original_id][f"{col1} vs {col2}"] = [val1, val2]
-
-    # Build tidy mismatch DataFrame
-    if diff_qty:
-        records = []
-        for key, mismatches in diff_qty.items():
-            for col_pair, values in mismatches.items():
-                col1_name, col2_name = col_pair.split(" vs ")
-                val1, val2 = values
-                records.append({
-                    "ID": key,
-                    "Column (Excel 1 | Excel2)": f"{col1_name} | {col2_name}",
-                    "Excel 1": val1,
-                    "Excel 2": val2
-                })
-        diff_qty_df = pd.DataFrame(records)
-        diff_qty_df.sort_values(by=["ID", "Column (Excel 1 | Excel2)"], inplace=True)
-    else:
-        diff_qty_df = pd.DataFrame()
-
-    # Convert unmatched keys to original IDs
-    original_ids = []
-    for key in combined_list:
-        match = excel_1[excel_1['_key'] == key]
-        if not match.empty:
-            original_ids.append(match.iloc[0][pair1])
-        else:
-            match = excel_2[excel_2['_key'] == key]
-            original_ids.append(match.iloc[0][pair2])
-
-    combo = pd.DataFrame(original_ids, columns=['Missing list']).sort_values(
-        by='Missing list', ascending=False
-    )
-
-    # Cleanup original DataFrames (copies)
-    excel_1.drop(columns=['_key'], inplace=True, errors='ignore')
-    excel_2.drop(columns=['_key'], inplace=True, errors='ignore')
-    
-    # Also remove _key from the return values
-    missing_from_excel_1 = missing_from_excel_1.drop(columns=['_key'], errors='ignore')
-    missing_from_excel_2 = missing_from_excel_2.drop(columns=['_key'], errors='ignore')
+# -----------------------------
+# Fingerprint-keyed caches
+# -----------------------------
+# DataFrames are passed as underscore arguments, which Streamlit does not
+# hash. The cache is keyed on the fingerprints stored in session state.
+@st.cache_data(show_spinner=False)
+def cached_compare_dfs(fingerprint_1, fingerprint_2, _excel_1, _excel_2, **options):
+    return compare_dfs(_excel_1, excel_2=_excel_2, **options)
 
-    return missing_from_excel_1, missing_from_excel_2, diff_qty_df, combo
+@st.cache_data(show_spinner=False)
+def cached_export(fingerprint, fmt, _df):
+    return export_frames({'Sheet1': _df}, fmt)
 
-@st.cache_data
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Sheet1')
-    processed_data = output.getvalue()
-    return processed_data
+@st.cache_data(show_spinner=False)
+def cached_comparison_report(fingerprint, fmt, _frames):
+    return export_report(_frames, fmt)
 
 # -----------------------------
 # Reusable cleaning UI section
 # -----------------------------
+def upload_layout(file, scan_rows=LAYOUT_SCAN_ROWS):
+    """
+    Top rows of every sheet of an upload. Enough for the sheet picker and
+    for matching saved recipes, without parsing the whole workbook.
+    Cached per upload and row count, so only the first call reads the file.
+    """
+    _, top_rows = cached_stage(
+        "layout", scan_layout, file_hash(file), file,
+        cache="layout",
+        scan_rows=scan_rows,
+    )
+    return top_rows
+
+def store_cleaned(state_prefix, cleaned_df, recipe, upload_key, auto=False):
+    """
+    Keep a cleaned DataFrame and the recipe that produced it, then rerun
+    the whole page to collapse the setup expander, show the final df
+    neatly and let the comparison see it.
+
+    Recipes with a layout go into the session's recipe library, so later
+    uploads with the same layout are recognized. upload_key marks the
+    upload as handled, so it is not cleaned automatically again.
+    """
+    st.session_state[f"{state_prefix}_cleaned_df"] = cleaned_df
+    st.session_state[f"df_{state_prefix}"] = cleaned_df
+    st.session_state[f"{state_prefix}_fingerprint"] = frame_fingerprint(cleaned_df)
+    st.session_state[f"{state_prefix}_recipe"] = recipe
+    st.session_state[f"{state_prefix}_auto_recipe"] = auto
+    st.session_state[f"{state_prefix}_layout_checked"] = upload_key
+    st.session_state[f"{state_prefix}_config_expanded"] = False
+
+    if recipe.get("layout"):
+        st.session_state.setdefault("recipe_library", {})[recipe_to_json(recipe)] = recipe
+
+    try:
+        st.rerun()
+    except AttributeError:
+        pass
+
 def excel_cleaning_section(section_title: str, state_prefix: str):
     """
     Render the interactive cleaning UI for one Excel file.
@@ -375,6 +133,7 @@ def excel_cleaning_section(section_title: str, state_prefix: str):
     # Initialize per-section state
     config_key = f"{state_prefix}_config_expanded"
     cleaned_key = f"{state_prefix}_cleaned_df"
+    fingerprint_key = f"{state_prefix}_fingerprint"
 
     if config_key not in st.session_state:
         st.session_state[config_key] = True
@@ -408,23 +167,34 @@ def excel_cleaning_section(section_title: str, state_prefix: str):
         )
 
         if uploaded_file_clean is not None:
-            try:
-                df_clean = pd.read_excel(uploaded_file_clean)
-            except Exception as e:
-                st.error(f"Could not read the Excel file: {e}")
-                return st.session_state[cleaned_key]
+            # Only read the file again when a different file is uploaded
+            fingerprint = combine_fingerprints("direct", file_hash(uploaded_file_clean))
+            if st.session_state.get(fingerprint_key) != fingerprint:
+                try:
+                    df_clean = pd.read_excel(uploaded_file_clean)
+                except Exception as e:
+                    st.error(f"Could not read the Excel file: {e}")
+                    return st.session_state[cleaned_key]
+
+                st.session_state[cleaned_key] = df_clean
+                st.session_state[f"df_{state_prefix}"] = df_clean
+                st.session_state[fingerprint_key] = fingerprint
+                st.session_state[f"{state_prefix}_recipe"] = None
+                st.session_state[f"{state_prefix}_auto_recipe"] = False
+
+                # Rerun the whole page so the comparison sees the new file
+                st.rerun()
 
-            st.session_state[cleaned_key] = df_clean
-            st.session_state[f"df_{state_prefix}"] = df_clean
+            df_clean = st.session_state[cleaned_key]
 
             st.success("Here is your DataFrame:")
-            st.dataframe(df_clean.reset_index(drop=True), hide_index=True)
+            show_frame(df_clean, f"view_{state_prefix}", fingerprint)
 
-            excel_bytes = to_excel(df_clean)
-            st.download_button(
+            download_on_demand(
                 f"📥 Download Excel for {section_title}",
-                data=excel_bytes,
-                file_name=f"cleaned_{state_prefix}.xlsx",
+                fingerprint,
+                lambda fmt: cached_export(fingerprint, fmt, df_clean),
+                file_name=f"cleaned_{state_prefix}",
                 key=f"download_clean_{state_prefix}",
             )
         else:
@@ -449,340 +219,461 @@ def excel_cleaning_section(section_title: str, state_prefix: str):
             st.info("Upload an Excel file to get started.")
             return st.session_state[cleaned_key]
 
+        # Known layouts: saved recipes are matched to the upload by layout
+        recipe_files = st.file_uploader(
+            "Optional: load saved cleaning recipes (.json)",
+            type=["json"],
+            accept_multiple_files=True,
+            key=f"recipe_file_{state_prefix}",
+        )
+        library = st.session_state.setdefault("recipe_library", {})
+        for recipe_file in recipe_files or []:
+            try:
+                recipe = recipe_from_json(recipe_file.getvalue())
+            except ValueError as e:
+                st.error(f"Could not read the recipe {recipe_file.name}: {e}")
+            else:
+                library[recipe_to_json(recipe)] = recipe
+
+        if library:
+            recipes = list(library.values())
+            upload_key = file_hash(uploaded_file)
+            matched = find_recipe(upload_layout(uploaded_file, recipe_scan_rows(recipes)), recipes)
+
+            auto_apply = st.toggle(
+                "Clean known layouts automatically",
+                value=True,
+                key=f"auto_recipe_{state_prefix}",
+                help="When the upload has the same layout as a saved recipe, clean it with that recipe right away.",
+            )
+            if (
+                matched is not None
+                and auto_apply
+                and st.session_state.get(f"{state_prefix}_layout_checked") != upload_key
+            ):
+                with st.spinner(f"Cleaning with the saved recipe '{matched['name']}'..."):
+                    try:
+                        cleaned_df = cached_clean_excel(uploaded_file, **matched["options"])
+                    except Exception as e:
+                        st.error(f"Something went wrong while cleaning with the recipe: {e}")
+                        st.session_state[f"{state_prefix}_layout_checked"] = upload_key
+                    else:
+                        store_cleaned(state_prefix, cleaned_df, matched, upload_key, auto=True)
+
+            recipe_choice = st.selectbox(
+                "Saved recipe",
+                range(len(recipes)),
+                index=recipes.index(matched) if matched is not None else 0,
+                format_func=lambda i: recipes[i]["name"] or f"Recipe {i + 1}",
+                key=f"recipe_choice_{state_prefix}",
+            )
+            if matched is not None:
+                st.caption(f"This upload matches the layout of the recipe '{matched['name']}'.")
+            if st.button("▶️ Clean with this recipe", key=f"run_recipe_{state_prefix}"):
+                recipe = recipes[recipe_choice]
+                with st.spinner("Cleaning Excel..."):
+                    try:
+                        cleaned_df = cached_clean_excel(uploaded_file, **recipe["options"])
+                    except Exception as e:
+                        st.error(f"Something went wrong while cleaning with the recipe: {e}")
+                        return st.session_state[cleaned_key]
+                store_cleaned(state_prefix, cleaned_df, recipe, upload_key)
+
         # Step 1: sheet
         try:
-            xls = pd.ExcelFile(uploaded_file)
-            sheet_name = st.selectbox(
-                "Which sheet should be cleaned?",
-                xls.sheet_names,
-                key=f"sheet_{state_prefix}",
-            )
+            sheet_names = list(upload_layout(uploaded_file))
         except Exception as e:
             st.error(f"Could not read sheet names: {e}")
             return st.session_state[cleaned_key]
 
-        st.markdown("#### Step 1: What is wrong with this sheet?")
-        st.caption(
-            "Check everything that applies. The app will only ask follow-up questions for the items you select."
-        )
-
-        issue_options = [
-            "Header row is not on row 1",
-            "Skip extra rows at the bottom",
-            "Start from a specific column letter (drop left-side junk)",
-            "There is a date column to clean/standardize",
-            "Drop rows containing certain keywords",
-            "Limit to first N columns",
-            "Fill missing values in non-date columns",
-            "Track which values were filled",
-            "Track which dates were filled",
-            "Do NOT realign rows (keep original alignment)",
-        ]
-
-        issues = st.multiselect(
-            "Select all that apply:",
-            options=issue_options,
-            default=[],
-            key=f"issues_{state_prefix}",
-        )
-
-        # Step 2: header row
-        st.markdown("#### Step 2: Header row")
-        st.caption(
-            "Tell the app where the column headers are. "
-            "If they are already on the first row of the sheet, leave this as 1."
-        )
-
-        header_row_guess = st.number_input(
-            "Which row contains the column headers? (1-based)",
-            min_value=1,
-            value=1,
-            step=1,
-            key=f"header_row_{state_prefix}",
+        # In batched mode the options below live in a form: nothing reruns
+        # until "Apply options" or "Run cleaning" is pressed
+        batched = st.toggle(
+            "Apply options in one batch",
+            value=True,
+            key=f"batched_{state_prefix}",
+            help=(
+                "Edit all options first and apply them together. "
+                "Turn off to update the preview and follow-up questions after every change."
+            ),
         )
+        options_box = st.form(f"clean_options_{state_prefix}", border=False) if batched else st.container()
 
-        # Realign rows?
-        realign = "Do NOT realign rows (keep original alignment)" not in issues
-
-        # Step 3: preview
-        st.markdown("#### Step 3: Preview")
-
-        st.markdown(
-            """
-**How to use this preview**
-
-- **Tip:** When answering questions about the row number or column number, it is usually best to look at the **original Excel file instead of the preview** for the most accurate numbers. 
-- If a **date column** shows anything other than dates (for example rows with words like `Totals`, `Grand Totals`, or other notes), you can:
-  - Remove those rows later using **Drop rows by keywords** in Step 4, or  
-  - Enforce a specific **date format** in the **Date column options** so that non-date values become empty and get dropped.
-  - You may have to **go back to the previous step** to add those options in the drop down menu if they were not previously selected.
-- You can **ignore any `Unnamed:` columns** in this preview. Those extra columns will be cleaned up later in the process.
-- **Any blank cells** in columns you want to **keep** must be filled with something for the cleaning process. Select **Fill missing values in non-date columns** from the menu if you need to fill these values. 
-- The preview is mainly for:
-  1. Confirming you picked the correct **header row**, and  
-  2. Spot-checking that the **date column**, other column values, and headings look reasonable with no obvious junk or missing values.
-"""
-        )
+        with options_box:
+            sheet_name = st.selectbox(
+                "Which sheet should be cleaned?",
+                sheet_names,
+                key=f"sheet_{state_prefix}",
+            )
 
-        columns_preview = []
-        show_preview = st.checkbox(
-            "Show preview using this header row",
-            key=f"show_preview_{state_prefix}",
-        )
+            st.markdown("#### Step 1: What is wrong with this sheet?")
+            st.caption(
+                "Check everything that applies. The app will only ask follow-up questions for the items you select."
+            )
 
-        if show_preview:
-            try:
-                preview_df = pd.read_excel(
-                    uploaded_file,
-                    sheet_name=sheet_name,
-                    skiprows=header_row_guess - 1,
-                    nrows=100,
-                )
-                st.caption("Preview (first ~100 rows) using the chosen header row:")
-                st.dataframe(preview_df.reset_index(drop=True), hide_index=True)
-                columns_preview = list(preview_df.columns)
-            except Exception as e:
-                st.error(f"Could not preview the sheet with these settings: {e}")
-                columns_preview = []
-        else:
-            st.info(
-                "After setting the header row, you can turn on the preview checkbox above "
-                "to see a sample of the data."
+            issue_options = [
+                "Header row is not on row 1",
+                "Skip extra rows at the bottom",
+                "Start from a specific column letter (drop left-side junk)",
+                "There is a date column to clean/standardize",
+                "Drop rows containing certain keywords",
+                "Limit to first N columns",
+                "Fill missing values in non-date columns",
+                "Track which values were filled",
+                "Track which dates were filled",
+                "Do NOT realign rows (keep original alignment)",
+            ]
+
+            issues = st.multiselect(
+                "Select all that apply:",
+                options=issue_options,
+                default=[],
+                key=f"issues_{state_prefix}",
             )
 
-        # Defaults for options
-        date_col = None
-        date_format = None
-        date_fill_method = "ffill"
-        track_date_fill = False
-        drop_keywords_list = None
-        n_cols = None
-        skip_last_rows = False
-        skip_num = 0
-        start_col_letter = None
-        fill_cols_list = None
-        fill_methods_arg = None
-        track_fill = False
-
-        # 4a. Extra rows at bottom
-        if "Skip extra rows at the bottom" in issues:
-            st.markdown("##### Skip extra rows at the bottom")
+            # Step 2: header row
+            st.markdown("#### Step 2: Header row")
             st.caption(
-                "Use this if there are totals, notes, or other rows after the useful data."
+                "Tell the app where the column headers are. "
+                "If they are already on the first row of the sheet, leave this as 1."
             )
-            skip_num = st.number_input(
-                "What is the final row number you want to KEEP in the sheet?",
+
+            header_row_guess = st.number_input(
+                "Which row contains the column headers? (1-based)",
                 min_value=1,
+                value=1,
                 step=1,
-                help="For example, if the useful data ends on row 200, enter 200.",
-                key=f"skip_num_{state_prefix}",
+                key=f"header_row_{state_prefix}",
             )
-            skip_last_rows = True
-
-        # 4b. Start from specific column letter
-        if "Start from a specific column letter (drop left-side junk)" in issues:
-            st.markdown("##### Start from a specific column letter")
-            start_col_letter = st.text_input(
-                "Enter column letter to start from (for example C, D, or F)",
-                max_chars=1,
-                help="Columns before this will be dropped.",
-                key=f"start_col_{state_prefix}",
-            ) or None
-
-        # 4c. Date column handling
-        if "There is a date column to clean/standardize" in issues:
-            st.markdown("##### Date column options")
-
-            # Choose date column via dropdown if preview is available
-            if columns_preview:
-                date_col_choice = st.selectbox(
-                    "Which column is the date column?",
-                    options=["Auto-detect from columns"] + columns_preview,
-                    index=0,
-                    key=f"date_col_choice_{state_prefix}",
-                    help="Choose a column or let the function try to auto-detect one with 'date' in its name.",
-                )
-                if date_col_choice != "Auto-detect from columns":
-                    date_col = date_col_choice
-                else:
-                    date_col = None
-            else:
-                date_col = st.text_input(
-                    "Date column name (or leave blank to auto-detect)",
-                    help="This should exactly match the column name after preview cleaning.",
-                    key=f"date_col_text_{state_prefix}",
-                ) or None
 
-            # Date format dropdown
-            st.caption(
-                """
-If the date column contains text like `Totals`, `Grand Totals`, or other non-date values, you have two tools:
+            # Realign rows?
+            realign = "Do NOT realign rows (keep original alignment)" not in issues
 
-1. **Drop rows by keywords** (in a later section) to remove those rows completely.
-2. **Force a specific date format** here. Any value that doesn't match this format will be coerced to an empty date, and those rows can then be safely dropped.
+            # Step 3: preview
+            st.markdown("#### Step 3: Preview")
 
-If you leave this as **“Let pandas infer from the data”**, the app will try its best automatically. If the column is very messy, manually selecting the correct format is usually more reliable.
-"""
+            st.markdown(
+                """
+    **How to use this preview**
+
+    - **Tip:** When answering questions about the row number or column number, it is usually best to look at the **original Excel file instead of the preview** for the most accurate numbers. 
+    - If a **date column** shows anything other than dates (for example rows with words like `Totals`, `Grand Totals`, or other notes), you can:
+      - Remove those rows later using **Drop rows by keywords** in Step 4, or  
+      - Enforce a specific **date format** in the **Date column options** so that non-date values become empty and get dropped.
+      - You may have to **go back to the previous step** to add those options in the drop down menu if they were not previously selected.
+    - You can **ignore any `Unnamed:` columns** in this preview. Those extra columns will be cleaned up later in the process.
+    - **Any blank cells** in columns you want to **keep** must be filled with something for the cleaning process. Select **Fill missing values in non-date columns** from the menu if you need to fill these values. 
+    - The preview is mainly for:
+      1. Confirming you picked the correct **header row**, and  
+      2. Spot-checking that the **date column**, other column values, and headings look reasonable with no obvious junk or missing values.
+    """
             )
-            date_format_choice = st.selectbox(
-                "Date format example",
-                options=[
-                    "Let pandas infer from the data",
-                    "2024-01-31 (YYYY-MM-DD)",
-                    "01/31/2024 (MM/DD/YYYY)",
-                    "31/01/2024 (DD/MM/YYYY)",
-                    "December 2, 2025 (Month D, YYYY)",
-                    "Custom format...",
-                ],
-                index=0,
-                key=f"date_format_choice_{state_prefix}",
+
+            columns_preview = []
+            show_preview = st.checkbox(
+                "Show preview using this header row",
+                key=f"show_preview_{state_prefix}",
             )
 
-            if date_format_choice == "Let pandas infer from the data":
-                date_format = None
-            elif date_format_choice == "2024-01-31 (YYYY-MM-DD)":
-                date_format = "%Y-%m-%d"
-            elif date_format_choice == "01/31/2024 (MM/DD/YYYY)":
-                date_format = "%m/%d/%Y"
-            elif date_format_choice == "31/01/2024 (DD/MM/YYYY)":
-                date_format = "%d/%m/%Y"
-            elif date_format_choice == "December 2, 2025 (Month D, YYYY)":
-                date_format = "%B %d, %Y"
+            if show_preview:
+                try:
+                    # Row count from the sheet's dimensions, cached per upload and sheet
+                    _, n_rows = cached_stage(
+                        "row_count", count_sheet_rows, file_hash(uploaded_file), uploaded_file,
+                        cache="preview",
+                        sheet_name=sheet_name,
+                    )
+                    n_below = max(n_rows - int(header_row_guess), 0)
+                    n_pages = page_count(n_below)
+
+                    # Keep the page in range when the header row moves down
+                    page_key = f"preview_page_{state_prefix}"
+                    if st.session_state.get(page_key, 1) > n_pages:
+                        st.session_state[page_key] = n_pages
+                    page = st.number_input(
+                        "Preview page",
+                        min_value=1,
+                        max_value=n_pages,
+                        key=page_key,
+                        help="When options are applied in one batch, press Apply options to turn the page.",
+                    )
+
+                    # Cached per upload, sheet, header row and page
+                    _, preview_df = cached_stage(
+                        "preview", preview_stage, file_hash(uploaded_file), uploaded_file,
+                        cache="preview",
+                        sheet_name=sheet_name,
+                        header_row=int(header_row_guess),
+                        page=int(page),
+                    )
+                    start = (page - 1) * VIEW_PAGE_SIZE
+                    shown = start + len(preview_df)
+                    st.caption(
+                        f"Preview of rows {min(start + 1, shown)}-{shown} "
+                        f"of {max(n_below, shown)} below the chosen header row:"
+                    )
+                    st.dataframe(preview_df.reset_index(drop=True), hide_index=True)
+                    columns_preview = list(preview_df.columns)
+                except Exception as e:
+                    st.error(f"Could not preview the sheet with these settings: {e}")
+                    columns_preview = []
+            else:
+                st.info(
+                    "After setting the header row, you can turn on the preview checkbox above "
+                    "to see a sample of the data."
+                )
+
+            # Defaults for options
+            date_col = None
+            date_format = None
+            date_fill_method = "ffill"
+            track_date_fill = False
+            drop_keywords_list = None
+            n_cols = None
+            skip_last_rows = False
+            skip_num = 0
+            start_col_letter = None
+            fill_cols_list = None
+            fill_methods_arg = None
+            track_fill = False
+
+            # 4a. Extra rows at bottom
+            if "Skip extra rows at the bottom" in issues:
+                st.markdown("##### Skip extra rows at the bottom")
                 st.caption(
-                    "⚠️ If your data has ordinals such as 'December 2nd 2025', "
-                    "it is usually better to choose 'Let pandas infer from the data' instead, "
-                    "because explicit formats cannot represent the 'nd' or 'th' parts."
+                    "Use this if there are totals, notes, or other rows after the useful data."
                 )
-            else:
-                custom_fmt = st.text_input(
-                    "Enter custom date format",
-                    placeholder="For example %Y/%m/%d or %d-%b-%Y",
-                    help=(
-                        "Use Python datetime format codes, such as %Y-%m-%d. "
-                        "You can find a reference in the Python documentation for strftime and strptime [here](https://docs.python.org/3/library/datetime.html#strftime-and-strptime-behavior)."
-                    ),
-                    key=f"custom_date_fmt_{state_prefix}",
+                skip_num = st.number_input(
+                    "What is the final row number you want to KEEP in the sheet?",
+                    min_value=1,
+                    step=1,
+                    help="For example, if the useful data ends on row 200, enter 200.",
+                    key=f"skip_num_{state_prefix}",
                 )
-                date_format = custom_fmt or None
+                skip_last_rows = True
+
+            # 4b. Start from specific column letter
+            if "Start from a specific column letter (drop left-side junk)" in issues:
+                st.markdown("##### Start from a specific column letter")
+                start_col_letter = st.text_input(
+                    "Enter column letter to start from (for example C, D, or F)",
+                    max_chars=1,
+                    help="Columns before this will be dropped.",
+                    key=f"start_col_{state_prefix}",
+                ) or None
 
-            date_fill_method = st.radio(
-                "How should missing dates be filled?",
-                options=["ffill", "bfill"],
-                horizontal=True,
-                key=f"date_fill_method_{state_prefix}",
-            )
+            # 4c. Date column handling
+            if "There is a date column to clean/standardize" in issues:
+                st.markdown("##### Date column options")
+
+                # Choose date column via dropdown if preview is available
+                if columns_preview:
+                    date_col_choice = st.selectbox(
+                        "Which column is the date column?",
+                        options=["Auto-detect from columns"] + columns_preview,
+                        index=0,
+                        key=f"date_col_choice_{state_prefix}",
+                        help="Choose a column or let the function try to auto-detect one with 'date' in its name.",
+                    )
+                    if date_col_choice != "Auto-detect from columns":
+                        date_col = date_col_choice
+                    else:
+                        date_col = None
+                else:
+                    date_col = st.text_input(
+                        "Date column name (or leave blank to auto-detect)",
+                        help="This should exactly match the column name after preview cleaning.",
+                        key=f"date_col_text_{state_prefix}",
+                    ) or None
 
-            st.caption(
-                """
-- **ffill** (forward fill) fills each empty date with the last non-empty date **above** it.  
-- **bfill** (backward fill) fills each empty date with the next non-empty date **below** it.
-"""
-            )
+                # Date format dropdown
+                st.caption(
+                    """
+    If the date column contains text like `Totals`, `Grand Totals`, or other non-date values, you have two tools:
 
-        # 4d. Track which dates were filled
-        if "Track which dates were filled" in issues:
-            track_date_fill = True
+    1. **Drop rows by keywords** (in a later section) to remove those rows completely.
+    2. **Force a specific date format** here. Any value that doesn't match this format will be coerced to an empty date, and those rows can then be safely dropped.
 
-        # 4e. Drop rows with keywords
-        if "Drop rows containing certain keywords" in issues:
-            st.markdown("##### Drop rows by keywords")
-            st.caption(
-                """
-Use this when the date column (or any other column) has extra rows such as subtotals, grand totals, notes, or headers.
+    If you leave this as **“Let pandas infer from the data”**, the app will try its best automatically. If the column is very messy, manually selecting the correct format is usually more reliable.
+    """
+                )
+                date_format_choice = st.selectbox(
+                    "Date format example",
+                    options=[
+                        "Let pandas infer from the data",
+                        "2024-01-31 (YYYY-MM-DD)",
+                        "01/31/2024 (MM/DD/YYYY)",
+                        "31/01/2024 (DD/MM/YYYY)",
+                        "December 2, 2025 (Month D, YYYY)",
+                        "Custom format...",
+                    ],
+                    index=0,
+                    key=f"date_format_choice_{state_prefix}",
+                )
 
-- Matching is **case-insensitive**.
-- The tool looks for the keyword **anywhere in the row**.
-- Typing just `totals` will remove rows containing **`Totals`**, **`Grand Totals`**, **`Project Totals`**, and similar phrases.
-"""
-            )
-            kw_text = st.text_area(
-                "Enter keywords to drop (comma-separated)",
-                placeholder="For example totals, notes, header",
-                key=f"drop_keywords_{state_prefix}",
-            )
-            drop_keywords_list = [
-                kw.strip() for kw in kw_text.split(",") if kw.strip()
-            ] or None
-
-        # 4f. Limit to first N columns
-        if "Limit to first N columns" in issues:
-            st.markdown("##### Limit to first N columns")
-            n_cols_val = st.number_input(
-                "How many columns do you want to keep from the left?",
-                min_value=1,
-                step=1,
-                key=f"n_cols_{state_prefix}",
-            )
-            n_cols = int(n_cols_val)
-
-        # 4g. Fill missing values in non-date columns
-        if "Fill missing values in non-date columns" in issues:
-            st.markdown("##### Fill missing values in non-date columns")
-
-            if columns_preview:
-                fill_cols_list = st.multiselect(
-                    "Which columns should be filled?",
-                    options=columns_preview,
-                    help="These columns will have missing values filled.",
-                    key=f"fill_cols_{state_prefix}",
+                if date_format_choice == "Let pandas infer from the data":
+                    date_format = None
+                elif date_format_choice == "2024-01-31 (YYYY-MM-DD)":
+                    date_format = "%Y-%m-%d"
+                elif date_format_choice == "01/31/2024 (MM/DD/YYYY)":
+                    date_format = "%m/%d/%Y"
+                elif date_format_choice == "31/01/2024 (DD/MM/YYYY)":
+                    date_format = "%d/%m/%Y"
+                elif date_format_choice == "December 2, 2025 (Month D, YYYY)":
+                    date_format = "%B %d, %Y"
+                    st.caption(
+                        "⚠️ If your data has ordinals such as 'December 2nd 2025', "
+                        "it is usually better to choose 'Let pandas infer from the data' instead, "
+                        "because explicit formats cannot represent the 'nd' or 'th' parts."
+                    )
+                else:
+                    custom_fmt = st.text_input(
+                        "Enter custom date format",
+                        placeholder="For example %Y/%m/%d or %d-%b-%Y",
+                        help=(
+                            "Use Python datetime format codes, such as %Y-%m-%d. "
+                            "You can find a reference in the Python documentation for strftime and strptime [here](https://docs.python.org/3/library/datetime.html#strftime-and-strptime-behavior)."
+                        ),
+                        key=f"custom_date_fmt_{state_prefix}",
+                    )
+                    date_format = custom_fmt or None
+
+                date_fill_method = st.radio(
+                    "How should missing dates be filled?",
+                    options=["ffill", "bfill"],
+                    horizontal=True,
+                    key=f"date_fill_method_{state_prefix}",
                 )
-            else:
-                cols_text = st.text_input(
-                    "Column names to fill (comma-separated)",
-                    placeholder="For example UNIT OF MEASURE, tax",
-                    key=f"fill_cols_text_{state_prefix}",
+
+                st.caption(
+                    """
+    - **ffill** (forward fill) fills each empty date with the last non-empty date **above** it.  
+    - **bfill** (backward fill) fills each empty date with the next non-empty date **below** it.
+    """
                 )
-                fill_cols_list = [
-                    c.strip() for c in cols_text.split(",") if c.strip()
-                ]
-
-            fill_methods_dict = {}
-
-            if fill_cols_list:
-                st.caption("Configure how each selected column should be filled.")
-                for col in fill_cols_list:
-                    with st.expander(f"Fill options for '{col}'", expanded=False):
-                        method_choice = st.radio(
-                            f"Method for '{col}'",
-                            options=[
-                                "Forward fill (ffill)",
-                                "Backward fill (bfill)",
-                                "Use a constant value",
-                            ],
-                            key=f"fill_method_{state_prefix}_{col}",
-                        )
 
-                        st.caption(
-                            """
-- **ffill** (forward fill) fills each empty cell with the last non-empty value **above** it.  
-- **bfill** (backward fill) fills each empty cell with the next non-empty value **below** it.
-"""
-                        )
+            # 4d. Track which dates were filled
+            if "Track which dates were filled" in issues:
+                track_date_fill = True
 
-                        if method_choice == "Forward fill (ffill)":
-                            fill_methods_dict[col] = "ffill"
-                        elif method_choice == "Backward fill (bfill)":
-                            fill_methods_dict[col] = "bfill"
-                        else:
-                            const_val = st.text_input(
-                                f"Constant value for '{col}'",
-                                key=f"fill_const_{state_prefix}_{col}",
-                                placeholder="For example Unknown, 0, or No",
+            # 4e. Drop rows with keywords
+            if "Drop rows containing certain keywords" in issues:
+                st.markdown("##### Drop rows by keywords")
+                st.caption(
+                    """
+    Use this when the date column (or any other column) has extra rows such as subtotals, grand totals, notes, or headers.
+
+    - Matching is **case-insensitive**.
+    - The tool looks for the keyword **anywhere in the row**.
+    - Typing just `totals` will remove rows containing **`Totals`**, **`Grand Totals`**, **`Project Totals`**, and similar phrases.
+    """
+                )
+                kw_text = st.text_area(
+                    "Enter keywords to drop (comma-separated)",
+                    placeholder="For example totals, notes, header",
+                    key=f"drop_keywords_{state_prefix}",
+                )
+                drop_keywords_list = [
+                    kw.strip() for kw in kw_text.split(",") if kw.strip()
+                ] or None
+
+            # 4f. Limit to first N columns
+            if "Limit to first N columns" in issues:
+                st.markdown("##### Limit to first N columns")
+                n_cols_val = st.number_input(
+                    "How many columns do you want to keep from the left?",
+                    min_value=1,
+                    step=1,
+                    key=f"n_cols_{state_prefix}",
+                )
+                n_cols = int(n_cols_val)
+
+            # 4g. Fill missing values in non-date columns
+            if "Fill missing values in non-date columns" in issues:
+                st.markdown("##### Fill missing values in non-date columns")
+
+                if columns_preview:
+                    fill_cols_list = st.multiselect(
+                        "Which columns should be filled?",
+                        options=columns_preview,
+                        help="These columns will have missing values filled.",
+                        key=f"fill_cols_{state_prefix}",
+                    )
+                else:
+                    cols_text = st.text_input(
+                        "Column names to fill (comma-separated)",
+                        placeholder="For example UNIT OF MEASURE, tax",
+                        key=f"fill_cols_text_{state_prefix}",
+                    )
+                    fill_cols_list = [
+                        c.strip() for c in cols_text.split(",") if c.strip()
+                    ]
+
+                fill_methods_dict = {}
+
+                if fill_cols_list:
+                    st.caption("Configure how each selected column should be filled.")
+                    for col in fill_cols_list:
+                        with st.expander(f"Fill options for '{col}'", expanded=False):
+                            method_choice = st.radio(
+                                f"Method for '{col}'",
+                                options=[
+                                    "Forward fill (ffill)",
+                                    "Backward fill (bfill)",
+                                    "Use a constant value",
+                                ],
+                                key=f"fill_method_{state_prefix}_{col}",
                             )
-                            fill_methods_dict[col] = const_val
 
-                fill_methods_arg = fill_methods_dict
+                            st.caption(
+                                """
+    - **ffill** (forward fill) fills each empty cell with the last non-empty value **above** it.  
+    - **bfill** (backward fill) fills each empty cell with the next non-empty value **below** it.
+    """
+                            )
 
-        # 4h. Track which non-date values were filled
-        if "Track which values were filled" in issues:
-            track_fill = True
+                            if method_choice == "Forward fill (ffill)":
+                                fill_methods_dict[col] = "ffill"
+                            elif method_choice == "Backward fill (bfill)":
+                                fill_methods_dict[col] = "bfill"
+                            else:
+                                const_val = st.text_input(
+                                    f"Constant value for '{col}'",
+                                    key=f"fill_const_{state_prefix}_{col}",
+                                    placeholder="For example Unknown, 0, or No",
+                                )
+                                fill_methods_dict[col] = const_val
+
+                    fill_methods_arg = fill_methods_dict
+
+            # 4h. Track which non-date values were filled
+            if "Track which values were filled" in issues:
+                track_fill = True
+
+            # Step 5: Run cleaning
+            st.markdown("----")
+            if batched:
+                st.caption(
+                    "Press **Apply options** to see the follow-up questions and preview "
+                    "for your choices, then **Run cleaning** when everything looks right."
+                )
+                st.form_submit_button("🔄 Apply options")
+                run_clean = st.form_submit_button(f"🚀 Run cleaning for {section_title}")
+            else:
+                run_clean = st.button(
+                    f"🚀 Run cleaning for {section_title}",
+                    key=f"run_clean_{state_prefix}",
+                )
 
-        # Step 5: Run cleaning
-        st.markdown("----")
-        run_clean = st.button(
-            f"🚀 Run cleaning for {section_title}",
-            key=f"run_clean_{state_prefix}",
-        )
+        # Follow-up questions only appear after the options are applied, so a
+        # run submitted together with new choices would use unseen defaults
+        layout = (tuple(issues), bool(show_preview))
+        layout_key = f"{state_prefix}_options_layout"
+        applied_layout = st.session_state.get(layout_key)
+        st.session_state[layout_key] = layout
+        if run_clean and batched and applied_layout != layout:
+            st.info("Your new choices change the questions above. Review them, then press Run cleaning again.")
+            run_clean = False
 
         if run_clean:
             if "Skip extra rows at the bottom" in issues and skip_last_rows and skip_num <= 0:
@@ -793,53 +684,79 @@ Use this when the date column (or any other column) has extra rows such as subto
                 st.error("You selected to fill missing values, but no columns were selected.")
                 return st.session_state[cleaned_key]
 
+            options = dict(
+                header_row_guess=int(header_row_guess),
+                sheet_name=sheet_name,
+                date_col=date_col,
+                date_format=date_format,
+                date_fill_method=date_fill_method,
+                track_date_fill=track_date_fill,
+                drop_keywords=drop_keywords_list,
+                realign=realign,
+                n_cols=n_cols,
+                skip_last_rows=skip_last_rows,
+                skip_num=int(skip_num),
+                start_col_letter=start_col_letter,
+                fill_cols=fill_cols_list,
+                fill_methods=fill_methods_arg if fill_methods_arg is not None else "ffill",
+                track_fill=track_fill,
+            )
+
             with st.spinner("Cleaning Excel..."):
                 try:
-                    cleaned_df = clean_excel(
-                        file=uploaded_file,
-                        header_row_guess=int(header_row_guess),
-                        sheet_name=sheet_name,
-                        date_col=date_col,
-                        date_format=date_format,
-                        date_fill_method=date_fill_method,
-                        track_date_fill=track_date_fill,
-                        drop_keywords=drop_keywords_list,
-                        realign=realign,
-                        n_cols=n_cols,
-                        skip_last_rows=skip_last_rows,
-                        skip_num=int(skip_num),
-                        start_col_letter=start_col_letter,
-                        fill_cols=fill_cols_list,
-                        fill_methods=fill_methods_arg if fill_methods_arg is not None else "ffill",
-                        track_fill=track_fill,
-                    )
+                    cleaned_df = cached_clean_excel(uploaded_file, **options)
                 except Exception as e:
                     st.error(f"Something went wrong while cleaning: {e}")
                     return st.session_state[cleaned_key]
 
-            st.session_state[cleaned_key] = cleaned_df
-            st.session_state[f"df_{state_prefix}"] = cleaned_df
-            st.session_state[config_key] = False
-
-            # Rerun to collapse the expander and show the final df neatly
-            try:
-                st.rerun()
-            except AttributeError:
-                pass
+            layout = layout_fingerprint(
+                upload_layout(uploaded_file, layout_scan_rows(header_row_guess)),
+                sheet_name,
+                int(header_row_guess),
+            )
+            recipe = make_recipe(Path(uploaded_file.name).stem, layout, **options)
+            store_cleaned(state_prefix, cleaned_df, recipe, file_hash(uploaded_file))
 
     # Outside the expander: show final df (if any)
     if st.session_state[cleaned_key] is not None:
         st.success(f"Here is your cleaned DataFrame for {section_title}:")
-        st.dataframe(st.session_state[cleaned_key].reset_index(drop=True), hide_index=True)
+        show_frame(
+            st.session_state[cleaned_key],
+            f"view_{state_prefix}",
+            st.session_state[fingerprint_key],
+        )
 
-        excel_bytes = to_excel(st.session_state[cleaned_key])
-        st.download_button(
+        fingerprint = st.session_state[fingerprint_key]
+        df_clean = st.session_state[cleaned_key]
+        download_on_demand(
             f"📥 Download cleaned Excel for {section_title}",
-            data=excel_bytes,
-            file_name=f"cleaned_{state_prefix}.xlsx",
+            fingerprint,
+            lambda fmt: cached_export(fingerprint, fmt, df_clean),
+            file_name=f"cleaned_{state_prefix}",
             key=f"download_cleaned_{state_prefix}",
         )
 
+        recipe = st.session_state.get(f"{state_prefix}_recipe")
+        if recipe is not None and st.session_state.get(f"{state_prefix}_auto_recipe"):
+            st.info(
+                f"This file has the same layout as the saved recipe '{recipe['name']}', "
+                "so it was cleaned with that recipe. Open the cleaning setup above to change the options."
+            )
+        if recipe is not None:
+            st.download_button(
+                "💾 Download cleaning recipe",
+                data=recipe_to_json(recipe),
+                file_name=f"{recipe['name'] or state_prefix}_recipe.json",
+                mime="application/json",
+                help="Load this file next time to clean the same layout in one click.",
+                key=f"download_recipe_{state_prefix}",
+            )
+            if not recipe.get("layout"):
+                st.caption(
+                    "The header row of this recipe is empty, so it cannot be matched to uploads "
+                    "automatically. Pick it under Saved recipe to use it."
+                )
+
     return st.session_state[cleaned_key]
 
 # -----------------------------
@@ -913,25 +830,28 @@ In this section, you can upload Excel files that need cleaning or files that are
 """
 )
 
-col1, col2, col3 = st.columns([1, 6, 1])
-
-with col1:
-    st.write("")
-
-with col2:
-
-    # 1. Clean first Excel
-    df1 = excel_cleaning_section("First Excel (Source A)", "excel1")
-
-    st.markdown("---")
-
-    # 2. Clean second Excel
-    df2 = excel_cleaning_section("Second Excel (Source B)", "excel2")
-
-    st.markdown("---")
-    st.markdown("### Compare the two Excels")
+# -----------------------------
+# Page sections
+# -----------------------------
+# Each section is a fragment, so a widget change only reruns its own
+# section. Sections that produce data for the others (a new cleaned
+# DataFrame or new comparison results) rerun the whole page once.
+@st.fragment
+def source_fragment(section_title, state_prefix):
+    """
+    Cleaning section for one source Excel.
+    """
+    excel_cleaning_section(section_title, state_prefix)
 
+@st.fragment
+def comparison_fragment():
+    """
+    Comparison options and results for the two cleaned Excels.
+    """
     with st.expander("🔍 Comparison options", expanded=True):
+        df1 = st.session_state.get("excel1_cleaned_df")
+        df2 = st.session_state.get("excel2_cleaned_df")
+
         if df1 is not None and df2 is not None:
             st.write(
                 "Select the key columns and optional value columns to compare. You can adjust these choices and rerun the comparison if needed."
@@ -977,11 +897,13 @@ with col2:
 
                 if st.button("Run comparison", key="run_comparison"):
                     with st.spinner("Comparing..."):
-                        missing_from_excel_1, missing_from_excel_2, diff_qty_df, combo = compare_dfs(
+                        missing_from_excel_1, missing_from_excel_2, diff_qty_df, combo = cached_compare_dfs(
+                            st.session_state.excel1_fingerprint,
+                            st.session_state.excel2_fingerprint,
                             df1,
-                            key_col_1,
                             df2,
-                            key_col_2,
+                            pair1=key_col_1,
+                            pair2=key_col_2,
                             compare1=compare1,
                             compare2=compare2,
                             case_insensitive_match=case_insensitive,
@@ -990,12 +912,25 @@ with col2:
                     combo_sorted = combo.sort_values(by='Missing list')
 
                     # Store in session so they persist after reruns and downloads
+                    st.session_state.comparison_fingerprint = combine_fingerprints(
+                        "compare",
+                        st.session_state.excel1_fingerprint,
+                        st.session_state.excel2_fingerprint,
+                        key_col_1,
+                        key_col_2,
+                        compare1,
+                        compare2,
+                        case_insensitive,
+                    )
                     st.session_state.missing_from_excel_1 = missing_from_excel_1
                     st.session_state.missing_from_excel_2 = missing_from_excel_2
                     st.session_state.diff_qty_df = diff_qty_df
                     st.session_state.combo = combo
                     st.session_state.combo_sorted = combo_sorted
 
+                    # Rerun the whole page so the download section sees the new results
+                    st.rerun()
+
             # Always show results if present
             if (
                 'missing_from_excel_1' in st.session_state and
@@ -1004,81 +939,89 @@ with col2:
                 'combo_sorted' in st.session_state
             ):
                 st.write("**Entries missing from First Excel (Source A)**")
-                st.dataframe(
-                    st.session_state.missing_from_excel_1.reset_index(drop=True),
-                    hide_index=True,
+                show_frame(
+                    st.session_state.missing_from_excel_1,
+                    "view_missing_from_excel_1",
+                    combine_fingerprints(st.session_state.comparison_fingerprint, "missing_from_excel_1"),
                 )
 
                 st.write("**Entries missing from Second Excel (Source B)**")
-                st.dataframe(
-                    st.session_state.missing_from_excel_2.reset_index(drop=True),
-                    hide_index=True,
+                show_frame(
+                    st.session_state.missing_from_excel_2,
+                    "view_missing_from_excel_2",
+                    combine_fingerprints(st.session_state.comparison_fingerprint, "missing_from_excel_2"),
                 )
 
                 st.write("**Entries with different values between the two Excels**")
-                st.dataframe(
-                    st.session_state.diff_qty_df.reset_index(drop=True),
-                    hide_index=True,
+                show_frame(
+                    st.session_state.diff_qty_df,
+                    "view_diff_qty_df",
+                    combine_fingerprints(st.session_state.comparison_fingerprint, "diff_qty_df"),
                 )
 
                 st.write("**Combined list of IDs missing from one or both Excels**")
-                st.dataframe(
-                    st.session_state.combo_sorted.reset_index(drop=True),
-                    hide_index=True,
+                show_frame(
+                    st.session_state.combo_sorted,
+                    "view_combo_sorted",
+                    combine_fingerprints(st.session_state.comparison_fingerprint, "combo_sorted"),
                 )
 
         else:
             st.info("Please finish cleaning or loading both Excels above to enable comparison.")
 
+@st.fragment
+def download_fragment():
+    """
+    Download of all comparison results.
+    """
     st.markdown("#### Download all comparison DataFrames into an Excel file")
 
     if (
         'missing_from_excel_1' in st.session_state and
         'missing_from_excel_2' in st.session_state and
         'diff_qty_df' in st.session_state and
-        'combo' in st.session_state
+        'combo' in st.session_state and
+        'comparison_fingerprint' in st.session_state
     ):
-        missing_from_excel_1 = st.session_state.missing_from_excel_1
-        missing_from_excel_2 = st.session_state.missing_from_excel_2
-        diff_qty_df = st.session_state.diff_qty_df
-        combo = st.session_state.combo
-
-        output = BytesIO()
+        fingerprint = st.session_state.comparison_fingerprint
+        frames = {
+            'missing_from_excel_1': st.session_state.missing_from_excel_1,
+            'missing_from_excel_2': st.session_state.missing_from_excel_2,
+            'diff_qty_df': st.session_state.diff_qty_df,
+            'combo_missing_id': st.session_state.combo,
+        }
+
+        download_on_demand(
+            "📥 Download comparison Excel",
+            fingerprint,
+            lambda fmt: cached_comparison_report(fingerprint, fmt, frames),
+            file_name="comparison_results",
+            key="download_comparison",
+        )
+    else:
+        st.info("Run the comparison above to enable the download.")
 
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            placeholder_df = pd.DataFrame({'Notice': ['No data available']})
-            placeholder_df.to_excel(writer, sheet_name='No_Data', index=False)
+col1, col2, col3 = st.columns([1, 6, 1])
 
-            sheets_written = 0
+with col1:
+    st.write("")
 
-            if not missing_from_excel_1.empty:
-                missing_from_excel_1.to_excel(writer, sheet_name='missing_from_excel_1', index=False)
-                sheets_written += 1
+with col2:
 
-            if not missing_from_excel_2.empty:
-                missing_from_excel_2.to_excel(writer, sheet_name='missing_from_excel_2', index=False)
-                sheets_written += 1
+    # 1. Clean first Excel
+    source_fragment("First Excel (Source A)", "excel1")
 
-            if not diff_qty_df.empty:
-                diff_qty_df.to_excel(writer, sheet_name='diff_qty_df', index=False)
-                sheets_written += 1
+    st.markdown("---")
 
-            if not combo.empty:
-                combo.to_excel(writer, sheet_name='combo_missing_id', index=False)
-                sheets_written += 1
+    # 2. Clean second Excel
+    source_fragment("Second Excel (Source B)", "excel2")
 
-            if sheets_written > 0:
-                del writer.book['No_Data']
+    st.markdown("---")
+    st.markdown("### Compare the two Excels")
 
-        output.seek(0)
+    comparison_fragment()
 
-        st.download_button(
-            label="📥 Download comparison Excel",
-            data=output,
-            file_name="comparison_results.xlsx"
-        )
-    else:
-        st.info("Run the comparison above to enable the download.")
+    download_fragment()
 
 with col3:
     st.write("")
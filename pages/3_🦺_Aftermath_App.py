@@ -1,8 +1,17 @@
 # Import Libraries 
 import streamlit as st
 import pandas as pd
-import openpyxl
-from io import BytesIO
+
+from excel_tools import (
+    cleanInvoice,
+    cleanMonitorData,
+    combine_fingerprints,
+    compare_aftermath,
+    export_frames,
+    export_report,
+    file_hash,
+)
+from excel_tools.ui import download_on_demand, show_frame
 
 # -----------------------------
 # Page setup
@@ -17,155 +26,29 @@ st.set_page_config(
 # Core functions
 # -----------------------------
 @st.cache_data
-def cleanInvoice(invoice_excel, row, num_cols, skip_last_rows=False, skip_num=0):
-    """
-    Generalized Excel cleaning function for Aftermath invoices.
-
-    Parameters:
-    - invoice_excel: Excel file object.
-    - row: The row number in Excel where you want the first heading.
-    - num_cols: The number of columns there should be.
-    - skip_last_rows: True or False. Are there any rows to skip at the end during import? (optional)
-    - skip_num: The row number you want the Excel to end on. (optional)
-    """
-    
-    if skip_last_rows == True:
-
-        xls = pd.ExcelFile(invoice_excel)
-        sheet_name = xls.sheet_names[0]
-        
-        wb = openpyxl.load_workbook(invoice_excel, read_only=True)
-        ws = wb[sheet_name]
-        total_rows = ws.max_row
-
-        last_row_of_data = skip_num + 1
-
-        skipfooter = total_rows - last_row_of_data
-        
-        clean_excel = pd.read_excel(invoice_excel, skiprows=row - 1, skipfooter=skipfooter) 
-
-    else:
-
-        clean_excel = pd.read_excel(invoice_excel, skiprows=row - 1) 
-    
-    # Standardize column headers
-    clean_excel.columns = clean_excel.columns.str.strip()
-    clean_excel.columns = clean_excel.columns.str.replace(r'\s+', ' ', regex=True)
-    clean_excel.columns = clean_excel.columns.astype(str)
-    clean_excel.columns = clean_excel.columns.str.replace(r'\xa0|\t', ' ', regex=True).str.strip()
-
-    column_names = clean_excel.columns.tolist()
-    filtered_columns = [col for col in column_names if "Unnamed" not in col]  
-
-    # Drop rows that contain "Totals" anywhere
-    clean_excel = clean_excel[~clean_excel.apply(
-        lambda row: row.astype(str).str.contains('Totals', case=False, na=False)
-    ).any(axis=1)]
-
-    # Drop fully empty rows
-    clean_excel = clean_excel.dropna(axis=0, how='all')
-
-    # Forward fill date column
-    clean_excel.loc[:, 'Date:'] = clean_excel['Date:'].ffill()
-    
-    # Parse and filter valid dates
-    clean_excel.loc[:, 'Date:'] = pd.to_datetime(
-        clean_excel['Date:'], format='%Y/%m/%d', errors='coerce'
-    ).dt.date
-    clean_excel = clean_excel.dropna(subset=['Date:'])
-    clean_excel.reset_index(drop=True, inplace=True)
-
-    # Realign row values to the left
-    def realign_row(a_row):
-        non_empty_values = a_row.dropna().values
-        aligned_row = pd.Series([None] * len(clean_excel.columns), index=clean_excel.columns)
-        aligned_row[:len(non_empty_values)] = non_empty_values
-        return aligned_row
-
-    clean_excel = clean_excel.apply(realign_row, axis=1)
-
-    # Limit to expected number of columns
-    clean_excel = clean_excel.drop(clean_excel.columns[num_cols:], axis=1)
-
-    clean_excel.columns = filtered_columns
-
-    return clean_excel
-
-@st.cache_data
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Sheet1')
-    processed_data = output.getvalue()
-    return processed_data
+def cached_clean_invoice(invoice_excel, row, num_cols, skip_last_rows=False, skip_num=0):
+    return cleanInvoice(invoice_excel, row, num_cols, skip_last_rows=skip_last_rows, skip_num=skip_num)
 
 @st.cache_data
-def cleanMonitorData(monitor_excel):
-    """
-    Excel cleaning function for monitor data headers.
+def cached_clean_monitor_data(monitor_excel):
+    return cleanMonitorData(monitor_excel)
 
-    Parameters:
-    - monitor_excel: Excel file object.
-    """
-
-    excel_2 = pd.read_excel(monitor_excel)
-
-    excel_2.columns = excel_2.columns.str.strip()
-    excel_2.columns = excel_2.columns.str.replace(r'\s+', ' ', regex=True)
-    excel_2.columns = excel_2.columns.astype(str)
-
-    return excel_2
-
-@st.cache_data
-def compare_dfs(excel_1, pair1, compare1, excel_2, pair2, compare2):
-    """
-    Excel comparison function for Aftermath workflow.
-
-    Parameters:
-    - excel_1, excel_2: DataFrames to compare.
-    - pair1, pair2: Columns to match between DataFrames.
-    - compare1, compare2: Columns to compare values for matched IDs. (optional)
-    
-    Returns:
-    - missing_from_excel_1: Rows in excel_1 not found in excel_2 based on pair columns.
-    - missing_from_excel_2: Rows in excel_2 not found in excel_1 based on pair columns.
-    - diff_qty_df: DataFrame of mismatched values in compare1/compare2.
-    - combo: DataFrame of unmatched IDs between both Excels.
-    """
-
-    filter1 = excel_1[pair1].isin(excel_2[pair2])
-    missing_from_excel_2 = excel_1[~filter1]
-
-    filter2 = excel_2[pair2].isin(excel_1[pair1])
-    missing_from_excel_1 = excel_2[~filter2]
-
-    part1 = excel_2[pair2].unique().tolist()
-    part2 = excel_1[pair1].unique().tolist()
-    id_list = set(part1 + part2)
-
-    diff_qty = {}
-    combined_list = []
-
-    for i in id_list:
-        excel_1_match = excel_1.loc[excel_1[pair1] == i, compare1]
-        excel_2_match = excel_2.loc[excel_2[pair2] == i, compare2]
-    
-        if not excel_1_match.empty and not excel_2_match.empty:
-            qty1 = excel_1_match.values[0]
-            qty2 = excel_2_match.values[0]
-        
-            if qty1 != qty2:
-                diff_qty[i] = [qty1, qty2]
-        else:
-            combined_list.append(i)
-
-    diff_qty_df = pd.DataFrame(diff_qty)
-    diff_qty_df.index = ['excel_1', 'excel_2']
+# -----------------------------
+# Fingerprint-keyed caches
+# -----------------------------
+# DataFrames are passed as underscore arguments, which Streamlit does not
+# hash. The cache is keyed on the fingerprints stored in session state.
+@st.cache_data(show_spinner=False)
+def cached_compare_dfs(fingerprint_1, fingerprint_2, _excel_1, _excel_2, **options):
+    return compare_aftermath(_excel_1, excel_2=_excel_2, **options)
 
-    combo = pd.DataFrame(combined_list, columns=['Missing list'])
-    combo = combo.sort_values(by='Missing list', ascending=False)
+@st.cache_data(show_spinner=False)
+def cached_export(fingerprint, fmt, _df):
+    return export_frames({'Sheet1': _df}, fmt)
 
-    return missing_from_excel_1, missing_from_excel_2, diff_qty_df, combo
+@st.cache_data(show_spinner=False)
+def cached_comparison_report(fingerprint, fmt, _frames):
+    return export_report(_frames, fmt, index=['diff_qty_df'])
 
 # -----------------------------
 # Header and sidebar
@@ -258,7 +141,8 @@ with col2:
         if uploaded_file is not None:
             df1 = pd.read_excel(uploaded_file)
             st.session_state.df1 = df1
-            st.dataframe(df1, hide_index=True)
+            st.session_state.df1_fingerprint = combine_fingerprints("invoice", file_hash(uploaded_file))
+            show_frame(df1, "view_df1", st.session_state.df1_fingerprint)
 
             st.write("After checking the preview above, confirm that it still looks clean. If not, you can restart and choose the cleaning option instead.")
         else:
@@ -316,7 +200,7 @@ with col2:
         if uploaded_file is not None:
             if skipEnd == ":rainbow[Yes]":
 
-                df1 = cleanInvoice(uploaded_file, 
+                df1 = cached_clean_invoice(uploaded_file, 
                                    row, 
                                    8, 
                                    skip_last_rows=True, 
@@ -324,22 +208,25 @@ with col2:
 
 
             else:
-                df1 = cleanInvoice(uploaded_file, row, 8)
+                df1 = cached_clean_invoice(uploaded_file, row, 8)
 
             st.session_state.df1 = df1
-            st.dataframe(df1, hide_index=True)
+            st.session_state.df1_fingerprint = combine_fingerprints(
+                "cleanInvoice", file_hash(uploaded_file), row, skipEnd, skip_num
+            )
+            show_frame(df1, "view_df1", st.session_state.df1_fingerprint)
 
             st.write(
                 "After checking the cleaned invoice above, confirm that it looks correct. "
                 "If something is off, you can adjust your answers and run the cleaning step again."
             )
 
-            excel_bytes = to_excel(df1)
-
-            st.download_button(
-                label="📥 Download cleaned invoice Excel",
-                data=excel_bytes,
-                file_name="cleaned_invoice.xlsx",
+            download_on_demand(
+                "📥 Download cleaned invoice Excel",
+                st.session_state.df1_fingerprint,
+                lambda fmt: cached_export(st.session_state.df1_fingerprint, fmt, df1),
+                file_name="cleaned_invoice",
+                key="download_invoice",
             )
         else:
             st.warning("Please upload an invoice Excel file.")
@@ -350,17 +237,18 @@ with col2:
     uploaded_file = st.file_uploader("Upload the monitor data Excel file", key="file2")
 
     if uploaded_file is not None:
-        df2 = cleanMonitorData(uploaded_file)
+        df2 = cached_clean_monitor_data(uploaded_file)
         st.session_state.df2 = df2
-        st.dataframe(df2, hide_index=True)
+        st.session_state.df2_fingerprint = combine_fingerprints("monitor", file_hash(uploaded_file))
+        show_frame(df2, "view_df2", st.session_state.df2_fingerprint)
 
         st.write("After checking, confirm that the monitor data looks correct. If not, you may need to adjust the source file.")
-        excel_bytes = to_excel(df2)
-
-        st.download_button(
-            label="📥 Download cleaned monitor Excel",
-            data=excel_bytes,
-            file_name="cleaned_monitor_data.xlsx",
+        download_on_demand(
+            "📥 Download cleaned monitor Excel",
+            st.session_state.df2_fingerprint,
+            lambda fmt: cached_export(st.session_state.df2_fingerprint, fmt, df2),
+            file_name="cleaned_monitor_data",
+            key="download_monitor",
         )
     else:
         st.warning("Please upload the monitor data Excel file.")
@@ -372,33 +260,56 @@ with col2:
             df1 = st.session_state.df1
             df2 = st.session_state.df2
 
-            missing_from_excel_1, missing_from_excel_2, diff_qty_df, combo = compare_dfs(
+            missing_from_excel_1, missing_from_excel_2, diff_qty_df, combo = cached_compare_dfs(
+                st.session_state.df1_fingerprint,
+                st.session_state.df2_fingerprint,
                 df1,
-                'FEMA Ticket #',
-                'Calculated Qty',
                 df2,
-                'Ticket Number',
-                'Quantity'
+                pair1='FEMA Ticket #',
+                compare1='Calculated Qty',
+                pair2='Ticket Number',
+                compare2='Quantity',
             )
 
             combo_sorted = combo.sort_values(by='Missing list')
+            st.session_state.comparison_fingerprint = combine_fingerprints(
+                "compare",
+                st.session_state.df1_fingerprint,
+                st.session_state.df2_fingerprint,
+            )
 
             st.write("**Entries missing from Excel 1 (invoice Excel)**")
             st.session_state.missing_from_excel_1 = missing_from_excel_1
-            st.dataframe(missing_from_excel_1, hide_index=True)
+            show_frame(
+                missing_from_excel_1,
+                "view_missing_from_excel_1",
+                combine_fingerprints(st.session_state.comparison_fingerprint, "missing_from_excel_1"),
+            )
 
             st.write("**Entries missing from Excel 2 (monitor Excel)**")
             st.session_state.missing_from_excel_2 = missing_from_excel_2
-            st.dataframe(missing_from_excel_2, hide_index=True)
+            show_frame(
+                missing_from_excel_2,
+                "view_missing_from_excel_2",
+                combine_fingerprints(st.session_state.comparison_fingerprint, "missing_from_excel_2"),
+            )
 
             st.write("**Entries with different quantities between the two Excels**")
             st.session_state.diff_qty_df = diff_qty_df
-            st.dataframe(diff_qty_df, hide_index=True)
+            show_frame(
+                diff_qty_df,
+                "view_diff_qty_df",
+                combine_fingerprints(st.session_state.comparison_fingerprint, "diff_qty_df"),
+            )
 
             st.write("**Combined list of ticket IDs missing from one or both Excels**")
             st.session_state.combo = combo
             st.session_state.combo_sorted = combo_sorted
-            st.data_editor(combo_sorted, hide_index=True)
+            show_frame(
+                combo_sorted,
+                "view_combo_sorted",
+                combine_fingerprints(st.session_state.comparison_fingerprint, "combo_sorted"),
+            )
 
         else:
             st.info("Please upload both the invoice Excel and the monitor Excel to run the comparison.")
@@ -409,62 +320,23 @@ with col2:
         'missing_from_excel_1' in st.session_state and
         'missing_from_excel_2' in st.session_state and
         'diff_qty_df' in st.session_state and
-        'combo' in st.session_state
+        'combo' in st.session_state and
+        'comparison_fingerprint' in st.session_state
     ):
-        missing_from_excel_1 = st.session_state.missing_from_excel_1
-        missing_from_excel_2 = st.session_state.missing_from_excel_2
-        diff_qty_df = st.session_state.diff_qty_df
-        combo = st.session_state.combo
-
-        output = BytesIO()
-
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            placeholder_df = pd.DataFrame({'Notice': ['No data available']})
-            placeholder_df.to_excel(writer, sheet_name='No_Data', index=False)
-
-            sheets_written = 0
-
-            if not missing_from_excel_1.empty:
-                missing_from_excel_1.to_excel(
-                    writer,
-                    sheet_name='missing_from_excel_1',
-                    index=False
-                )
-                sheets_written += 1
-
-            if not missing_from_excel_2.empty:
-                missing_from_excel_2.to_excel(
-                    writer,
-                    sheet_name='missing_from_excel_2',
-                    index=False
-                )
-                sheets_written += 1
-
-            if not diff_qty_df.empty:
-                diff_qty_df.to_excel(
-                    writer,
-                    sheet_name='diff_qty_df',
-                    index=True
-                )
-                sheets_written += 1
-
-            if not combo.empty:
-                combo.to_excel(
-                    writer,
-                    sheet_name='combo_missing_id',
-                    index=False
-                )
-                sheets_written += 1
-
-            if sheets_written > 0:
-                del writer.book['No_Data']
-
-        output.seek(0)
-
-        st.download_button(
-            label="📥 Download combined comparison Excel",
-            data=output,
-            file_name="aftermath_comparison_results.xlsx",
+        fingerprint = st.session_state.comparison_fingerprint
+        frames = {
+            'missing_from_excel_1': st.session_state.missing_from_excel_1,
+            'missing_from_excel_2': st.session_state.missing_from_excel_2,
+            'diff_qty_df': st.session_state.diff_qty_df,
+            'combo_missing_id': st.session_state.combo,
+        }
+
+        download_on_demand(
+            "📥 Download combined comparison Excel",
+            fingerprint,
+            lambda fmt: cached_comparison_report(fingerprint, fmt, frames),
+            file_name="aftermath_comparison_results",
+            key="download_comparison",
         )
     else:
         st.info("Run the comparison above to enable the download button.")
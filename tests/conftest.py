@@ -0,0 +1,90 @@
+"""
+Shared fixtures: a messy invoice workbook like the PDF conversions the
+app cleans, and fresh caches for every test.
+"""
+
+# Import Libraries
+import datetime as dt
+import random
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+
+from excel_tools import workbook
+from excel_tools.stages import clear_stage_cache
+
+HEADER_ROW = 4
+
+HEADER = ["Ticket #", "Date:", "Description", "Qty", "Unit", "Rate", "Amount"]
+
+
+def invoice_rows(n_rows, seed=0):
+    """
+    Data rows with the usual conversion damage: dates only on the first
+    row of each day, some as text, rows shifted one cell right, subtotal
+    and note rows, blank rows and missing quantities.
+    """
+    rng = random.Random(seed)
+    day = dt.datetime(2024, 5, 1)
+    rows = []
+    for number in range(n_rows):
+        roll = rng.random()
+        if roll < 0.04:
+            rows.append([])
+            continue
+        if roll < 0.08:
+            rows.append(["Subtotal", None, None, None, None, None, rng.randint(100, 900)])
+            continue
+        if roll < 0.1:
+            rows.append([None, None, "Notes: hauled to site B"])
+            continue
+
+        date = None
+        if rng.random() < 0.3:
+            day += dt.timedelta(days=1)
+            date = day if rng.random() < 0.7 else day.strftime("%m/%d/%Y")
+        qty = rng.choice([rng.randint(1, 40), round(rng.uniform(1, 20), 2), None])
+        row = [f"T{number:05d}", date, rng.choice(["Debris", "Stumps", "Mulch"]), qty,
+               rng.choice(["CY", "TN", "EA"]), 12.5, None if qty is None else qty * 12.5]
+        if rng.random() < 0.05:
+            row = [None, *row]
+        rows.append(row)
+    return rows
+
+
+def make_invoice(n_rows=80, seed=0):
+    """
+    Invoice workbook bytes: a title block, the header on HEADER_ROW, the
+    data rows and a totals footer.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Invoice"
+    ws.append(["Aftermath Disaster Recovery"])
+    ws.append(["Invoice 1042", None, "Period:", "May 2024"])
+    ws.append([])
+    ws.append(HEADER)
+    for row in invoice_rows(n_rows, seed):
+        ws.append(row)
+    ws.append([])
+    ws.append(["Grand Totals", None, None, None, None, None, 99999])
+    wb.create_sheet("Notes").append(["Prepared by", "AP team"])
+
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    clear_stage_cache()
+    workbook._grid_cache.clear()
+    yield
+    clear_stage_cache()
+    workbook._grid_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def invoice():
+    return make_invoice()
@@ -0,0 +1,82 @@
+"""
+compare_aftermath against the per-ticket loop it replaced.
+"""
+
+# Import Libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+from excel_tools import compare_aftermath
+
+
+def reference_compare_aftermath(excel_1, pair1, compare1, excel_2, pair2, compare2):
+    """
+    The original loop over every ticket number in either Excel.
+    """
+    filter1 = excel_1[pair1].isin(excel_2[pair2])
+    missing_from_excel_2 = excel_1[~filter1]
+
+    filter2 = excel_2[pair2].isin(excel_1[pair1])
+    missing_from_excel_1 = excel_2[~filter2]
+
+    id_list = set(excel_2[pair2].unique().tolist() + excel_1[pair1].unique().tolist())
+
+    diff_qty = {}
+    combined_list = []
+    for i in id_list:
+        excel_1_match = excel_1.loc[excel_1[pair1] == i, compare1]
+        excel_2_match = excel_2.loc[excel_2[pair2] == i, compare2]
+        if not excel_1_match.empty and not excel_2_match.empty:
+            qty1 = excel_1_match.values[0]
+            qty2 = excel_2_match.values[0]
+            if qty1 != qty2:
+                diff_qty[i] = [qty1, qty2]
+        else:
+            combined_list.append(i)
+
+    diff_qty_df = pd.DataFrame(diff_qty)
+    diff_qty_df.index = ['excel_1', 'excel_2']
+
+    combo = pd.DataFrame(combined_list, columns=['Missing list'])
+    combo = combo.sort_values(by='Missing list', ascending=False)
+
+    return missing_from_excel_1, missing_from_excel_2, diff_qty_df, combo
+
+
+def tickets(seed):
+    """
+    An invoice and a monitor export sharing most tickets, with repeated
+    tickets, changed quantities and tickets only on one side.
+    """
+    rng = np.random.default_rng(seed)
+    numbers = rng.choice(np.arange(1000, 1400), 300, replace=False)
+    invoice = pd.DataFrame({
+        "Ticket #": rng.choice(numbers[:250], 400),
+        "Qty": rng.integers(1, 20, 400).astype(float),
+    })
+    monitor_tickets = rng.choice(numbers[50:], 350)
+    monitor = pd.DataFrame({
+        "Ticket Number": monitor_tickets,
+        "Load Qty": rng.integers(1, 20, 350).astype(float),
+    })
+    return invoice, monitor
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_compare_aftermath_matches_reference(seed):
+    invoice, monitor = tickets(seed)
+    args = (invoice, "Ticket #", "Qty", monitor, "Ticket Number", "Load Qty")
+    result = compare_aftermath(*args)
+    expected = reference_compare_aftermath(*args)
+
+    pd.testing.assert_frame_equal(result[0], expected[0])
+    pd.testing.assert_frame_equal(result[1], expected[1])
+    assert len(expected[2].columns) > 0
+    # The original built the diff columns in set order
+    pd.testing.assert_frame_equal(
+        result[2].sort_index(axis=1), expected[2].sort_index(axis=1), check_column_type=False,
+    )
+    pd.testing.assert_frame_equal(
+        result[3].reset_index(drop=True), expected[3].reset_index(drop=True),
+    )
@@ -0,0 +1,87 @@
+"""
+Command-line checks and a small end-to-end run of the batch CLI.
+"""
+
+# Import Libraries
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from excel_tools.batch import output_names, parse_args, run_batch
+
+
+@pytest.mark.parametrize("extra", [
+    ["--compare1", "Qty", "Rate", "--compare2", "Quantity"],
+    ["--compare1", "Qty"],
+    ["--compare2", "Quantity"],
+    ["--chunk-rows", "0"],
+])
+def test_parse_args_rejects_bad_options(tmp_path, extra):
+    with pytest.raises(SystemExit):
+        parse_args([str(tmp_path), "results", *extra])
+
+
+def test_parse_args_settings(tmp_path):
+    args, settings = parse_args([
+        str(tmp_path), "results",
+        "--options", '{"header_row_guess": 2}',
+        "--compare1", "Qty", "Rate",
+        "--compare2", "Quantity", "Unit Price",
+        "--chunk-rows", "500",
+    ])
+
+    assert settings["compare1"] == ["Qty", "Rate"]
+    assert settings["compare2"] == ["Quantity", "Unit Price"]
+    assert settings["chunk_rows"] == 500
+    assert settings["plan"]["ingest"]["header_row_guess"] == 2
+    assert args.monitor_data is None
+
+
+def test_parse_args_rejects_missing_input_dir(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        parse_args([str(tmp_path / "missing"), "results"])
+    assert "is not a folder" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("monitor", ["missing.xlsx", "not_excel.xlsx"])
+def test_parse_args_rejects_unreadable_monitor(tmp_path, capsys, monitor):
+    (tmp_path / "not_excel.xlsx").write_text("ticket,qty\n")
+    with pytest.raises(SystemExit):
+        parse_args([
+            str(tmp_path), "results", "--mode", "aftermath", "--monitor", str(tmp_path / monitor),
+        ])
+    assert "Could not read --monitor" in capsys.readouterr().err
+
+
+def test_output_names_keep_the_type_of_shared_names():
+    paths = [Path("a.xls"), Path("a.xlsx"), Path("b.xlsx")]
+    assert output_names(paths) == {
+        Path("a.xls"): "a_xls_results.xlsx",
+        Path("a.xlsx"): "a_xlsx_results.xlsx",
+        Path("b.xlsx"): "b_results.xlsx",
+    }
+
+
+def test_run_batch_compares_against_the_loaded_monitor(tmp_path):
+    input_dir = tmp_path / "invoices"
+    input_dir.mkdir()
+    invoice = pd.DataFrame({"Ticket #": ["T1", "T2", "T3"], "Qty": [1.0, 2.0, 3.0]})
+    invoice.to_excel(input_dir / "invoice.xlsx", index=False)
+    (input_dir / "~$invoice.xlsx").write_bytes(b"lock")
+
+    monitor = tmp_path / "monitor.xlsx"
+    pd.DataFrame({"Ticket": ["T1", "T2", "X1"], "Quantity": [1.0, 5.0, 3.0]}).to_excel(monitor, index=False)
+
+    args, settings = parse_args([
+        str(input_dir), str(tmp_path / "results"), "--options", '{"realign": false}',
+        "--monitor", str(monitor), "--key1", "Ticket #", "--key2", "Ticket",
+        "--compare1", "Qty", "--compare2", "Quantity",
+    ])
+    summary, _ = run_batch(args.input_dir, args.output_dir, settings, monitor=args.monitor_data, workers=1)
+
+    assert summary["file"].tolist() == ["invoice.xlsx"]
+    assert summary.loc[0, "status"] == "ok", summary.loc[0, "error"]
+    assert summary.loc[0, ["missing_from_excel_1", "missing_from_excel_2", "mismatches"]].tolist() == [1, 1, 1]
+    results = pd.read_excel(tmp_path / "results" / "invoice_results.xlsx", sheet_name=None)
+    pd.testing.assert_frame_equal(results["cleaned"], invoice, check_dtype=False)
@@ -0,0 +1,65 @@
+"""
+clean_excel_chunked against clean_excel on the whole sheet.
+"""
+
+# Import Libraries
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from excel_tools import chunked, clean_excel, clean_excel_chunked
+
+from conftest import HEADER, HEADER_ROW, make_invoice
+
+OPTIONS = {
+    "detected date": {"header_row_guess": HEADER_ROW, "n_cols": 7},
+    "keywords and fills": {
+        "header_row_guess": HEADER_ROW, "drop_keywords": ["Subtotal", "Totals", "Notes"],
+        "fill_cols": ["qty", "Description"], "fill_methods": {"qty": 0, "description": "ffill"},
+        "track_fill": True, "track_date_fill": True, "n_cols": 7,
+    },
+    "date column and format": {
+        "header_row_guess": HEADER_ROW, "date_col": "Date:", "date_format": "%m/%d/%Y",
+        "realign": False, "n_cols": 7,
+    },
+    "footer and start column": {
+        "header_row_guess": HEADER_ROW, "skip_last_rows": True, "skip_num": 90, "start_col_letter": "B",
+        "drop_keywords": ["Subtotal"], "n_cols": 5,
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def big_invoice():
+    return make_invoice(n_rows=120, seed=1)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 1000])
+@pytest.mark.parametrize("name", OPTIONS)
+def test_clean_excel_chunked_matches_in_memory(big_invoice, name, chunk_rows):
+    expected = clean_excel(BytesIO(big_invoice), **OPTIONS[name])
+    chunked_df = clean_excel_chunked(BytesIO(big_invoice), chunk_rows=chunk_rows, **OPTIONS[name])
+    pd.testing.assert_frame_equal(chunked_df, expected)
+
+
+def test_clean_excel_chunked_runs_bfill_in_memory(big_invoice, monkeypatch):
+    options = {"header_row_guess": HEADER_ROW, "date_fill_method": "bfill", "n_cols": 7}
+    monkeypatch.setattr(chunked, "spool_chunks", None)
+    pd.testing.assert_frame_equal(
+        clean_excel_chunked(BytesIO(big_invoice), chunk_rows=7, **options),
+        clean_excel(BytesIO(big_invoice), **options),
+    )
+
+
+def test_clean_excel_chunked_header_only_sheet():
+    wb = Workbook()
+    wb.active.append(HEADER)
+    buffer = BytesIO()
+    wb.save(buffer)
+
+    expected = clean_excel(BytesIO(buffer.getvalue()))
+    chunked_df = clean_excel_chunked(BytesIO(buffer.getvalue()), chunk_rows=7)
+    assert chunked_df.empty
+    pd.testing.assert_frame_equal(chunked_df, expected)
@@ -0,0 +1,217 @@
+"""
+clean_excel against the original pd.read_excel-based implementation.
+"""
+
+# Import Libraries
+import datetime as dt
+import re
+import string
+from io import BytesIO
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from excel_tools import clean, clean_excel, load_workbook_grid
+
+from conftest import HEADER_ROW
+
+
+def reference_clean_excel(
+    file,
+    header_row_guess=1,
+    sheet_name=0,
+    date_col=None,
+    date_format=None,
+    date_fill_method='ffill',
+    track_date_fill=False,
+    drop_keywords=None,
+    realign=True,
+    n_cols=None,
+    skip_last_rows=False,
+    skip_num=0,
+    start_col_letter=None,
+    fill_cols=None,
+    fill_methods='ffill',
+    track_fill=False
+):
+    """
+    The original clean_excel, reading the sheet with pd.read_excel and
+    cleaning it in one DataFrame.
+    """
+    def col_letter_to_index(letter):
+        num = 0
+        for c in letter.upper():
+            num = num * 26 + string.ascii_uppercase.index(c) + 1
+        return num - 1
+
+    if skip_last_rows:
+        wb = openpyxl.load_workbook(BytesIO(file), read_only=True)
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        skipfooter = ws.max_row - skip_num
+        df = pd.read_excel(BytesIO(file), sheet_name=sheet_name, skiprows=header_row_guess - 1, skipfooter=skipfooter)
+    else:
+        df = pd.read_excel(BytesIO(file), sheet_name=sheet_name, skiprows=header_row_guess - 1)
+
+    if start_col_letter is not None:
+        df = df.iloc[:, col_letter_to_index(start_col_letter):]
+
+    df.columns = (
+        df.columns.astype(str)
+        .str.strip()
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.replace(r'\xa0|\t', ' ', regex=True)
+    )
+    filtered_columns = [col for col in df.columns if "Unnamed" not in col]
+    col_map = {col.lower(): col for col in df.columns}
+
+    if drop_keywords:
+        pattern = '|'.join(re.escape(str(k)) for k in drop_keywords)
+        df = df[~df.apply(lambda row: row.astype(str).str.contains(pattern, case=False, na=False)).any(axis=1)]
+    df = df.dropna(how='all')
+
+    if fill_cols:
+        if isinstance(fill_cols, str):
+            fill_cols = [fill_cols]
+        if not isinstance(fill_methods, dict):
+            fill_methods = {col.lower(): fill_methods for col in fill_cols}
+        else:
+            fill_methods = {col.lower(): method for col, method in fill_methods.items()}
+        for col in fill_cols:
+            real_col = col_map[col.lower()]
+            method = fill_methods.get(col.lower(), 'ffill')
+            was_na = df[real_col].isna()
+            if method == 'ffill':
+                df[real_col] = df[real_col].ffill()
+            elif method == 'bfill':
+                df[real_col] = df[real_col].bfill()
+            else:
+                df[real_col] = df[real_col].fillna(method)
+            if track_fill:
+                insert_pos = df.columns.get_loc(filtered_columns[-1]) + 1
+                df.insert(insert_pos, f"{real_col}_filled", was_na & df[real_col].notna())
+                filtered_columns.append(f"{real_col}_filled")
+
+    real_date_col = None
+    cleaned_cols_lower = [col.lower().strip() for col in df.columns]
+    if date_col:
+        real_date_col = df.columns[cleaned_cols_lower.index(date_col.lower().strip())]
+    else:
+        scores = {}
+        for col in [col for col in df.columns if 'date' in col.lower()]:
+            scores[col] = pd.to_datetime(df[col], format=date_format, errors='coerce').notna().sum()
+        if scores and max(scores.values()) > 0:
+            real_date_col = max(scores, key=scores.get)
+
+    if real_date_col:
+        was_na = df[real_date_col].isna()
+        if date_fill_method == 'ffill':
+            df[real_date_col] = df[real_date_col].ffill()
+        else:
+            df[real_date_col] = df[real_date_col].bfill()
+        if track_date_fill:
+            marker_col_name = f"{real_date_col}_was_{date_fill_method}ed"
+            insert_pos = df.columns.get_loc(filtered_columns[-1]) + 1
+            df.insert(insert_pos, marker_col_name, was_na & df[real_date_col].notna())
+            filtered_columns.append(marker_col_name)
+        df[real_date_col] = pd.to_datetime(df[real_date_col], format=date_format, errors='coerce').dt.date
+        df = df.dropna(subset=[real_date_col]).reset_index(drop=True)
+
+    if realign:
+        def realign_row(row):
+            non_empty = row.dropna().values
+            aligned = pd.Series([None] * len(df.columns), index=df.columns, dtype=object)
+            aligned[:len(non_empty)] = non_empty
+            return aligned
+
+        df = df.apply(realign_row, axis=1)
+
+    extra_cols = 0
+    if track_fill and fill_cols:
+        extra_cols += len(fill_cols)
+    if track_date_fill and real_date_col:
+        extra_cols += 1
+    if n_cols is not None:
+        df = df.iloc[:, :n_cols + extra_cols]
+
+    df.columns = filtered_columns[-len(df.columns):]
+    return df.reset_index(drop=True)
+
+
+def as_datetimes(df):
+    """
+    Date objects as datetimes, since clean_excel keeps parsed dates as
+    datetime64 where the original stored date objects.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        values = pd.Series(
+            [pd.Timestamp(v) if type(v) is dt.date else v for v in df[col]], index=df.index, dtype=object,
+        )
+        present = values.dropna()
+        if len(present) and present.map(lambda v: isinstance(v, pd.Timestamp)).all():
+            values = pd.to_datetime(values)
+        df[col] = values
+    return df
+
+
+OPTIONS = {
+    "header row": {"header_row_guess": HEADER_ROW, "n_cols": 7},
+    "keywords": {
+        "header_row_guess": HEADER_ROW, "drop_keywords": ["Subtotal", "Totals", "Notes"], "n_cols": 7,
+    },
+    "fills and markers": {
+        "header_row_guess": HEADER_ROW, "drop_keywords": ["total"], "fill_cols": ["qty", "Amount"],
+        "fill_methods": {"qty": 0, "amount": "ffill"}, "track_fill": True, "track_date_fill": True, "n_cols": 7,
+    },
+    "mixed-case fills": {
+        "header_row_guess": HEADER_ROW, "drop_keywords": ["Subtotal", "Totals", "Notes"],
+        "fill_cols": ["QTY", "amount", "Unit"], "fill_methods": {"Qty": 0, "AMOUNT": "bfill", "unit": "EA"},
+        "track_fill": True, "n_cols": 7,
+    },
+    "date format and bfill": {
+        "header_row_guess": HEADER_ROW, "date_col": "date:", "date_format": "%m/%d/%Y",
+        "date_fill_method": "bfill", "realign": False, "n_cols": 7,
+    },
+    "footer and start column": {
+        "header_row_guess": HEADER_ROW, "skip_last_rows": True, "skip_num": 60, "start_col_letter": "B",
+        "drop_keywords": ["Subtotal"], "n_cols": 6,
+    },
+}
+
+
+@pytest.mark.parametrize("name", OPTIONS)
+@pytest.mark.parametrize("cached_grid", [False, True])
+def test_clean_excel_matches_reference(invoice, name, cached_grid):
+    if cached_grid:
+        load_workbook_grid(BytesIO(invoice))
+
+    cleaned = clean_excel(BytesIO(invoice), **OPTIONS[name])
+    expected = as_datetimes(reference_clean_excel(invoice, **OPTIONS[name]))
+
+    pd.testing.assert_frame_equal(cleaned, expected)
+
+
+def test_clean_excel_rejects_unnamed_columns_like_reference(invoice):
+    # Shifted rows widen the sheet past the named headers
+    with pytest.raises(ValueError):
+        reference_clean_excel(invoice, header_row_guess=HEADER_ROW)
+    with pytest.raises(ValueError):
+        clean_excel(BytesIO(invoice), header_row_guess=HEADER_ROW)
+
+
+def test_clean_excel_reuses_cached_stages(invoice, monkeypatch):
+    calls = []
+    ingest_stage = clean.ingest_stage
+    monkeypatch.setattr(clean, "ingest_stage", lambda *args, **kwargs: calls.append(1) or ingest_stage(*args, **kwargs))
+
+    options = OPTIONS["fills and markers"]
+    clean_excel(BytesIO(invoice), **options)
+    narrower = clean_excel(BytesIO(invoice), **{**options, "n_cols": 3})
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(
+        narrower, as_datetimes(reference_clean_excel(invoice, **{**options, "n_cols": 3})),
+    )
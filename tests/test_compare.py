@@ -0,0 +1,129 @@
+"""
+compare_dfs against the per-key loop it replaced.
+"""
+
+# Import Libraries
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+from excel_tools import compare_dfs
+
+
+def reference_compare_dfs(excel_1, pair1, excel_2, pair2, compare1, compare2):
+    """
+    The original per-key comparison loop (case-insensitive keys).
+    """
+    excel_1 = excel_1.copy()
+    excel_2 = excel_2.copy()
+    excel_1['_key'] = excel_1[pair1].astype(str).str.lower()
+    excel_2['_key'] = excel_2[pair2].astype(str).str.lower()
+
+    missing_from_excel_2 = excel_1[~excel_1['_key'].isin(excel_2['_key'])]
+    missing_from_excel_1 = excel_2[~excel_2['_key'].isin(excel_1['_key'])]
+
+    diff_qty = {}
+    combined_list = []
+    for key in set(excel_1['_key']).union(set(excel_2['_key'])):
+        row_1 = excel_1[excel_1['_key'] == key]
+        row_2 = excel_2[excel_2['_key'] == key]
+        if row_1.empty or row_2.empty:
+            combined_list.append(key)
+            continue
+
+        for col1, col2 in zip(compare1, compare2):
+            val1 = row_1.iloc[0][col1]
+            val2 = row_2.iloc[0][col2]
+            val1_norm = val1.strip().lower() if isinstance(val1, str) else val1
+            val2_norm = val2.strip().lower() if isinstance(val2, str) else val2
+            if pd.isnull(val1_norm) and pd.isnull(val2_norm):
+                continue
+            if val1_norm != val2_norm:
+                diff_qty.setdefault(row_1.iloc[0][pair1], {})[f"{col1} | {col2}"] = [val1, val2]
+
+    records = [
+        {"ID": key, "Column (Excel 1 | Excel2)": col_pair, "Excel 1": val1, "Excel 2": val2}
+        for key, mismatches in diff_qty.items()
+        for col_pair, (val1, val2) in mismatches.items()
+    ]
+    diff_qty_df = pd.DataFrame(records)
+    if records:
+        diff_qty_df = diff_qty_df.sort_values(by=["ID", "Column (Excel 1 | Excel2)"])
+
+    original_ids = []
+    for key in combined_list:
+        match = excel_1[excel_1['_key'] == key]
+        if match.empty:
+            original_ids.append(excel_2[excel_2['_key'] == key].iloc[0][pair2])
+        else:
+            original_ids.append(match.iloc[0][pair1])
+    combo = pd.DataFrame(original_ids, columns=['Missing list']).sort_values(by='Missing list', ascending=False)
+
+    return (
+        missing_from_excel_1.drop(columns=['_key']),
+        missing_from_excel_2.drop(columns=['_key']),
+        diff_qty_df,
+        combo,
+    )
+
+
+CASES = {
+    "text and numbers": (
+        {"ID": ["A1", "a2", "A3", "A3", "A5"], "Qty": [1, 2, 3, 4, 5], "Unit": ["Each", " cy", "TN", "x", None]},
+        {"ID": ["a1", "A2", "a3", "A4"], "Qty": [1, 3, 3, 9], "Unit": ["each ", "CY", "LF", "y"]},
+        ["Qty", "Unit"], ["Qty", "Unit"],
+    ),
+    "int and float mix with text only in unmatched rows": (
+        {"ID": ["a", "b", "c"], "Qty": [1, 2.5, "n/a"]},
+        {"ID": ["a", "b"], "Qty": [1, 3]},
+        ["Qty"], ["Qty"],
+    ),
+    "time values": (
+        {"ID": ["a", "b", "c"], "Start": [dt.time(8), dt.time(9), dt.time(10)]},
+        {"ID": ["A", "b", "c"], "Start": [dt.time(8), dt.time(9, 30), None]},
+        ["Start"], ["Start"],
+    ),
+    "numeric IDs and missing values": (
+        {"ID": [1, 2, 3, 4], "Qty": [1.0, None, 3.0, None]},
+        {"ID": [1, 2, 3, 5], "Qty": [1.0, 2.0, None, None]},
+        ["Qty"], ["Qty"],
+    ),
+}
+
+
+def assert_same(result, expected):
+    for got, want in zip(result, expected):
+        pd.testing.assert_frame_equal(got.reset_index(drop=True), want.reset_index(drop=True))
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_compare_dfs_matches_reference(name):
+    data_1, data_2, compare1, compare2 = CASES[name]
+    excel_1, excel_2 = pd.DataFrame(data_1), pd.DataFrame(data_2)
+
+    result = compare_dfs(excel_1, "ID", excel_2, "id", compare1=compare1, compare2=compare2)
+    expected = reference_compare_dfs(excel_1, "ID", excel_2, "ID", compare1, compare2)
+
+    assert_same(result, expected)
+
+
+def test_compare_dfs_mixed_types_reports_mismatch():
+    excel_1 = pd.DataFrame({"ID": ["a", "b", "c"], "Qty": [1, 2.5, "n/a"]})
+    excel_2 = pd.DataFrame({"ID": ["a", "b"], "Qty": [1, 3]})
+
+    _, _, diff_qty_df, _ = compare_dfs(excel_1, "ID", excel_2, "ID", compare1=["Qty"], compare2=["Qty"])
+
+    assert diff_qty_df[["ID", "Excel 1", "Excel 2"]].values.tolist() == [["b", 2.5, 3]]
+
+
+def test_compare_dfs_without_compare_columns():
+    excel_1 = pd.DataFrame({"ID": ["a", "B"]})
+    excel_2 = pd.DataFrame({"ID": ["b", "c"]})
+
+    missing_1, missing_2, diff_qty_df, combo = compare_dfs(excel_1, "ID", excel_2, "ID")
+
+    assert missing_1["ID"].tolist() == ["c"]
+    assert missing_2["ID"].tolist() == ["a"]
+    assert diff_qty_df.empty
+    assert combo["Missing list"].tolist() == ["c", "a"]
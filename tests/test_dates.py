@@ -0,0 +1,111 @@
+"""
+parse_dates, fill_parsed_dates and detect_date_column against the
+pd.to_datetime calls they replaced.
+"""
+
+# Import Libraries
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from excel_tools import detect_date_column, fill_parsed_dates, parse_dates
+
+# "Mandate" is a candidate too, and its yes/no values make pandas fall back
+# to dateutil; the reference fills object columns the deprecated way
+pytestmark = [
+    pytest.mark.filterwarnings("ignore:Could not infer format"),
+    pytest.mark.filterwarnings("ignore:Downcasting object dtype arrays"),
+]
+
+RAW = {
+    "datetimes": pd.Series(
+        [dt.datetime(2024, 5, 1), None, dt.datetime(2024, 5, 1), dt.datetime(2024, 5, 2, 13, 30), np.nan],
+        dtype=object,
+    ),
+    "text": pd.Series(["05/01/2024", None, "05/01/2024", "13/01/2024", "Subtotal", "05/02/2024"]),
+    "mixed": pd.Series(
+        [dt.datetime(2024, 5, 1), "05/03/2024", dt.date(2024, 5, 4), 7, "n/a", None],
+        dtype=object,
+    ),
+    "empty": pd.Series([None, None], dtype=object),
+    "indexed": pd.Series(["05/01/2024", None, "05/09/2024"], index=[10, 3, 7], name="Date:"),
+}
+
+
+def reference_parse(values, date_format=None):
+    return pd.to_datetime(values, format=date_format, errors='coerce')
+
+
+@pytest.mark.parametrize("date_format", [None, "%m/%d/%Y"])
+@pytest.mark.parametrize("name", RAW)
+def test_parse_dates_matches_to_datetime(name, date_format):
+    values = RAW[name]
+    pd.testing.assert_series_equal(
+        parse_dates(values, date_format), reference_parse(values, date_format), check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize("method", ["ffill", "bfill"])
+@pytest.mark.parametrize("name", ["datetimes", "text", "indexed"])
+def test_fill_parsed_dates_matches_parsing_filled_column(name, method):
+    raw = RAW[name]
+    filled = raw.ffill() if method == "ffill" else raw.bfill()
+    pd.testing.assert_series_equal(
+        fill_parsed_dates(parse_dates(raw), raw, method), reference_parse(filled), check_dtype=False,
+    )
+
+
+def test_fill_parsed_dates_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        fill_parsed_dates(parse_dates(RAW["text"]), RAW["text"], "nearest")
+
+
+def reference_detect(df, date_format=None):
+    """
+    The original scoring of every candidate column on every row.
+    """
+    scores = {}
+    for col in [col for col in df.columns if 'date' in col.lower()]:
+        try:
+            scores[col] = pd.to_datetime(df[col], format=date_format, errors='coerce').notna().sum()
+        except Exception:
+            continue
+    if scores:
+        best_col = max(scores, key=scores.get)
+        if scores[best_col] > 0:
+            return best_col
+    return None
+
+
+def dated_frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2024-05-01", periods=n_rows, freq="h").strftime("%m/%d/%Y").to_numpy(dtype=object)
+    return pd.DataFrame({
+        "Update Date": np.where(rng.random(n_rows) < 0.2, days, None),
+        "Date:": np.where(rng.random(n_rows) < 0.7, days, "Subtotal"),
+        "Description": ["Pipe"] * n_rows,
+        "Mandate": rng.choice(np.array(["yes", "no"], dtype=object), n_rows),
+    })
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_detect_date_column_matches_reference(seed):
+    df = dated_frame(200, seed)
+    col, parsed = detect_date_column(df)
+    assert col == reference_detect(df)
+    pd.testing.assert_series_equal(parsed, reference_parse(df[col]), check_dtype=False)
+
+
+def test_detect_date_column_samples_large_frames():
+    df = dated_frame(20_000)
+    col, parsed = detect_date_column(df, "%m/%d/%Y")
+    assert col == reference_detect(df, "%m/%d/%Y") == "Date:"
+    assert parsed is None
+
+
+def test_detect_date_column_without_dates():
+    df = pd.DataFrame({"Date:": ["Subtotal", None], "Qty": [1, 2]})
+    assert detect_date_column(df) == (None, None)
+    assert reference_detect(df) is None
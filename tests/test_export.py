@@ -0,0 +1,159 @@
+"""
+The streaming xlsx writer against the pandas engine, sheet splitting and
+the single-table export formats.
+"""
+
+# Import Libraries
+import datetime as dt
+import zipfile
+from io import BytesIO
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from excel_tools.export import export_frames, export_report, split_sheets, write_excel
+
+
+def read_cells(data):
+    """
+    Every sheet's cell values and types, read back with openpyxl.
+    """
+    wb = openpyxl.load_workbook(BytesIO(data))
+    return {
+        ws.title: [[(cell.value, cell.data_type) for cell in row if cell.value is not None] for row in ws.iter_rows()]
+        for ws in wb.worksheets
+    }
+
+
+FRAMES = {
+    "mixed values": pd.DataFrame({
+        "Ticket": ["T1", "T2", None],
+        "Qty": [1, 2, 3],
+        "Rate": [1.5, np.nan, -2.25],
+        "Paid": [True, False, True],
+        "Date": pd.to_datetime(["2024-05-01", "2024-05-02", None]),
+        "Note": ["a", 4, dt.date(2024, 1, 2)],
+    }),
+    "numeric labels": pd.DataFrame([[1.0, 2.0, 3.0]], columns=[101, 102.5, "Total"]),
+}
+
+
+@pytest.mark.parametrize("name", FRAMES)
+@pytest.mark.parametrize("index", [False, True])
+def test_streaming_matches_pandas_engine(name, index):
+    sheets = {"cleaned": FRAMES[name]}
+    index = ("cleaned",) if index else ()
+
+    streamed = write_excel(sheets, index=index, engine="streaming")
+    expected = write_excel(sheets, index=index, engine="pandas")
+
+    assert read_cells(streamed) == read_cells(expected)
+
+
+def test_numeric_header_labels_stay_numbers():
+    df = pd.DataFrame([[1, 2]], columns=[1001, 1002]).T
+    data = write_excel({"diff": df}, index=("diff",), engine="streaming")
+
+    header = read_cells(data)["diff"][0]
+    assert header == [(0, "n")]
+    assert [row[0] for row in read_cells(data)["diff"][1:]] == [(1001, "n"), (1002, "n")]
+
+
+def test_split_sheets_numbers_continuation_sheets():
+    df = pd.DataFrame({"Qty": range(7)})
+    split, index = split_sheets({"data": df, "summary": df.head(2)}, index={"data"}, max_rows=3)
+    assert list(split) == ["data", "data_2", "data_3", "summary"]
+    assert [part["Qty"].tolist() for part in split.values()] == [[0, 1, 2], [3, 4, 5], [6], [0, 1]]
+    assert index == {"data", "data_2", "data_3"}
+
+
+def test_split_sheets_skips_taken_names():
+    df = pd.DataFrame({"Qty": range(5)})
+    sheets = {"data": df, "Data_2": df.head(1), "x" * 29 + "_a": df, "x" * 29 + "_b": df}
+    split, _ = split_sheets(sheets, max_rows=2)
+
+    assert len(split) == 1 + 3 + 3 + 3
+    assert list(split)[:4] == ["data", "data_3", "data_4", "Data_2"]
+    pd.testing.assert_frame_equal(split["Data_2"], df.head(1))
+    assert len({name.casefold() for name in split}) == len(split)
+    assert all(len(name) <= 31 for name in split)
+
+    wb = openpyxl.load_workbook(BytesIO(write_excel(split)))
+    assert wb.sheetnames == list(split)
+
+
+TABLE = pd.DataFrame({
+    "Ticket": ["T1", "T2", None],
+    "Qty": [1, 2, 3],
+    "Rate": [1.5, np.nan, -2.25],
+    "Date": pd.to_datetime(["2024-05-01", "2024-05-02", None]),
+}, index=pd.Index([10, 11, 12], name="row"))
+
+
+def read_table(data, fmt):
+    """
+    Read one exported table back into a DataFrame.
+    """
+    if fmt == "csv":
+        return pd.read_csv(BytesIO(data), parse_dates=["Date"])
+    if fmt == "parquet":
+        return pd.read_parquet(BytesIO(data))
+    return pd.read_feather(BytesIO(data))
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_table_formats_round_trip(fmt):
+    data, extension = export_frames({"cleaned": TABLE}, fmt)
+    assert extension == f".{fmt}"
+    expected = TABLE.reset_index(drop=True)
+    if fmt == "csv":
+        # CSV has no None; empty text reads back as NaN
+        expected["Ticket"] = expected["Ticket"].astype(object).where(expected["Ticket"].notna(), np.nan)
+    pd.testing.assert_frame_equal(read_table(data, fmt), expected)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_table_formats_write_the_index_as_a_column(fmt):
+    data, _ = export_frames({"diff": TABLE}, fmt, index=("diff",))
+    table = read_table(data, fmt)
+    assert list(table.columns) == ["row", *TABLE.columns]
+    assert table["row"].tolist() == [10, 11, 12]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_mixed_type_columns_fall_back_to_text(fmt):
+    df = pd.DataFrame({"Note": ["a", 4, dt.date(2024, 1, 2), None], "Qty": [1.0, 2.0, None, 4.0]})
+    table = read_table(export_frames({"cleaned": df}, fmt)[0], fmt)
+    assert table["Note"].tolist() == ["a", "4", "2024-01-02", None]
+    assert table["Qty"].dtype == np.float64
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_bundles_come_back_as_zip(fmt):
+    sheets = {"a": TABLE, "b": TABLE.head(1)}
+    data, extension = export_frames(sheets, fmt)
+    assert extension == ".zip"
+    with zipfile.ZipFile(BytesIO(data)) as archive:
+        assert archive.namelist() == [f"a.{fmt}", f"b.{fmt}"]
+        assert len(read_table(archive.read(f"b.{fmt}"), fmt)) == 1
+
+    data, extension = export_frames({"a": TABLE}, fmt, bundle=True)
+    assert extension == ".zip"
+    assert zipfile.ZipFile(BytesIO(data)).namelist() == [f"a.{fmt}"]
+
+
+def test_export_report_skips_empty_frames():
+    data, extension = export_report({"missing": TABLE.iloc[:0], "diff": TABLE}, "csv")
+    assert extension == ".zip"
+    assert zipfile.ZipFile(BytesIO(data)).namelist() == ["diff.csv"]
+
+    data, extension = export_report({"missing": TABLE.iloc[:0]}, "xlsx")
+    assert extension == ".xlsx"
+    assert list(read_cells(data)) == ["No_Data"]
+
+
+def test_export_frames_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        export_frames({"cleaned": TABLE}, "ods")
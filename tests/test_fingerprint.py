@@ -0,0 +1,82 @@
+"""
+Content hashes and frame fingerprints used as cache keys.
+"""
+
+# Import Libraries
+import datetime as dt
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from excel_tools.fingerprint import combine_fingerprints, frame_fingerprint
+from excel_tools.workbook import content_hash, file_hash
+
+
+def test_file_hash_depends_only_on_content(tmp_path, invoice):
+    path = tmp_path / "invoice.xlsx"
+    path.write_bytes(invoice)
+
+    handle = open(path, "rb")
+    handle.read(10)
+    with handle:
+        keys = {file_hash(BytesIO(invoice)), file_hash(path), file_hash(str(path)), file_hash(handle)}
+        assert handle.tell() == 0
+    assert keys == {content_hash(invoice)}
+
+    edited = invoice[:-1] + bytes([invoice[-1] ^ 1])
+    assert content_hash(edited) != content_hash(invoice)
+
+
+@pytest.fixture
+def cleaned():
+    return pd.DataFrame({
+        "Ticket #": ["T1", "T2", "T3"],
+        "Date:": pd.to_datetime(["2024-05-01", "2024-05-02", None]),
+        "Qty": [1, 2, 3],
+        "Note": ["a", 4, None],
+    })
+
+
+def test_equal_frames_give_equal_fingerprints(cleaned):
+    copy = pd.DataFrame({col: cleaned[col].tolist() for col in cleaned.columns})
+    copy["Date:"] = pd.to_datetime(copy["Date:"])
+    assert frame_fingerprint(copy) == frame_fingerprint(cleaned)
+    assert frame_fingerprint(cleaned.copy()) == frame_fingerprint(cleaned)
+
+
+EDITS = {
+    "cell": lambda df: df.assign(Qty=[1, 2, 4]),
+    "missing cell": lambda df: df.assign(Note=["a", 4, "None"]),
+    "value type": lambda df: df.assign(Note=["a", "4", None]),
+    "date as text": lambda df: df.assign(Note=["a", 4, dt.date(2024, 5, 1)]),
+    "dtype": lambda df: df.assign(Qty=[1.0, 2.0, 3.0]),
+    "column name": lambda df: df.rename(columns={"Qty": "Quantity"}),
+    "column order": lambda df: df[["Qty", "Ticket #", "Date:", "Note"]],
+    "extra column": lambda df: df.assign(Qty_filled=False),
+    "row order": lambda df: df.iloc[[1, 0, 2]],
+    "index": lambda df: df.set_axis([5, 6, 7]),
+    "dropped row": lambda df: df.iloc[:2],
+}
+
+
+@pytest.mark.parametrize("edit", EDITS)
+def test_edited_frames_give_other_fingerprints(cleaned, edit):
+    assert frame_fingerprint(EDITS[edit](cleaned)) != frame_fingerprint(cleaned)
+
+
+def test_mixed_text_and_dates_differ():
+    text = pd.DataFrame({"Note": ["2024-05-01", "a"]})
+    dates = pd.DataFrame({"Note": [dt.date(2024, 5, 1), "a"]})
+    assert frame_fingerprint(text) != frame_fingerprint(dates)
+    assert frame_fingerprint(text.iloc[:1]) != frame_fingerprint(dates.iloc[:1])
+
+
+def test_combine_fingerprints_is_stable_and_order_sensitive():
+    key = combine_fingerprints("abc", "clean", (("n_cols", 7),))
+    assert key == combine_fingerprints("abc", "clean", (("n_cols", 7),))
+    assert key != combine_fingerprints("abc", "clean", (("n_cols", 8),))
+    assert key != combine_fingerprints("clean", "abc", (("n_cols", 7),))
+    assert combine_fingerprints(1) != combine_fingerprints("1")
+    assert len(key) == 32 and int(key, 16) >= 0
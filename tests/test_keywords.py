@@ -0,0 +1,65 @@
+"""
+drop_keyword_rows against the row-wise str.contains scan it replaced.
+"""
+
+# Import Libraries
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from excel_tools import drop_keyword_rows
+
+
+def reference_drop_keyword_rows(df, keywords):
+    """
+    The original row-by-row scan of every cell as text.
+    """
+    pattern = '|'.join(re.escape(str(k)) for k in keywords)
+    return df[~df.apply(lambda row: row.astype(str).str.contains(pattern, case=False, na=False)).any(axis=1)]
+
+
+@pytest.fixture
+def lines():
+    rng = np.random.default_rng(0)
+    words = ["Pipe", "Elbow", "Sub-total", "SUBTOTAL", "Grand Totals", "notes: call", "Valve (2\")", "a.b*c", None]
+    n_rows = 300
+    return pd.DataFrame({
+        "Ticket #": [f"T{i}" if i % 11 else None for i in range(n_rows)],
+        "Description": rng.choice(np.array(words, dtype=object), n_rows),
+        "Unit": rng.choice(np.array(["ea", "ft", "Total", None], dtype=object), n_rows),
+        "Qty": rng.integers(0, 50, n_rows),
+    })
+
+
+@pytest.mark.parametrize("keywords", [
+    ["subtotal"],
+    ["Total", "Notes"],
+    ["a.b*c", "(2\")"],
+    ["SUB", "sub-total", "grand totals"],
+    ["nothing here"],
+])
+def test_drop_keyword_rows_matches_reference(lines, keywords):
+    pd.testing.assert_frame_equal(
+        drop_keyword_rows(lines, keywords), reference_drop_keyword_rows(lines, keywords),
+    )
+
+
+def test_drop_keyword_rows_accepts_one_keyword(lines):
+    pd.testing.assert_frame_equal(
+        drop_keyword_rows(lines, "Total"), reference_drop_keyword_rows(lines, ["Total"]),
+    )
+
+
+def test_drop_keyword_rows_ignores_empty_cells():
+    # The original matched NaN cells as the text 'nan'
+    df = pd.DataFrame({"Description": ["Pipe", None, np.nan], "Unit": [None, "ea", None]})
+    assert reference_drop_keyword_rows(df, ["an"]).index.tolist() == [0, 1]
+    pd.testing.assert_frame_equal(drop_keyword_rows(df, ["an"]), df)
+
+
+def test_drop_keyword_rows_skips_numeric_columns():
+    df = pd.DataFrame({"Description": ["Pipe", "Elbow"], "Qty": [12, 3]})
+    pd.testing.assert_frame_equal(drop_keyword_rows(df, ["12"]), df)
+    assert drop_keyword_rows(df, ["elb"])["Description"].tolist() == ["Pipe"]
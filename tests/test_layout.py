@@ -0,0 +1,106 @@
+"""
+Layout fingerprints and matching uploads to saved recipes.
+"""
+
+# Import Libraries
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+
+from excel_tools.layout import (
+    LAYOUT_SCAN_ROWS,
+    layout_fingerprint,
+    layout_scan_rows,
+    layout_signature,
+    scan_layout,
+)
+from excel_tools.recipes import find_recipe, make_recipe, recipe_scan_rows
+
+from conftest import HEADER, HEADER_ROW, make_invoice
+
+
+def workbook_bytes(header, header_row=HEADER_ROW, sheets=("Invoice", "Notes")):
+    """
+    A workbook with header on header_row of its first sheet.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = sheets[0]
+    ws.append(["Aftermath Disaster Recovery"])
+    for _ in range(header_row - 2):
+        ws.append([])
+    ws.append(header)
+    ws.append(["T1", "05/01/2024", "Debris", 3])
+    for name in sheets[1:]:
+        wb.create_sheet(name)
+
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def fingerprint(data, header_row=HEADER_ROW, sheet_name=0):
+    return layout_fingerprint(scan_layout(BytesIO(data)), sheet_name, header_row)
+
+
+def test_same_layout_gives_the_same_fingerprint():
+    # Different data below the header, same layout
+    first = fingerprint(make_invoice(n_rows=20, seed=1))
+    assert first is not None
+    assert fingerprint(make_invoice(n_rows=60, seed=2)) == first
+    # Header text is compared with whitespace collapsed and case folded
+    messy = [" ticket  #", "DATE:", *HEADER[2:]]
+    assert fingerprint(workbook_bytes(messy)) == fingerprint(workbook_bytes(HEADER))
+
+
+@pytest.mark.parametrize("changed", [
+    {"header": ["Ticket No", *HEADER[1:]]},
+    {"header": HEADER[:-1]},
+    {"header_row": HEADER_ROW + 1},
+    {"sheets": ("Invoice",)},
+    {"sheets": ("Invoice", "Summary")},
+])
+def test_changed_layout_gives_another_fingerprint(changed):
+    options = {"header": HEADER, **changed}
+    assert fingerprint(workbook_bytes(**options)) != fingerprint(workbook_bytes(HEADER))
+
+
+def test_no_signature_without_a_header():
+    top_rows = scan_layout(BytesIO(workbook_bytes(HEADER)))
+    assert layout_signature(top_rows, 0, 2) is None
+    assert layout_signature(top_rows, 0, 1)["header"] == ["aftermath disaster recovery"]
+    assert layout_signature(top_rows, "Missing", HEADER_ROW) is None
+    assert layout_signature(top_rows, 5, HEADER_ROW) is None
+    assert layout_fingerprint(top_rows, 0, LAYOUT_SCAN_ROWS + 10) is None
+
+
+def recipe_for(data, header_row=HEADER_ROW, name="vendor"):
+    layout = layout_fingerprint(scan_layout(BytesIO(data)), 0, header_row)
+    return make_recipe(name, layout, header_row_guess=header_row)
+
+
+def test_find_recipe_matches_the_saved_layout():
+    other = recipe_for(workbook_bytes(["Load", "Qty"]), name="other")
+    vendor = recipe_for(make_invoice(seed=1))
+    loose = make_recipe("no layout", header_row_guess=HEADER_ROW)
+    recipes = [loose, other, vendor]
+
+    top_rows = scan_layout(BytesIO(make_invoice(seed=5)), recipe_scan_rows(recipes))
+    assert find_recipe(top_rows, recipes) is vendor
+
+    top_rows = scan_layout(BytesIO(workbook_bytes(["Ticket No", *HEADER[1:]])), recipe_scan_rows(recipes))
+    assert find_recipe(top_rows, recipes) is None
+
+
+def test_find_recipe_matches_headers_below_the_default_scan():
+    header_row = LAYOUT_SCAN_ROWS + 15
+    data = workbook_bytes(HEADER, header_row=header_row)
+    # What the page saves: the upload is scanned down to the header row
+    layout = layout_fingerprint(scan_layout(BytesIO(data), layout_scan_rows(header_row)), 0, header_row)
+    recipe = make_recipe("deep", layout, header_row_guess=header_row)
+    assert recipe["layout"] is not None
+    assert recipe_scan_rows([recipe]) == header_row
+
+    top_rows = scan_layout(BytesIO(data), recipe_scan_rows([recipe]))
+    assert find_recipe(top_rows, [recipe]) is recipe
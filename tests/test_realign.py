@@ -0,0 +1,77 @@
+"""
+realign_left against the per-row df.apply realign it replaced.
+"""
+
+# Import Libraries
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from excel_tools import realign_left
+
+
+def reference_realign(df):
+    """
+    The original per-row realign.
+    """
+    def realign_row(row):
+        non_empty = row.dropna().values
+        aligned = pd.Series([None] * len(df.columns), index=df.columns, dtype=object)
+        aligned[:len(non_empty)] = non_empty
+        return aligned
+
+    return df.apply(realign_row, axis=1)
+
+
+FRAMES = {
+    "shifted text": pd.DataFrame({
+        "a": ["x", None, "y", None],
+        "b": ["1", "p", None, None],
+        "c": [None, "q", "z", "w"],
+    }),
+    "mixed types": pd.DataFrame({
+        "ticket": ["T1", None, "T3", "T4", np.nan],
+        "date": [dt.datetime(2024, 5, 1), "T2", None, dt.date(2024, 5, 3), "T5"],
+        "qty": [1.5, dt.datetime(2024, 5, 2), 3, None, 2],
+        "unit": ["ea", 4, "ft", 7.25, None],
+        "amount": [None, "ea", 9.0, "lb", 11.5],
+    }, dtype=object),
+    "numeric": pd.DataFrame({
+        "a": [1.0, np.nan, 3.0],
+        "b": [np.nan, 2.0, 4.0],
+        "c": [5.0, 6.0, np.nan],
+    }),
+    "all empty row": pd.DataFrame({
+        "a": [None, "x"],
+        "b": [np.nan, None],
+    }, dtype=object),
+}
+
+
+@pytest.mark.parametrize("name", FRAMES)
+def test_realign_left_matches_reference(name):
+    df = FRAMES[name]
+    pd.testing.assert_frame_equal(realign_left(df), reference_realign(df).infer_objects())
+
+
+@pytest.mark.parametrize("n_cols", [1, 2, 4])
+def test_realign_left_n_cols_matches_truncated_reference(n_cols):
+    df = FRAMES["mixed types"]
+    expected = reference_realign(df).iloc[:, :n_cols].infer_objects()
+    pd.testing.assert_frame_equal(realign_left(df, n_cols=n_cols), expected)
+
+
+def test_realign_left_without_inference_keeps_objects():
+    df = pd.DataFrame({"a": [None], "b": [dt.datetime(2024, 5, 1)]}, dtype=object)
+    realigned = realign_left(df, infer=False)
+    assert (realigned.dtypes == object).all()
+    assert realigned.iloc[0, 0] == dt.datetime(2024, 5, 1)
+    assert realigned.iloc[0, 1] is None
+
+
+def test_realign_left_empty_frame():
+    df = pd.DataFrame({"a": [], "b": [], "c": []}, dtype=object)
+    assert list(realign_left(df, n_cols=2).columns) == ["a", "b"]
+    assert realign_left(df).empty
@@ -0,0 +1,97 @@
+"""
+Saving, loading and replaying cleaning recipes.
+"""
+
+# Import Libraries
+import json
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from excel_tools import clean_excel
+from excel_tools.clean import plan_clean
+from excel_tools.recipes import (
+    RECIPE_OPTIONS,
+    RECIPE_VERSION,
+    apply_recipe,
+    compile_recipe,
+    load_recipe,
+    make_recipe,
+    recipe_from_json,
+    recipe_to_json,
+    save_recipe,
+)
+
+from conftest import HEADER_ROW
+
+OPTIONS = {
+    "header_row_guess": HEADER_ROW,
+    "drop_keywords": ["Subtotal", "Totals", "Notes"],
+    "fill_cols": ["Qty"],
+    "fill_methods": {"Qty": 0},
+    "track_fill": True,
+    "date_fill_method": "bfill",
+    "n_cols": 7,
+}
+
+
+def test_make_recipe_fills_in_defaults():
+    recipe = make_recipe("Vendor A", **OPTIONS)
+    assert recipe["version"] == RECIPE_VERSION
+    assert recipe["layout"] is None
+    assert set(recipe["options"]) == set(RECIPE_OPTIONS)
+    assert recipe["options"]["realign"] is True
+
+
+def test_make_recipe_rejects_unknown_options():
+    with pytest.raises(ValueError, match="n_columns"):
+        make_recipe(n_columns=7)
+
+
+def test_recipe_json_round_trip(tmp_path):
+    recipe = make_recipe("Vendor A", layout="abc123", **OPTIONS)
+    assert recipe_from_json(recipe_to_json(recipe)) == recipe
+    assert recipe_from_json(recipe_to_json(recipe).encode("utf-8")) == recipe
+
+    save_recipe(recipe, tmp_path / "vendor_a.json")
+    assert load_recipe(tmp_path / "vendor_a.json") == recipe
+
+
+@pytest.mark.parametrize("version", [None, 0, RECIPE_VERSION + 1, "1"])
+def test_recipe_from_json_rejects_other_versions(version):
+    data = json.loads(recipe_to_json(make_recipe(**OPTIONS)))
+    data["version"] = version
+    with pytest.raises(ValueError, match="version"):
+        recipe_from_json(json.dumps(data))
+
+
+@pytest.mark.parametrize("text", ["not json", "[]", '{"version": 1}', '{"version": 1, "options": {"bad": 1}}'])
+def test_recipe_from_json_rejects_bad_recipes(text):
+    with pytest.raises(ValueError):
+        recipe_from_json(text)
+
+
+def test_apply_recipe_matches_clean_excel(invoice):
+    recipe = recipe_from_json(recipe_to_json(make_recipe(**OPTIONS)))
+    pd.testing.assert_frame_equal(
+        apply_recipe(BytesIO(invoice), recipe), clean_excel(BytesIO(invoice), **OPTIONS),
+    )
+
+
+def test_compile_recipe_reports_bad_options():
+    with pytest.raises(ValueError, match="fill_method"):
+        compile_recipe(make_recipe(fill_cols=["Qty"], fill_methods={"qty": ["ffill"]}))
+    with pytest.raises(ValueError, match="date_fill_method"):
+        compile_recipe(make_recipe(date_col="Date:", date_fill_method="nearest"))
+
+
+def test_date_fill_method_checked_only_when_dates_are_cleaned(invoice, tmp_path):
+    plan_clean(date_fill_method="nearest")
+    with pytest.raises(ValueError, match="date_fill_method"):
+        clean_excel(BytesIO(invoice), header_row_guess=HEADER_ROW, n_cols=7, date_fill_method="nearest")
+
+    # Like the original clean_excel, a sheet without dates ignores it
+    path = tmp_path / "no_dates.xlsx"
+    pd.DataFrame({"Ticket #": ["T1", "T2"], "Qty": [1, 2]}).to_excel(path, index=False)
+    assert len(clean_excel(path, date_fill_method="nearest")) == 2
@@ -0,0 +1,64 @@
+"""
+Stage caches: per-consumer namespaces and byte-size bounds.
+"""
+
+# Import Libraries
+import numpy as np
+import pandas as pd
+
+from excel_tools.stages import SizedCache, cached_stage, clear_stage_cache, stage_cache, value_size
+
+
+def test_cached_stage_runs_once_per_key():
+    clear_stage_cache()
+    calls = []
+
+    def stage(df, n):
+        calls.append(n)
+        return df.head(n)
+
+    df = pd.DataFrame({"a": range(10)})
+    key_1, first = cached_stage("head", stage, "file", df, n=3)
+    key_2, again = cached_stage("head", stage, "file", df, n=3)
+
+    assert key_1 == key_2
+    assert again is first
+    assert calls == [3]
+
+
+def test_caches_are_namespaced():
+    clear_stage_cache()
+    df = pd.DataFrame({"a": range(10)})
+    cached_stage("head", lambda df, n: df.head(n), "file", df, n=3)
+    cached_stage("view", lambda df, n: np.arange(n), "file", df, cache="view", n=5)
+
+    assert len(stage_cache("clean")) == 1
+    assert len(stage_cache("view")) == 1
+
+    # Clearing one consumer's cache leaves the others alone
+    clear_stage_cache("view")
+    assert len(stage_cache("clean")) == 1
+    assert len(stage_cache("view")) == 0
+
+
+def test_sized_cache_evicts_by_bytes():
+    block = np.zeros(1000, dtype=np.int64)
+    cache = SizedCache(max_bytes=value_size(block) * 2)
+    for key in "abc":
+        cache.put(key, block.copy())
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+    assert cache.nbytes <= cache.max_bytes
+
+    # Values larger than the budget are never kept
+    cache.put("big", np.zeros(10_000, dtype=np.int64))
+    assert cache.get("big") is None
+    assert len(cache) == 2
+
+
+def test_value_size_counts_object_text():
+    short = pd.DataFrame({"a": ["x"] * 100})
+    long = pd.DataFrame({"a": ["x" * 1000] * 100})
+    assert value_size(long) > value_size(short)
+    assert value_size((long, ["a"])) > value_size(long)
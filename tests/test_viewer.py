@@ -0,0 +1,84 @@
+"""
+Filtering, sorting and paging of the result table viewer.
+"""
+
+# Import Libraries
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from excel_tools.viewer import (
+    cached_view_positions,
+    filter_mask,
+    page_count,
+    sort_positions,
+    view_positions,
+    view_window,
+)
+
+
+@pytest.fixture
+def results():
+    return pd.DataFrame({
+        "Ticket": ["T3", "t1", None, "T2", "X9"],
+        "Qty": [3.0, np.nan, 1.0, 2.0, 5.0],
+        "Mixed": ["b", 7, dt.date(2024, 5, 1), None, "a"],
+    })
+
+
+def test_filter_mask_ignores_case_and_missing_values(results):
+    assert filter_mask(results, "t").tolist() == [True, True, False, True, False]
+    assert filter_mask(results, "NAN").tolist() == [False] * 5
+    assert filter_mask(results, "2024-05").tolist() == [False, False, True, False, False]
+    assert filter_mask(results.iloc[:0], "t").tolist() == []
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sort_positions_puts_missing_values_last(results, descending):
+    positions = sort_positions(results["Qty"], np.arange(5), descending)
+    expected = [2, 3, 0, 4, 1] if not descending else [4, 0, 3, 2, 1]
+    assert positions.tolist() == expected
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sort_positions_sorts_mixed_types_by_text(results, descending):
+    # "2024-05-01" < "7" < "a" < "b"; the missing value stays last
+    positions = sort_positions(results["Mixed"], np.arange(5), descending)
+    expected = [2, 1, 4, 0, 3] if not descending else [0, 4, 1, 2, 3]
+    assert positions.tolist() == expected
+
+
+def test_sort_positions_keeps_ties_stable():
+    values = pd.Series([2, 1, 2, 1, 2])
+    assert sort_positions(values, np.arange(5)).tolist() == [1, 3, 0, 2, 4]
+    assert sort_positions(values, np.array([4, 2, 1]), descending=True).tolist() == [4, 2, 1]
+
+
+def test_view_positions_filters_then_sorts(results):
+    assert view_positions(results).tolist() == [0, 1, 2, 3, 4]
+    assert view_positions(results, "t", sort_column=1).tolist() == [3, 0, 1]
+    assert view_positions(results, "t", sort_column=0, descending=True).tolist() == [1, 0, 3]
+
+
+def test_cached_view_positions_match_view_positions(results):
+    for query, sort_column in [(None, None), ("t", 1), ("", 2)]:
+        expected = view_positions(results, query, sort_column)
+        assert cached_view_positions("results", results, query, sort_column).tolist() == expected.tolist()
+        assert cached_view_positions(None, results, query, sort_column).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("n_rows, expected", [(0, 1), (1, 1), (100, 1), (101, 2), (250, 3)])
+def test_page_count(n_rows, expected):
+    assert page_count(n_rows) == expected
+
+
+def test_view_window_pages_and_clamps():
+    df = pd.DataFrame({"row": range(250)})
+    positions = np.arange(250)[::-1]
+    assert view_window(df, positions, 1)["row"].tolist() == list(range(249, 149, -1))
+    assert view_window(df, positions, 3)["row"].tolist() == list(range(49, -1, -1))
+    pd.testing.assert_frame_equal(view_window(df, positions, 7), view_window(df, positions, 3))
+    pd.testing.assert_frame_equal(view_window(df, positions, 0), view_window(df, positions, 1))
+    assert view_window(df, positions[:0], 2).empty
@@ -0,0 +1,123 @@
+"""
+Sheet reading: streamed, cached and fallback reads give the same rows,
+and the frames match pd.read_excel.
+"""
+
+# Import Libraries
+import datetime as dt
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from excel_tools import workbook
+from excel_tools.workbook import (
+    count_sheet_rows,
+    grid_to_frame,
+    iter_sheet_window,
+    load_workbook_grid,
+    read_sheet_page,
+    read_sheet_window,
+    read_top_rows,
+)
+
+WINDOWS = [
+    {"header_row": 3},
+    {"header_row": 3, "last_row": 9},
+    {"header_row": 3, "first_col": 2},
+    {"header_row": 3, "first_col": 2, "last_col": 3},
+    {"header_row": 3, "last_row": 6, "last_col": 2},
+    {"header_row": 1, "last_col": 1},
+]
+
+
+def make_workbook():
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Invoice"
+    ws.append(["Vendor"])
+    ws.append([])
+    ws.append(["Ticket", "Date", "Qty", None, "Unit"])
+    ws.append(["T1", dt.datetime(2024, 5, 1), 3, None, "CY"])
+    ws.append(["T2", "05/02/2024", 2.5])
+    ws.append([])
+    ws.append([None, None, None, None, None, None, "note"])
+    ws.append(["T3", dt.datetime(2024, 5, 3), 4, "x", "TN"])
+    ws.cell(row=9, column=3).value = "=1/0"
+    ws.append(["Totals", None, 9.5])
+    ws.cell(row=12, column=2).value = "footer"
+    wb.create_sheet("Other").append(["a", "b"])
+
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def data():
+    return make_workbook()
+
+
+def streamed(data, **window):
+    return list(iter_sheet_window(BytesIO(data), "Invoice", **window))
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_cached_and_streamed_windows_match(data, window):
+    rows = streamed(data, **window)
+    padded = read_sheet_window(BytesIO(data), "Invoice", **window)
+
+    load_workbook_grid(BytesIO(data))
+    assert streamed(data, **window) == rows
+    assert read_sheet_window(BytesIO(data), "Invoice", **window) == padded
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_public_reader_fallback_matches(data, window, monkeypatch):
+    rows = read_sheet_window(BytesIO(data), "Invoice", **window)
+
+    monkeypatch.setattr(workbook, "WindowParser", None)
+    assert read_sheet_window(BytesIO(data), "Invoice", **window) == rows
+
+
+def test_top_rows_cached_and_streamed_match(data):
+    top_rows = read_top_rows(BytesIO(data), 5)
+
+    load_workbook_grid(BytesIO(data))
+    assert read_top_rows(BytesIO(data), 5) == top_rows
+
+
+@pytest.mark.parametrize("header_row, last_row", [(3, None), (3, 10), (1, 5)])
+def test_window_frame_matches_read_excel(data, header_row, last_row):
+    frame = grid_to_frame(read_sheet_window(BytesIO(data), "Invoice", header_row=header_row, last_row=last_row))
+
+    nrows = None if last_row is None else last_row - header_row
+    expected = pd.read_excel(BytesIO(data), sheet_name="Invoice", skiprows=header_row - 1, nrows=nrows)
+    pd.testing.assert_frame_equal(frame, expected)
+
+
+@pytest.mark.parametrize("header_row", [1, 3, 5])
+@pytest.mark.parametrize("offset", [0, 2, 4, 20])
+def test_sheet_page_matches_grid_page(data, header_row, offset):
+    page = read_sheet_page(BytesIO(data), "Invoice", header_row=header_row, nrows=3, offset=offset)
+
+    rows = load_workbook_grid(BytesIO(data))["Invoice"]
+    expected = grid_to_frame(rows, header_row=header_row, nrows=3, offset=offset)
+    pd.testing.assert_frame_equal(page, expected)
+    pd.testing.assert_frame_equal(
+        read_sheet_page(BytesIO(data), "Invoice", header_row=header_row, nrows=3, offset=offset), expected,
+    )
+
+
+def test_first_sheet_page_matches_read_excel(data):
+    page = read_sheet_page(BytesIO(data), "Invoice", header_row=3, nrows=4)
+    expected = pd.read_excel(BytesIO(data), sheet_name="Invoice", skiprows=2, nrows=4)
+    pd.testing.assert_frame_equal(page, expected)
+
+
+def test_count_sheet_rows(data):
+    n_rows = count_sheet_rows(BytesIO(data), "Invoice")
+
+    assert n_rows == len(load_workbook_grid(BytesIO(data))["Invoice"])
+    assert count_sheet_rows(BytesIO(data), "Invoice") == n_rows